@@ -0,0 +1,185 @@
+# filename: async_fetch.py
+# One-line: asyncio fetch engine for TPO enrichment (hundreds in flight, few per host).
+#
+# Usage: auto_enrich_dataframe(df, mode="async") or enrich_rows_async(rows)
+# Needs aiohttp (see requirements.txt); the thread mode works without it.
+
+import asyncio, time
+from collections import defaultdict
+from urllib.parse import urlparse
+
+import aiohttp
+
+from host_breaker import BREAKER
+from http_client import HEADERS, VERIFY_SSL, RECENT_PAGES, CHUNK_BYTES, BodyReader, is_html
+from memo import MISSING
+from metrics import METRICS, host_of
+from politeness import SCHEDULER
+from tpo_auto_enrichment import (TIMEOUT, tpo_search, tpo_columns, analyse_page, college_span,
+                                 page_event, finish_span, page_watcher, definitive)
+
+
+class AsyncFetcher:
+    """
+    Shared aiohttp session with a global cap on open requests and a per-host cap.
+
+    Pacing comes from the per-host token buckets in politeness.SCHEDULER, so waiting
+    on one host never delays requests to another. Concurrent fetches of one URL share
+    a single request, and recent bodies are shared with http_client.safe_get.
+    Bodies are read like http_client.fetch_html's: non-HTML ones not at all, the
+    rest without data: URI payloads, up to max_page_bytes (or until an
+    until-watcher has seen enough). Hosts tripped in host_breaker.BREAKER are not
+    requested at all.
+    """
+
+    def __init__(self, max_in_flight=200, per_host_limit=2, timeout=TIMEOUT):
+        self.max_in_flight = max_in_flight
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self._global = None
+        self._hosts = None
+        self._session = None
+        self._in_flight = {}
+
+    async def __aenter__(self):
+        self._global = asyncio.Semaphore(self.max_in_flight)
+        self._hosts = defaultdict(lambda: asyncio.Semaphore(self.per_host_limit))
+        connector = aiohttp.TCPConnector(limit=self.max_in_flight, limit_per_host=self.per_host_limit,
+                                         ssl=VERIFY_SSL, ttl_dns_cache=300)
+        self._session = aiohttp.ClientSession(
+            headers=HEADERS, connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._session.close()
+
+    async def fetch(self, url, until=None):
+        """Return the body of url as text, or None on any error (like safe_fetch)."""
+        if not url or url == "-":
+            return None
+        if until is not None:
+            return await self._fetch(url, until, keep=False)  # may be cut short: not shared
+        body = RECENT_PAGES.get(url)
+        if body is not MISSING:
+            return body
+        task = self._in_flight.get(url)
+        if task is None:
+            task = self._in_flight[url] = asyncio.ensure_future(self._fetch(url))
+            task.add_done_callback(lambda _: self._in_flight.pop(url, None))
+        # shield: one waiter being cancelled must not cancel the others' fetch
+        return await asyncio.shield(task)
+
+    async def _fetch(self, url, until=None, keep=True):
+        host = urlparse(url).netloc.lower()
+        if not BREAKER.allow(url):
+            return None
+        t0 = time.perf_counter()
+        await SCHEDULER.acquire_async(url)
+        METRICS.observe("politeness_wait_seconds", time.perf_counter() - t0)
+        async with self._hosts[host]:
+            async with self._global:
+                # the host may have tripped while this request queued behind others to it
+                if not BREAKER.allow(url):
+                    return None
+                t0 = time.perf_counter()
+                body, reader, status = None, None, "error"
+                try:
+                    async with self._session.get(url) as resp:
+                        status = str(resp.status)
+                        if resp.status != 200:
+                            pass
+                        elif not is_html(resp.headers.get("Content-Type")):
+                            METRICS.inc("fetch_skipped_total", host=host_of(url), reason="content_type")
+                        else:
+                            reader = BodyReader(resp.charset, until=until)
+                            async for chunk in resp.content.iter_chunked(CHUNK_BYTES):
+                                if reader.feed(chunk):
+                                    break  # leaving the block unread closes the connection
+                            body = reader.text()
+                    BREAKER.success(url)
+                except Exception as e:
+                    BREAKER.failure(url, e)
+                    body = None
+                METRICS.observe("fetch_seconds", time.perf_counter() - t0, host=host_of(url))
+                METRICS.inc("fetch_requests_total", host=host_of(url), status=status)
+                if reader is not None:
+                    reader.record(host_of(url))
+        if keep and body is not None:
+            RECENT_PAGES.put(url, body)
+        return body
+
+
+async def choose_tpo_for_college_async(fetcher, college_row, strict=True, parse_pool=None):
+    """
+    Async twin of choose_tpo_for_college: drives tpo_search with fetcher, analysing
+    pages on parse_pool's processes (or on the loop when it is None).
+    """
+    span = college_span(college_row)
+    search = tpo_search(college_row, strict=strict)
+    try:
+        req = next(search)
+        while True:
+            t0 = time.perf_counter()
+            html = await fetcher.fetch(req.url, until=page_watcher(req))
+            fetched = time.perf_counter()
+            if parse_pool is None:
+                page = analyse_page(html, req.url, req.want_links)
+            else:
+                page = await parse_pool.analyse_async(req, html)
+            page_event(span, req, page, fetched - t0, time.perf_counter() - fetched)
+            req = search.send(page)
+    except StopIteration as done:
+        finish_span(span, done.value)
+        return done.value
+
+
+async def _enrich_all(rows, strict, max_in_flight, per_host_limit, on_result=None, positions=None,
+                      parse_pool=None):
+    results = [None] * len(rows) if on_result is None else None
+    async with AsyncFetcher(max_in_flight=max_in_flight, per_host_limit=per_host_limit) as fetcher:
+        async def one(i, row):
+            try:
+                res = await choose_tpo_for_college_async(fetcher, row, strict=strict, parse_pool=parse_pool)
+            except Exception:
+                res = None
+            out = tpo_columns(row, res)
+            if on_result is not None:
+                on_result(i, out, definitive(res))
+            else:
+                results[i] = out
+
+        if positions is None:
+            await asyncio.gather(*(one(i, r) for i, r in enumerate(rows)))
+            return results
+
+        # positions may block (it is the enrichment window), so pull it off the loop
+        tasks = set()
+        it = iter(positions)
+        while True:
+            i = await asyncio.to_thread(next, it, None)
+            if i is None:
+                break
+            task = asyncio.create_task(one(i, rows[i]))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*list(tasks))
+        return results
+
+
+def enrich_rows_async(rows, strict=True, max_in_flight=200, per_host_limit=2, on_result=None,
+                      positions=None, parse_pool=None):
+    """
+    Enrich a list of row dicts concurrently; results come back in input order.
+    on_result(index, result, definitive) is called on the event loop as each college
+    finishes (and then nothing is returned); definitive says whether the result may
+    be checkpointed (see tpo_auto_enrichment.definitive).
+
+    positions, if given, is an iterable of the indexes to enrich; each college is
+    started as soon as the iterable yields it, so a blocking iterable throttles
+    how many colleges are in progress. parse_pool (a tpo_auto_enrichment.ParsePool)
+    takes page analysis off the event loop.
+    """
+    return asyncio.run(_enrich_all(rows, strict, max_in_flight, per_host_limit, on_result, positions,
+                                   parse_pool))
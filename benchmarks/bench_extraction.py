@@ -0,0 +1,137 @@
+# benchmarks/bench_extraction.py -- per-enricher regex passes vs the shared extractor
+#
+# Usage (from the repo root):
+#   python -m benchmarks.bench_extraction --pages 200
+#
+# Builds college-homepage-sized pages (menus, an inline base64 slider, scripts,
+# tables of staff, a placement section, footer contacts) and times the three old
+# extraction paths against one extraction.PLACEMENT scan per page.
+
+import argparse, base64, random, re, time
+from bs4 import BeautifulSoup
+
+from extraction import PLACEMENT
+from tpo_auto_enrichment import extract_from_html, PLACEMENT_KEYWORDS
+from tpo_enrichment import extract_contacts
+from college_page_parser import search_tpo_in_html
+
+FIRST = ["Ravi", "Suma", "Kiran", "Anil", "Deepa", "Manjunath", "Shreya", "Prakash", "Lakshmi", "Girish"]
+LAST = ["Kumar", "Rao", "Gowda", "Shetty", "Hegde", "Naik", "Patil", "Murthy", "Reddy", "Bhat"]
+DEPTS = ["Computer Science", "Mechanical Engineering", "Civil Engineering", "Electronics", "Mathematics"]
+
+def make_page(n, rnd):
+    name = lambda: f"{rnd.choice(['Dr. ', 'Prof. ', 'Mr. ', 'Mrs. ', ''])}{rnd.choice(FIRST)} {rnd.choice(LAST)}"
+    phone = lambda: f"{rnd.choice(['+91 ', ''])}{rnd.randint(6, 9)}{rnd.randint(10**8, 10**9 - 1)}"
+    slider = base64.b64encode(rnd.randbytes(rnd.randint(30000, 120000))).decode()
+    parts = [f"<!DOCTYPE html><html><head><title>College {n}</title>",
+             "<style>" + "".join(f".c{i}{{margin:{i}px;color:#{i:06x}}}" for i in range(400)) + "</style>",
+             "<script>var menu = {" + ",".join(f"'m{i}': '/page/{i}'" for i in range(300)) + "};</script>",
+             "</head><body><nav><ul>"]
+    parts += [f"<li class='menu-item'><a href='/page/{i}'>Menu Item {i}</a></li>" for i in range(120)]
+    parts.append(f"</ul></nav><div class='slider' style=\"background:url(data:image/jpeg;base64,{slider})\"></div>")
+    for d in DEPTS:
+        parts.append(f"<section><h2>Department of {d}</h2><table><tr><th>Name</th><th>Designation</th><th>Email</th></tr>")
+        for i in range(rnd.randint(15, 40)):
+            parts.append(f"<tr><td>{name()}</td><td>Assistant&nbsp;Professor</td>"
+                         f"<td>staff{n}_{i}@college{n}.edu.in</td></tr>")
+        parts.append("</table></section>")
+    parts.append(f"<section id='placement'><h2>Training &amp; Placement Cell</h2><p>The placement cell "
+                 f"organises campus recruitment drives. Contact the Training and Placement Officer "
+                 f"{name()} at tpo@college{n}.edu.in or {phone()}.</p></section>")
+    parts.append(f"<footer><p>Office: {phone()} | principal@college{n}.edu.in | "
+                 f"080-{rnd.randint(1000, 9999)} {rnd.randint(1000, 9999)}</p></footer></body></html>")
+    return "".join(parts)
+
+# --- the pre-extraction-engine code, kept verbatim for comparison ---------------
+
+L_EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}", re.I)
+L_PHONE_RE = re.compile(r"(?:\+91[\-\s]?)?(?:\d{10}|\d{3}[\-\s]\d{3}[\-\s]\d{4})")
+L_NAME_CANDIDATE_RE = re.compile(r"(?:Mr\.|Mrs\.|Ms\.|Dr\.|Prof\.|Sri\.|Smt\.)?\s?[A-Z][a-z]+(?:\s[A-Z][a-z]+){0,3}")
+L2_EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}")
+L2_PHONE_RE = re.compile(r"(?:\+91[- ]?)?\d{10}")
+L2_NAME_RE = re.compile(r"(Mr\.|Mrs\.|Ms\.|Dr\.|Prof\.|Sri\.|Smt\.)?\s?[A-Z][a-z]+(\s[A-Z][a-z]+){0,3}")
+L_PHONE_UTILS = re.compile(r"(?:\+91[\-\s]?)?(?:\d{10}|\d{3}[\-\s]?\d{3}[\-\s]?\d{4})")
+TPO_LABELS = ["training & placement", "training and placement", "placement officer",
+              "training & placement officer", "tpo", "placement cell", "placement officer"]
+
+def legacy_auto(text):
+    emails = list(set(L_EMAIL_RE.findall(text)))
+    phones = list(set(L_PHONE_RE.findall(text)))
+    blocks = []
+    low = text.lower()
+    for kw in PLACEMENT_KEYWORDS:
+        idx = low.find(kw)
+        if idx != -1:
+            blocks.append(text[max(0, idx - 250):min(len(text), idx + 250)])
+    if not blocks:
+        for p in re.split(r"</p>|<br|</div>", text, flags=re.I)[:5]:
+            if len(p) > 50:
+                blocks.append(p)
+    names = []
+    for block in blocks:
+        for m in L_NAME_CANDIDATE_RE.finditer(block):
+            n = " ".join(m.group().split())
+            if 3 <= len(n) <= 50:
+                names.append(n)
+    return emails, phones, list(dict.fromkeys(names))
+
+def legacy_contacts(html):
+    emails = list(set(L2_EMAIL_RE.findall(html)))
+    phones = list(set(L2_PHONE_RE.findall(html)))
+    names = [" ".join(m.group().split()) for m in L2_NAME_RE.finditer(html)]
+    return emails, phones, list(set(n for n in names if 1 <= len(n.split()) <= 4))
+
+def legacy_tpo_in_soup(html):
+    text = BeautifulSoup(html, "lxml").get_text(" ", strip=True)
+    low = text.lower()
+    idx = None
+    for lbl in TPO_LABELS:
+        idx = low.find(lbl)
+        if idx != -1:
+            break
+    if idx == -1:
+        return None
+    snippet = text[max(0, idx - 300): idx + 400]
+    m = L_PHONE_UTILS.search(snippet)
+    n = re.search(r"(Placement|TPO|Training & Placement|Training and Placement)[:\-\s]*([A-Z][A-Za-z\.\s]{2,80})",
+                  snippet, re.I)
+    return {"name": n.group(2).strip() if n else "-", "phone": m.group(0) if m else "-"}
+
+def timed(fn, pages, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for p in pages:
+            fn(p)
+        secs = time.perf_counter() - t0
+        best = secs if best is None else min(best, secs)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    rnd = random.Random(11)
+    pages = [make_page(n, rnd) for n in range(args.pages)]
+    print(f"[BENCH] {len(pages)} pages, {sum(map(len, pages)) / len(pages) / 1e3:.0f} KB average")
+    cases = [
+        ("tpo_auto extract_from_html", legacy_auto, extract_from_html),
+        ("tpo_enrichment extract_contacts", legacy_contacts, extract_contacts),
+        ("college_page_parser search_tpo", legacy_tpo_in_soup, search_tpo_in_html),
+    ]
+    total_old = 0.0
+    for label, old, new in cases:
+        old_s = timed(old, pages, args.repeat)
+        new_s = timed(new, pages, args.repeat)
+        total_old += old_s
+        print(f"[BENCH] {label:34s} old {1e3 * old_s / len(pages):7.2f} ms/page  "
+              f"new {1e3 * new_s / len(pages):7.2f} ms/page  speedup {old_s / new_s:.1f}x")
+    # what a page now costs when all three enrichers share one scan
+    shared_s = timed(PLACEMENT.scan, pages, args.repeat)
+    print(f"[BENCH] one shared scan: {1e3 * shared_s / len(pages):.2f} ms/page vs "
+          f"{1e3 * total_old / len(pages):.2f} ms/page for the three old passes "
+          f"({total_old / shared_s:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# benchmarks/bench_links.py -- BeautifulSoup two-pass anchor walk vs streaming link extractor
+#
+# Usage (from the repo root):
+#   python -m benchmarks.bench_links --slider-mb 4
+#
+# Builds a college homepage with a multi-megabyte inline slider and a long menu,
+# checks both paths return the same candidates, and reports time and peak Python
+# heap (tracemalloc) for each, with and without the early-stop limit.
+
+import argparse, base64, random, time, tracemalloc
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup
+
+from tpo_auto_enrichment import (find_candidate_pages, normalize_text, is_placement_anchor,
+                                 CONTACT_KEYWORDS)
+
+def make_page(slider_mb, menu=400, seed=5):
+    rnd = random.Random(seed)
+    slides = []
+    per = max(1, int(slider_mb * 1e6 / 8))
+    for i in range(8):
+        img = base64.b64encode(rnd.randbytes(per * 3 // 4)).decode()
+        slides.append(f"<div class='slide'><img src='data:image/jpeg;base64,{img}' alt='Slide {i}'></div>")
+    links = [f"<li><a href='/dept/{i}'>Department <span>{i}</span></a></li>" for i in range(menu)]
+    links.insert(menu // 3, "<li><a href='/placement-cell/'>Training &amp; Placement</a></li>")
+    links.insert(menu // 2, "<li><a href='/contact-us#map'>Contact Us</a></li>")
+    links.insert(2 * menu // 3, "<li><a href='/about/staff'>Our Faculty</a></li>")
+    return ("<html><head><script>var x = 1 < 2;</script></head><body><div class='slider'>"
+            + "".join(slides) + "</div><nav><ul>" + "".join(links) + "</ul></nav>"
+            + "<footer><a href='/careers'>Careers</a></footer></body></html>")
+
+def legacy_candidates(home_html, base_url):
+    """The pre-streaming find_candidate_pages body, kept for comparison."""
+    pages = []
+    soup = BeautifulSoup(home_html, "lxml")
+    for a in soup.find_all("a", href=True):
+        text = normalize_text(a.get_text())
+        if is_placement_anchor(text, a["href"]):
+            pages.append(urljoin(base_url, a["href"]))
+    for a in soup.find_all("a", href=True):
+        text = normalize_text(a.get_text())
+        href = a["href"]
+        if any(k in text.lower() for k in CONTACT_KEYWORDS) or any(k in href.lower() for k in CONTACT_KEYWORDS):
+            pages.append(urljoin(base_url, href))
+    seen, out = set(), []
+    for p in pages:
+        p_n = p.split('#')[0].rstrip('/')
+        if p_n not in seen:
+            seen.add(p_n)
+            out.append(p_n)
+    return out
+
+def measure(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    out = fn()
+    secs = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return secs, peak, out
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--slider-mb", type=float, default=4)
+    parser.add_argument("--menu", type=int, default=400)
+    args = parser.parse_args()
+    html = make_page(args.slider_mb, args.menu)
+    base = "https://college.example.edu"
+    print(f"[BENCH] homepage: {len(html) / 1e6:.1f} MB, {args.menu + 4} links")
+    cases = [("BeautifulSoup two-pass", lambda: legacy_candidates(html, base)),
+             ("streaming, no limit", lambda: find_candidate_pages(html, base, limit=None)),
+             ("streaming, limit=2", lambda: find_candidate_pages(html, base, limit=2))]
+    results = []
+    for label, fn in cases:
+        secs, peak, out = measure(fn)
+        results.append(out)
+        print(f"[BENCH] {label:24s} {secs:6.2f}s  peak heap {peak / 1e6:7.1f} MB  -> {out}")
+    print(f"[BENCH] identical candidates (no limit): {results[0] == results[1]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# benchmarks/bench_loaders.py -- old iterrows loader vs streaming vectorized loader
+#
+# Usage (from the repo root):
+#   python -m benchmarks.bench_loaders --rows 1000000
+#
+# Builds a synthetic AICTE-style national CSV (about 5% Karnataka rows), then runs
+# each path in its own subprocess so peak RSS is measured independently.
+
+import argparse, hashlib, json, os, resource, subprocess, sys, tempfile, time
+import numpy as np
+import pandas as pd
+
+from utils import normalize_text
+from csv_sources import WEBSITE_KEYS
+
+STATES = ["Karnataka", "Tamil Nadu", "Maharashtra", "Kerala", "Uttar Pradesh", "Gujarat",
+          "West Bengal", "Rajasthan", "Telangana", "Andhra Pradesh", "Punjab", "Bihar",
+          "Odisha", "Madhya Pradesh", "Haryana", "Assam", "Delhi", "Goa", "Jharkhand", "Uttarakhand"]
+
+def make_csv(path, rows, seed=7):
+    rng = np.random.default_rng(seed)
+    idx = np.arange(rows)
+    df = pd.DataFrame({
+        "Institute Name": pd.Series(idx).map(lambda i: f"  Institute  of Technology\xa0No {i} "),
+        "State": np.array(STATES)[rng.integers(0, len(STATES), rows)],
+        "City": pd.Series(rng.integers(0, 500, rows)).map(lambda i: f"City {i}"),
+        "District": pd.Series(rng.integers(0, 300, rows)).map(lambda i: f" District  {i}"),
+        "Affiliating University": pd.Series(rng.integers(0, 80, rows)).map(lambda i: f"University {i}"),
+        "Phone": pd.Series(rng.integers(10**9, 10**10 - 1, rows)).astype(str),
+        "Website": pd.Series(idx).map(lambda i: f"www.college{i}.edu.in" if i % 4 else ""),
+    })
+    df.to_csv(path, index=False, encoding="utf-8")
+
+def legacy_parse(csv_path):
+    """
+    The pre-streaming load_aicte_karnataka body, kept for comparison (with the
+    website column the loaders have carried since, looked up the same way).
+    """
+    df = pd.read_csv(csv_path, dtype=str, encoding="utf-8", low_memory=False)
+    def find(cols):
+        for c in df.columns:
+            low = c.lower()
+            for k in cols:
+                if k in low:
+                    return c
+        return None
+    name_col = find(["institute name","institute","inst name","inst"])
+    state_col = find(["state"])
+    city_col = find(["city","place","town"])
+    district_col = find(["district"])
+    univ_col = find(["affiliat","university"])
+    phone_col = find(["phone","telephone","contact"])
+    web_col = find(WEBSITE_KEYS)
+    rows = []
+    for _, r in df.iterrows():
+        state = str(r.get(state_col,"")) if state_col else ""
+        if "karnataka" not in state.lower():
+            continue
+        rows.append({
+            "college_name": normalize_text(r.get(name_col,"-")) or "-",
+            "city_town": normalize_text(r.get(city_col,"-") if city_col else "-") or "-",
+            "district": normalize_text(r.get(district_col,"-") if district_col else "-") or "-",
+            "affiliating_university": normalize_text(r.get(univ_col,"-") if univ_col else "-") or "-",
+            "tpo_name": "-",
+            "tpo_phone": normalize_text(r.get(phone_col,"-") if phone_col else "-") or "-",
+            # blank cells are NaN here; the other columns never have any in this data
+            "website": normalize_text(r.get(web_col) if web_col and pd.notna(r.get(web_col)) else "-") or "-",
+            "source_url": csv_path
+        })
+    return rows
+
+def peak_rss_mb():
+    # VmHWM starts fresh at exec; ru_maxrss can carry over the parent's high-water mark
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def run_one(which, path):
+    t0 = time.perf_counter()
+    if which == "old":
+        rows = legacy_parse(path)
+    else:
+        from aicte_parser import parse_aicte_file
+        rows = parse_aicte_file(path)
+    secs = time.perf_counter() - t0
+    digest = hashlib.sha256(json.dumps(rows, sort_keys=True).encode()).hexdigest()
+    print(json.dumps({"path": which, "seconds": secs, "peak_rss_mb": peak_rss_mb(), "rows": len(rows), "digest": digest}))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--csv", help="reuse an existing synthetic CSV")
+    parser.add_argument("--run", choices=["old", "new"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run:
+        return run_one(args.run, args.csv)
+
+    path = args.csv or os.path.join(tempfile.gettempdir(), f"bench_aicte_{args.rows}.csv")
+    if not os.path.exists(path):
+        print(f"[BENCH] Writing {args.rows} synthetic rows to {path}")
+        make_csv(path, args.rows)
+    print(f"[BENCH] Input: {os.path.getsize(path) / 1e6:.0f} MB")
+    results = {}
+    for which in ["old", "new"]:
+        out = subprocess.run([sys.executable, "-m", "benchmarks.bench_loaders", "--run", which, "--csv", path],
+                             capture_output=True, text=True, check=True)
+        results[which] = json.loads(out.stdout.strip().splitlines()[-1])
+        r = results[which]
+        print(f"[BENCH] {which:>3}: {r['seconds']:7.2f}s  peak RSS {r['peak_rss_mb']:7.0f} MB  {r['rows']} rows")
+    same = results["old"]["digest"] == results["new"]["digest"]
+    print(f"[BENCH] speedup {results['old']['seconds'] / results['new']['seconds']:.1f}x, "
+          f"identical output: {same}")
+
+if __name__ == "__main__":
+    main()
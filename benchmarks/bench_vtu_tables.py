@@ -0,0 +1,68 @@
+# benchmarks/bench_vtu_tables.py -- BeautifulSoup table walk vs lxml event extractor
+#
+# Usage (from the repo root):
+#   python -m benchmarks.bench_vtu_tables --rows 50000
+#
+# Builds a VTU-style affiliated-institutes page (several region tables, cell markup,
+# entities, inline scripts) and checks both paths return identical rows.
+
+import argparse, random, time
+from bs4 import BeautifulSoup
+
+from utils import normalize_text
+from vtu_parser import iter_vtu_rows, vtu_row
+
+def make_page(rows, tables=4, seed=3):
+    rnd = random.Random(seed)
+    parts = ["<html><head><script>var t = a < b;</script><style>td{padding:2px}</style></head><body>"]
+    per = rows // tables
+    for t in range(tables):
+        parts.append(f"<h2>Region {t}</h2><table class='tablepress'><thead><tr>"
+                     "<th>Institute</th><th>Place</th><th>District</th><th>Code</th></tr></thead><tbody>")
+        for i in range(per):
+            n = t * per + i
+            parts.append(
+                f"<tr class='row-{n}'><td class='column-1'><a href='/c/{n}'>{rnd.choice(['SJB', 'RV', 'BMS', 'PES'])}"
+                f" Institute&nbsp;of  Technology {n}</a></td><td class='column-2'> Place {n % 97} </td>"
+                f"<td class='column-3'><span>District</span> {n % 31}</td><td>1{n:05d}</td></tr>")
+        parts.append("</tbody></table>")
+    parts.append("</body></html>")
+    return "".join(parts)
+
+def legacy_rows(html, source):
+    """The pre-lxml parse_html_tables body, kept for comparison."""
+    soup = BeautifulSoup(html, "lxml")
+    rows = []
+    for table in soup.find_all("table"):
+        trs = table.find_all("tr")
+        if len(trs) < 2:
+            continue
+        for tr in trs[1:]:
+            cols = [normalize_text(td.get_text()) for td in tr.find_all("td")]
+            if len(cols) >= 3:
+                rows.append(vtu_row(cols, source))
+    return rows
+
+def timed(fn, repeat):
+    best, out = None, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        secs = time.perf_counter() - t0
+        best = secs if best is None else min(best, secs)
+    return best, out
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    html = make_page(args.rows)
+    print(f"[BENCH] page: {len(html) / 1e6:.1f} MB, {args.rows} rows")
+    old_s, old = timed(lambda: legacy_rows(html, "bench"), args.repeat)
+    new_s, new = timed(lambda: list(iter_vtu_rows(html, "bench")), args.repeat)
+    print(f"[BENCH] BeautifulSoup: {old_s:.2f}s  lxml events: {new_s:.2f}s  "
+          f"speedup {old_s / new_s:.1f}x, identical output: {old == new} ({len(new)} rows)")
+
+if __name__ == "__main__":
+    main()
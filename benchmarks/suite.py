@@ -0,0 +1,247 @@
+# benchmarks/suite.py -- offline end-to-end benchmark suite against the synthetic web
+#
+# Usage (from the repo root):
+#   python -m benchmarks.suite                       # run, compare with baseline.json
+#   python -m benchmarks.suite --colleges 500 --scenarios enrich_threads,vtu
+#   python -m benchmarks.suite --save-baseline       # record this run as the baseline
+#
+# Serves benchmarks.synthetic_web from this process and runs every scenario in its
+# own subprocess, in a fresh working directory whose config.json points every
+# source URL at the stand-in server (so caches, manifests and peak RSS start cold).
+# Reported per scenario: wall time, throughput, p50/p99 latency per college, pages
+# fetched per college and peak RSS. A run is only compared with the baseline when
+# it used the baseline's settings (the defaults match the committed baseline).
+
+import argparse, csv, json, os, resource, shutil, subprocess, sys, tempfile, time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(REPO, "benchmarks", "baseline.json")
+SCENARIOS = ["gather", "vtu", "enrich_threads", "enrich_async", "enrich_dataset"]
+# metrics where bigger is better; the rest (seconds, latency, pages, RSS) should shrink
+HIGHER_IS_BETTER = {"throughput", "rows", "colleges", "found", "parse_rows_per_second"}
+# run settings that don't change what a scenario measures
+UNCOMPARED_SETTINGS = {"scenarios", "child", "port", "save_baseline", "baseline"}
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+def bench_config(port, args):
+    with open(os.path.join(REPO, "config.json"), encoding="utf-8") as f:
+        cfg = json.load(f)
+    src = f"http://127.0.0.1:{port}"
+    cfg.update({
+        "aicte_urls": [f"{src}/aicte.csv"],
+        "ugc_urls": [f"{src}/ugc.csv"],
+        "vtu_ajax": f"{src}/vtu.html",
+        "vtu_region_pages": [f"{src}/vtu-region-{r}.html" for r in range(4)],
+        "enrich_timeout_seconds": args.timeout,
+        "timeout_seconds": args.timeout,
+    })
+    cfg["politeness"] = dict(cfg.get("politeness", {}), rate_per_second=args.rate, burst=2)
+    return cfg
+
+# --- scenarios (run inside the child process, cwd = scratch dir) ----------------
+
+def college_frame(n, port):
+    import pandas as pd
+    from benchmarks.synthetic_web import SyntheticWeb
+    web = SyntheticWeb(n)
+    web.port = port
+    return web, pd.DataFrame({"college_name": web.names, "website": [web.url(i) for i in range(n)],
+                              "district": "-", "source_url": "-"})
+
+def timed_searches(latencies):
+    """Wrap tpo_search (for both engines) to record each college's search time."""
+    import tpo_auto_enrichment, async_fetch
+    inner = tpo_auto_enrichment.tpo_search
+
+    def tpo_search(row, strict=True, budget=None):
+        t0 = time.monotonic()
+        res = yield from inner(row, strict=strict, budget=budget)
+        latencies.append(time.monotonic() - t0)
+        return res
+    tpo_auto_enrichment.tpo_search = async_fetch.tpo_search = tpo_search
+
+def run_enrich(args, mode):
+    from tpo_auto_enrichment import auto_enrich_dataframe
+    _, df = college_frame(args.colleges, args.port)
+    latencies = []
+    timed_searches(latencies)
+    t0 = time.monotonic()
+    out = auto_enrich_dataframe(df, max_workers=args.workers, mode=mode, checkpoint=None,
+                                parse_workers=args.parse_workers)
+    secs = time.monotonic() - t0
+    found = int((out["TPO_EMAIL"] != "-").sum() + ((out["TPO_EMAIL"] == "-") & (out["TPO_PHONE"] != "-")).sum())
+    return {"colleges": len(out), "seconds": secs, "latencies": latencies,
+            "pages": out["tpo_pages_fetched"].astype(int).tolist(), "found": found}
+
+def run_enrich_dataset(args):
+    # websites are resolved by website_index from the seed file run_child wrote
+    import tpo_enrichment, http_client
+    web, df = college_frame(args.dataset_colleges, args.port)
+    latencies, fetched = [], []
+    inner_contacts, inner_get = tpo_enrichment.site_contacts, http_client.safe_get
+
+    def site_contacts(website):
+        t0, before = time.monotonic(), len(fetched)
+        res = inner_contacts(website)
+        latencies.append(time.monotonic() - t0)
+        fetched.append(len(fetched) - before)
+        return res
+
+    def safe_get(url, *a, **kw):
+        fetched.append(None)
+        return inner_get(url, *a, **kw)
+    tpo_enrichment.site_contacts, http_client.safe_get = site_contacts, safe_get
+    t0 = time.monotonic()
+    out = tpo_enrichment.enrich_dataset(df)
+    secs = time.monotonic() - t0
+    pages = [p for p in fetched if p is not None]
+    return {"colleges": len(out), "seconds": secs, "latencies": latencies, "pages": pages,
+            "found": int((out["emails_found"] != "-").sum())}
+
+def run_gather(args):
+    import main
+    t0 = time.monotonic()
+    df = main.gather()
+    return {"rows": len(df), "seconds": time.monotonic() - t0}
+
+def run_vtu(args):
+    import vtu_parser
+    t0 = time.monotonic()
+    rows = vtu_parser.parse_vtu_region_pages()
+    fetch_parse = time.monotonic() - t0
+    html = vtu_parser.fetch_text(vtu_parser.VTU_AJAX)
+    t0 = time.monotonic()
+    parsed = sum(1 for _ in vtu_parser.iter_vtu_rows(html, "bench"))
+    return {"rows": len(rows), "seconds": fetch_parse, "parse_seconds": time.monotonic() - t0,
+            "parsed_rows": parsed}
+
+def run_scenario(name, args):
+    runners = {"gather": run_gather, "vtu": run_vtu, "enrich_dataset": run_enrich_dataset,
+               "enrich_threads": lambda a: run_enrich(a, "threads"),
+               "enrich_async": lambda a: run_enrich(a, "async")}
+    raw = runners[name](args)
+    out = {"seconds": round(raw["seconds"], 3)}
+    if "colleges" in raw:
+        lat, pages = raw["latencies"], raw["pages"]
+        out.update({
+            "colleges": raw["colleges"], "found": raw["found"],
+            "throughput": round(raw["colleges"] / max(raw["seconds"], 1e-9), 2),
+            "p50_latency": round(percentile(lat, 50) or 0, 3),
+            "p99_latency": round(percentile(lat, 99) or 0, 3),
+            "pages_per_college": round(sum(pages) / max(len(pages), 1), 2),
+        })
+    else:
+        out["rows"] = raw["rows"]
+        out["throughput"] = round(raw["rows"] / max(raw["seconds"], 1e-9), 1)
+        if "parse_seconds" in raw:
+            out["parse_rows_per_second"] = round(raw["parsed_rows"] / max(raw["parse_seconds"], 1e-9))
+    out["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return out
+
+# --- driver --------------------------------------------------------------------
+
+def child_env():
+    env = {k: v for k, v in os.environ.items() if "proxy" not in k.lower()}
+    env["PYTHONPATH"] = REPO + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+def run_child(name, args, port, web):
+    work = tempfile.mkdtemp(prefix=f"bench-{name}-")
+    try:
+        with open(os.path.join(work, "config.json"), "w", encoding="utf-8") as f:
+            json.dump(bench_config(port, args), f)
+        with open(os.path.join(work, "website_seeds.csv"), "w", encoding="utf-8", newline="") as f:
+            out = csv.writer(f)
+            out.writerow(["college_name", "website"])
+            out.writerows((n, web.url(i)) for i, n in enumerate(web.names))
+        cmd = [sys.executable, "-m", "benchmarks.suite", "--child", name, "--port", str(port),
+               "--colleges", str(args.colleges), "--dataset-colleges", str(args.dataset_colleges),
+               "--workers", str(args.workers), "--parse-workers", str(args.parse_workers)]
+        proc = subprocess.run(cmd, cwd=work, env=child_env(), capture_output=True, text=True)
+        for line in proc.stdout.splitlines():
+            if line.startswith("[RESULT] "):
+                return json.loads(line[len("[RESULT] "):])
+        print(f"[SUITE] {name} failed:\n{proc.stdout[-2000:]}\n{proc.stderr[-2000:]}")
+        return None
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+def run_settings(args):
+    return {k: v for k, v in vars(args).items() if k not in UNCOMPARED_SETTINGS}
+
+def compare(results, baseline, settings):
+    """Print each scenario's changes against baseline (a saved suite run), if comparable."""
+    differ = {k: (v, settings.get(k)) for k, v in baseline.get("settings", {}).items()
+              if k not in UNCOMPARED_SETTINGS and settings.get(k) != v}
+    if differ:
+        print("[SUITE] not compared with the baseline, its settings differ: " +
+              ", ".join(f"{k} {b} (now {v})" for k, (b, v) in sorted(differ.items())))
+        return
+    for name, res in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not res or not base:
+            continue
+        diffs = []
+        for k, v in res.items():
+            b = base.get(k)
+            if not isinstance(v, (int, float)) or not isinstance(b, (int, float)) or not b:
+                continue
+            change = (v - b) / b * 100
+            better = change > 0 if k in HIGHER_IS_BETTER else change < 0
+            if abs(change) >= 5:
+                diffs.append(f"{k} {b}->{v} ({change:+.0f}%{', better' if better else ', WORSE'})")
+        print(f"[SUITE] vs baseline {name}: " + ("; ".join(diffs) if diffs else "within 5%"))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--colleges", type=int, default=300)
+    parser.add_argument("--dataset-colleges", type=int, default=100,
+                        help="enrich_dataset is sequential; it gets a smaller share")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--latency-ms", type=float, default=30, help="added to every response")
+    parser.add_argument("--slow-seconds", type=float, default=2.0, help="extra delay of 'slow' sites")
+    parser.add_argument("--timeout", type=float, default=5)
+    parser.add_argument("--rate", type=float, default=2.0, help="politeness requests/second per host")
+    parser.add_argument("--workers", type=int, default=6)
+    parser.add_argument("--parse-workers", default="0")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.parse_workers != "auto":
+        args.parse_workers = int(args.parse_workers)
+
+    if args.child:
+        print("[RESULT] " + json.dumps(run_scenario(args.child, args)), flush=True)
+        return
+
+    from benchmarks.synthetic_web import SyntheticWeb, serve_in_background
+    web = SyntheticWeb(max(args.colleges, args.dataset_colleges), slow_seconds=args.slow_seconds)
+    server = serve_in_background(web, latency=args.latency_ms / 1000)
+    print(f"[SUITE] synthetic web: {web.colleges} colleges on port {web.port}, "
+          f"{args.latency_ms:.0f} ms latency")
+    results = {}
+    for name in args.scenarios.split(","):
+        res = run_child(name, args, web.port, web)
+        results[name] = res
+        if res:
+            print(f"[SUITE] {name}: " + ", ".join(f"{k}={v}" for k, v in res.items()), flush=True)
+    server.shutdown()
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            compare(results, json.load(f), run_settings(args))
+    if args.save_baseline:
+        settings = dict(run_settings(args), scenarios=args.scenarios)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"settings": settings, "results": results}, f, indent=2)
+        print("[SUITE] baseline saved to", args.baseline)
+
+if __name__ == "__main__":
+    main()
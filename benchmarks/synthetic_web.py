@@ -0,0 +1,219 @@
+# benchmarks/synthetic_web.py -- offline stand-in for thousands of college websites
+#
+# Usage (from the repo root), to browse or point other tools at it:
+#   python -m benchmarks.synthetic_web --colleges 2000 --port 8765 --latency-ms 50
+#
+# Every college gets its own loopback address (127.A.B.C) so per-host politeness,
+# connection pooling and the per-host limits behave as they do against real sites,
+# all served by one ThreadingHTTPServer. Pages are rendered on request from a seeded
+# RNG, so thousands of sites cost no memory and every run sees the same web.
+#
+# Site kinds: normal (placement page with TPO details), contact_only (details one hop
+# behind the contact page), no_tpo, slow, redirect (homepage 301s), dead (404 for
+# everything) and oversized (multi-megabyte homepage). 127.0.0.1 also serves the
+# source data: /aicte.csv, /ugc.csv, /vtu.html and /vtu-region-N.html.
+
+import argparse, base64, io, random, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+KINDS = [("normal", 45), ("contact_only", 15), ("no_tpo", 15), ("slow", 8),
+         ("redirect", 7), ("dead", 5), ("oversized", 5)]
+
+FIRST = ["Ravi", "Suma", "Kiran", "Anil", "Deepa", "Manjunath", "Shreya", "Prakash", "Lakshmi", "Girish"]
+LAST = ["Kumar", "Rao", "Gowda", "Shetty", "Hegde", "Naik", "Patil", "Murthy", "Reddy", "Bhat"]
+TOWNS = ["Bengaluru", "Mysuru", "Mangaluru", "Hubballi", "Belagavi", "Kalaburagi", "Davanagere",
+         "Ballari", "Tumakuru", "Shivamogga", "Udupi", "Hassan"]
+STATES = ["Karnataka", "Tamil Nadu", "Maharashtra", "Kerala", "Telangana", "Andhra Pradesh", "Goa"]
+TYPES = ["Institute of Technology", "College of Engineering", "First Grade College",
+         "Institute of Management", "Polytechnic", "College of Arts and Science"]
+
+def college_host(i):
+    """Loopback address of college i (127.1.0.1 upwards)."""
+    n = i + 1
+    return f"127.{1 + (n >> 16) % 254}.{(n >> 8) & 255}.{n & 255}"
+
+class SyntheticWeb:
+    def __init__(self, colleges=2000, seed=21, slow_seconds=2.0, oversized_mb=5.0):
+        self.colleges = colleges
+        self.seed = seed
+        self.slow_seconds = slow_seconds
+        self.oversized_mb = oversized_mb
+        # separate streams, so college i is the same however many colleges there are
+        kinds, weights = zip(*KINDS)
+        self.kinds = random.Random(f"{seed}:kinds").choices(kinds, weights, k=colleges)
+        rnd = random.Random(f"{seed}:names")
+        self.names = [f"{rnd.choice(['Sri', 'SJB', 'RV', 'BMS', 'PES', 'KLE', 'JSS', 'NMAM'])} "
+                      f"{TYPES[i % len(TYPES)]} {TOWNS[i % len(TOWNS)]} {i}" for i in range(colleges)]
+        self.hosts = {college_host(i): i for i in range(colleges)}
+
+    def url(self, i, path="/"):
+        return f"http://{college_host(i)}:{self.port}{path}"
+
+    # --- college sites -------------------------------------------------------
+
+    def _person(self, rnd):
+        return f"{rnd.choice(['Dr. ', 'Prof. ', 'Mr. ', 'Mrs. '])}{rnd.choice(FIRST)} {rnd.choice(LAST)}"
+
+    def _phone(self, rnd):
+        return f"+91 {rnd.randint(6, 9)}{rnd.randint(10**8, 10**9 - 1)}"
+
+    def _shell(self, i, body, rnd, menu=60):
+        links = [f"<li><a href='/dept/{d}'>Department of {d.title()}</a></li>"
+                 for d in ("cse", "ece", "mech", "civil")]
+        links += [f"<li><a href='/news/{n}'>News item {n}</a></li>" for n in range(menu)]
+        links += ["<li><a href='/about'>About</a></li>", "<li><a href='/gallery'>Gallery</a></li>"]
+        return (f"<!DOCTYPE html><html><head><title>{self.names[i]}</title>"
+                "<style>" + "".join(f".c{k}{{margin:{k}px}}" for k in range(150)) + "</style>"
+                "<script>var menu = [" + ",".join(str(k) for k in range(300)) + "];</script></head>"
+                f"<body><nav><ul>{''.join(links)}</ul></nav><main>{body}</main>"
+                f"<footer>Office: {self._phone(rnd)} | principal@college{i}.edu.in</footer></body></html>")
+
+    def college_page(self, i, path):
+        """(status, headers, body bytes, delay seconds) for a path on college i's site."""
+        kind = self.kinds[i]
+        rnd = random.Random(f"{self.seed}:{i}:{path}")
+        delay = self.slow_seconds if kind == "slow" else 0.0
+        if kind == "dead":
+            return 404, {}, b"not found", delay
+        if kind == "redirect" and path == "/":
+            return 301, {"Location": "/home"}, b"", delay
+        if path in ("/", "/home"):
+            links = ["<a href='/contact-us'>Contact Us</a>", "<a href='/faculty'>Faculty</a>"]
+            if kind in ("normal", "slow", "redirect", "oversized"):
+                links.insert(0, "<a href='/placement-cell'>Training &amp; Placement</a>")
+            body = "<h1>Welcome</h1><p>" + " | ".join(links) + "</p>"
+            if kind == "oversized":
+                blob = base64.b64encode(rnd.randbytes(int(self.oversized_mb * 1e6 * 3 / 4))).decode()
+                body = f"<div class='slider'><img src='data:image/jpeg;base64,{blob}'></div>" + body
+            return 200, {}, self._shell(i, body, rnd).encode(), delay
+        if path == "/placement-cell" and kind in ("normal", "slow", "redirect", "oversized"):
+            body = (f"<h2>Training and Placement Cell</h2><p>Training and Placement Officer: "
+                    f"{self._person(rnd)}</p><p>Email: placement@college{i}.edu.in, Phone: {self._phone(rnd)}</p>")
+            return 200, {}, self._shell(i, body, rnd).encode(), delay
+        if path == "/contact-us":
+            body = "<h2>Contact</h2><p>General enquiries: " + self._phone(rnd) + "</p>"
+            if kind == "contact_only":
+                body += "<p><a href='/tpo-desk'>Reach our TPO</a></p>"
+            return 200, {}, self._shell(i, body, rnd).encode(), delay
+        if path == "/tpo-desk" and kind == "contact_only":
+            body = (f"<h2>Placement Officer</h2><p>{self._person(rnd)}, Training and Placement Officer, "
+                    f"tpo@college{i}.edu.in, {self._phone(rnd)}</p>")
+            return 200, {}, self._shell(i, body, rnd).encode(), delay
+        if path in ("/faculty", "/about", "/gallery") or path.startswith(("/dept/", "/news/")):
+            rows = "".join(f"<tr><td>{self._person(rnd)}</td><td>Assistant Professor</td></tr>" for _ in range(20))
+            return 200, {}, self._shell(i, f"<table>{rows}</table>", rnd).encode(), delay
+        return 404, {}, b"not found", delay
+
+    # --- source data ---------------------------------------------------------
+
+    def source_csv(self, name_col, state_col, rows_per_college=3):
+        """AICTE/UGC-style national CSV: every college, plus other-state filler rows."""
+        rnd = random.Random(f"{self.seed}:{name_col}")
+        out = io.StringIO()
+        out.write(f"{name_col},{state_col},City,District,Affiliating University,Phone,Website\n")
+        for i, name in enumerate(self.names):
+            town = TOWNS[i % len(TOWNS)]
+            # the two sources spell some names differently, for the entity resolver
+            shown = name.replace("Institute of Technology", "Inst. of Tech.") if rnd.random() < 0.2 else name
+            out.write(f"\"{shown}\",Karnataka,{town},{town},VTU,{rnd.randint(10**9, 10**10 - 1)},{self.url(i)}\n")
+            for k in range(rows_per_college - 1):
+                out.write(f"\"Other College {i}-{k}\",{rnd.choice(STATES[1:])},City {k},District {k},"
+                          f"University {k},{rnd.randint(10**9, 10**10 - 1)},-\n")
+        return out.getvalue().encode()
+
+    def vtu_page(self, region=None, regions=4):
+        """VTU affiliated-institutes table page (all colleges, or one region's share)."""
+        parts = ["<html><head><script>var t = a < b;</script></head><body>"]
+        for r in range(regions):
+            if region is not None and r != region:
+                continue
+            parts.append(f"<h2>Region {r}</h2><table class='tablepress'><thead><tr><th>Institute</th>"
+                         "<th>Place</th><th>District</th><th>Code</th></tr></thead><tbody>")
+            for i in range(r, self.colleges, regions):
+                town = TOWNS[i % len(TOWNS)]
+                parts.append(f"<tr><td><a href='{self.url(i)}'>{self.names[i]}</a></td><td>{town}</td>"
+                             f"<td>{town}</td><td>1{i:05d}</td></tr>")
+            parts.append("</tbody></table>")
+        parts.append("</body></html>")
+        return "".join(parts).encode()
+
+    def source_page(self, path):
+        if path == "/aicte.csv":
+            return self.source_csv("Institute Name", "State")
+        if path == "/ugc.csv":
+            return self.source_csv("College Name", "State Name")
+        if path == "/vtu.html":
+            return self.vtu_page()
+        if path.startswith("/vtu-region-") and path.endswith(".html"):
+            return self.vtu_page(region=int(path[len("/vtu-region-"):-len(".html")]))
+        return None
+
+def make_server(web, port=0, latency=0.0):
+    """ThreadingHTTPServer for web on every loopback address; latency is added to each response."""
+    source_cache = {}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if not self.client_address[0].startswith("127."):
+                return self._send(403, {}, b"")
+            host = self.connection.getsockname()[0]
+            path = self.path.split("?")[0]
+            if host == "127.0.0.1":
+                with lock:
+                    if path not in source_cache:
+                        source_cache[path] = web.source_page(path)
+                body = source_cache[path]
+                status, headers, delay = (200, {}, 0.0) if body is not None else (404, {}, 0.0)
+                body = body if body is not None else b"not found"
+                ctype = "text/csv" if path.endswith(".csv") else "text/html; charset=utf-8"
+            else:
+                i = web.hosts.get(host)
+                if i is None:
+                    return self._send(404, {}, b"no such college")
+                status, headers, body, delay = web.college_page(i, path)
+                ctype = "text/html; charset=utf-8"
+            time.sleep(latency + delay)
+            self._send(status, dict(headers, **{"Content-Type": ctype}), body)
+
+        def _send(self, status, headers, body):
+            self.send_response(status)
+            for k, v in headers.items():
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 1024
+
+    # 0.0.0.0 so every 127.x.y.z address reaches us; non-loopback clients get 403
+    server = Server(("0.0.0.0", port), Handler)
+    web.port = server.server_address[1]
+    return server
+
+def serve_in_background(web, port=0, latency=0.0):
+    server = make_server(web, port, latency)
+    threading.Thread(target=server.serve_forever, name="synthetic-web", daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--colleges", type=int, default=2000)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--seed", type=int, default=21)
+    args = parser.parse_args()
+    web = SyntheticWeb(args.colleges, seed=args.seed)
+    server = make_server(web, args.port, args.latency_ms / 1000)
+    print(f"[WEB] {args.colleges} colleges, e.g. {web.url(0)} ; sources at http://127.0.0.1:{web.port}/aicte.csv")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# checkpoint.py -- durable per-college results so an interrupted enrichment can resume
+#
+# auto_enrich_dataframe records every college's result here the moment it finishes
+# (one committed SQLite row each, WAL mode). A re-run looks the colleges up first and
+# only searches the ones that are missing; run_tpo_auto.py --force recomputes them all.
+#
+# Entries are keyed by a hash of the input row plus the strict flag, so a college
+# whose input columns changed is searched again.
+
+import os, json, time, sqlite3, threading
+from manifest import CACHE_DIR, rows_hash
+
+CHECKPOINT_PATH = os.path.join(CACHE_DIR, "enrich_checkpoint.sqlite")
+
+def row_key(row, strict=True):
+    return rows_hash([row, bool(strict)])
+
+class Checkpoint:
+    def __init__(self, path=CHECKPOINT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = None
+
+    def _conn(self):
+        # opened on first use and shared by the worker threads (writes are serialized)
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY, result TEXT NOT NULL, finished_at REAL NOT NULL)""")
+            conn.commit()
+            self._db = conn
+        return self._db
+
+    def load(self, keys):
+        """{key: result} for those of keys that already have a stored result."""
+        keys = list(keys)
+        found = {}
+        with self._lock:
+            conn = self._conn()
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                sql = f"SELECT key, result FROM results WHERE key IN ({','.join('?' * len(batch))})"
+                for key, result in conn.execute(sql, batch):
+                    found[key] = json.loads(result)
+        return found
+
+    def put(self, key, result):
+        blob = json.dumps(result, ensure_ascii=False, default=str)
+        with self._lock:
+            conn = self._conn()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO results (key, result, finished_at) VALUES (?,?,?)",
+                             (key, blob, time.time()))
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+CHECKPOINT = Checkpoint()
@@ -1,7 +1,9 @@
 # college_page_parser.py -- heuristics to extract TPO name and phone from college website pages
 
-from scraper_core import fetch_html, soupify
-from utils import extract_phone, normalize_text
+from scraper_core import fetch_text
+from host_breaker import HostDownError
+from utils import normalize_text
+from extraction import Extractor
 from urllib.parse import urljoin, urlparse
 import re, time
 
@@ -11,6 +13,9 @@ CANDIDATE_PATHS = ["/placement", "/placement-cell", "/placementcell", "/placemen
 TPO_LABELS = ["training & placement", "training and placement", "placement officer",
               "training & placement officer", "tpo", "placement cell", "placement officer"]
 
+# one scan per page finds every label and phone with its offset (see extraction.py)
+TPO_SCAN = Extractor(TPO_LABELS, name="tpo_labels")
+
 def discover_and_extract_tpo(entry, max_attempts=5):
     """
     entry: dict containing at least college_name and possibly source_url or website
@@ -36,11 +41,10 @@ def discover_and_extract_tpo(entry, max_attempts=5):
     # Preferred: if entry has 'college_website' or 'website' field, try it
     for url in website_candidates:
         try:
-            html = fetch_html(url)
+            html = fetch_text(url)
         except Exception:
             continue
-        soup = soupify(html)
-        tpo = search_tpo_in_soup(soup)
+        tpo = search_tpo_in_html(html)
         if tpo:
             entry["tpo_name"] = tpo.get("name","-")
             entry["tpo_phone"] = tpo.get("phone","-")
@@ -55,11 +59,12 @@ def discover_and_extract_tpo(entry, max_attempts=5):
         for p in CANDIDATE_PATHS:
             url = urljoin(base, p)
             try:
-                html = fetch_html(url)
+                html = fetch_text(url)
+            except HostDownError:
+                break  # the domain is dead or unresponsive; its other paths would fail too
             except Exception:
                 continue
-            soup = soupify(html)
-            tpo = search_tpo_in_soup(soup)
+            tpo = search_tpo_in_html(html)
             if tpo:
                 entry["tpo_name"] = tpo.get("name","-")
                 entry["tpo_phone"] = tpo.get("phone","-")
@@ -71,25 +76,27 @@ def discover_and_extract_tpo(entry, max_attempts=5):
     entry["tpo_phone"] = entry.get("tpo_phone","-") or "-"
     return entry
 
-def search_tpo_in_soup(soup):
+def search_tpo_in_html(html):
     """
-    Search the soup text for TPO patterns and phone numbers; return dict with name and phone if found.
+    Search the page text for TPO patterns and phone numbers; return dict with name and phone if found.
     """
-    text = soup.get_text(" ", strip=True)
-    low = text.lower()
-    # find a block around keywords
-    idx = None
-    for lbl in TPO_LABELS:
-        idx = low.find(lbl)
-        if idx != -1:
-            break
-    if idx == -1:
+    return tpo_from_scan(TPO_SCAN.scan(html))
+
+def search_tpo_in_soup(soup):
+    """search_tpo_in_html for an already-parsed page."""
+    return tpo_from_scan(TPO_SCAN.scan_text(soup.get_text(" ", strip=True)))
+
+def tpo_from_scan(ex):
+    if not ex.keywords:
         return None
+    # labels earlier in TPO_LABELS win; among equals, the first on the page
+    rank = {lbl: i for i, lbl in reversed(list(enumerate(TPO_LABELS)))}
+    idx = min(ex.keywords, key=lambda k: (rank.get(k.value, len(TPO_LABELS)), k.start)).start
     # take snippet
     start = max(0, idx-300)
-    snippet = text[start: idx+400]
-    phone = extract_phone(snippet)
+    snippet = ex.text[start: idx+400]
+    phone = next((h.value for h in ex.phones if start <= h.start and h.start + len(h.value) <= idx + 400), "-")
     # try to extract name via regex: look for "Placement Officer: Name"
     m = re.search(r"(Placement|TPO|Training & Placement|Training and Placement)[:\-\s]*([A-Z][A-Za-z\.\s]{2,80})", snippet, re.I)
     name = m.group(2).strip() if m else "-"
-    return {"name": normalize_text(name), "phone": phone or "-"}
+    return {"name": normalize_text(name), "phone": phone}
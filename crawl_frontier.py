@@ -0,0 +1,112 @@
+# crawl_frontier.py -- best-first page frontier and per-college crawl budgets
+#
+# tpo_search used to fetch every candidate page of a site in list order (plus the
+# homepage), stopping only on a strong hit, so a college without TPO details cost
+# dozens of fetches. Now candidates go into a Frontier ordered by predicted yield
+# (link class, anchor text, URL path, depth) and each college gets a CrawlBudget:
+# at most max_pages fetches and a wall-clock deadline. Settings are the "crawl"
+# block of config.json.
+
+import heapq, time
+from collections import defaultdict
+from urllib.parse import urlparse
+from sources import CONFIG
+
+CRAWL = CONFIG.get("crawl", {})
+
+# words that make a link more (or less) likely to lead to the TPO's details
+STRONG_WORDS = ["placement", "tpo", "training", "career", "recruit"]
+PERSON_WORDS = ["officer", "coordinator", "contact", "cell", "head"]
+WEAK_PATHS = ["news", "event", "gallery", "photo", "notice", "circular", "download", "alumni"]
+SKIP_EXTENSIONS = (".pdf", ".jpg", ".jpeg", ".png", ".gif", ".zip", ".rar", ".doc", ".docx",
+                   ".xls", ".xlsx", ".ppt", ".pptx", ".mp4", ".mp3")
+
+# base yield by html_links priority class (placement, contact, department)
+CLASS_WEIGHT = {0: 10.0, 1: 5.0, 2: 2.0}
+
+def predict_yield(url, text="", priority=None, depth=1):
+    """
+    Higher is more promising. Links to documents and media, and anything that is
+    not an http(s) page (mailto:, tel:, javascript:), are not worth a fetch (None).
+    """
+    parts = urlparse(url)
+    path = parts.path.lower()
+    if parts.scheme not in ("http", "https") or path.endswith(SKIP_EXTENSIONS):
+        return None
+    text = (text or "").lower()
+    score = CLASS_WEIGHT.get(priority, 0.0)
+    score += 3.0 * sum(w in path for w in STRONG_WORDS[:3])
+    score += 2.0 * sum(w in text for w in STRONG_WORDS[:3])
+    score += 1.0 * sum(w in text or w in path for w in PERSON_WORDS)
+    score -= 6.0 * sum(w in path for w in WEAK_PATHS)
+    score -= 0.5 * max(0, path.strip("/").count("/") - 1)   # deep paths are rarer hits
+    score -= 4.0 * max(0, depth - 1)                        # second hop costs more
+    return score
+
+class CrawlBudget:
+    """
+    Pages and seconds one college may spend; max_pages/seconds None means unlimited.
+    The clock starts at the first spend(), i.e. the college's first fetch, not when
+    the search was created (it may sit queued behind other colleges until then).
+    """
+
+    def __init__(self, max_pages=None, seconds=None):
+        self.max_pages = max_pages
+        self.seconds = seconds
+        self.deadline = None
+        self.pages = 0
+
+    @classmethod
+    def from_config(cls, cfg=CRAWL):
+        return cls(max_pages=cfg.get("max_pages_per_college", 8),
+                   seconds=cfg.get("deadline_seconds_per_college", 60))
+
+    def exhausted(self):
+        if self.max_pages is not None and self.pages >= self.max_pages:
+            return True
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def spend(self):
+        if self.pages == 0 and self.seconds is not None:
+            self.deadline = time.monotonic() + self.seconds
+        self.pages += 1
+
+# each URL already queued from the same directory lowers the next one's yield by this
+SIBLING_PENALTY = 2.0
+
+class Frontier:
+    """
+    Max-heap of URLs by predicted yield; ties keep insertion order. URLs are queued
+    once, and runs of sibling pages (news/1, news/2, ...) are spread out so one
+    listing can't use up a college's whole budget.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._seen = set()
+        self._seq = 0
+        self._dirs = defaultdict(int)
+
+    def push(self, url, text="", priority=None, depth=1, score=None):
+        if url in self._seen or urlparse(url).scheme not in ("http", "https"):
+            return False
+        if score is None:
+            score = predict_yield(url, text, priority, depth)
+            if score is None:
+                return False
+            folder = urlparse(url).path.rstrip("/").rpartition("/")[0]
+            if folder:  # top-level pages are the usual candidates; don't thin them out
+                score -= SIBLING_PENALTY * self._dirs[folder]
+                self._dirs[folder] += 1
+        self._seen.add(url)
+        heapq.heappush(self._heap, (-score, self._seq, url, depth, priority))
+        self._seq += 1
+        return True
+
+    def pop(self):
+        """(url, depth, priority) of the most promising queued URL."""
+        _, _, url, depth, priority = heapq.heappop(self._heap)
+        return url, depth, priority
+
+    def __len__(self):
+        return len(self._heap)
@@ -0,0 +1,104 @@
+# csv_sources.py -- streaming, vectorized state filter shared by the AICTE and UGC loaders
+#
+# The national CSVs are read in chunks of csv_chunk_rows rows; each chunk is filtered
+# on its state column with one vectorized string match, and only the surviving
+# (Karnataka) rows are normalized. Peak memory is bounded by the chunk size, not by
+# the size of the national dump.
+#
+# Downloads are parsed straight from the bytes returned by scraper_core.fetch_bytes
+# (network or cache); the format is sniffed once from the first bytes.
+
+import io
+import pandas as pd
+from utils import normalize_series
+from metrics import METRICS
+from sources import CONFIG
+
+CHUNK_ROWS = CONFIG.get("csv_chunk_rows", 100000)
+KEEP_DOWNLOADS = CONFIG.get("keep_downloads", False)
+
+OUTPUT_COLUMNS = ["college_name", "city_town", "district", "affiliating_university",
+                  "tpo_name", "tpo_phone", "website", "source_url"]
+
+# part of the loaders' manifest keys, so stored rows are re-parsed when columns change
+ROWS_SCHEMA = ",".join(OUTPUT_COLUMNS)
+
+# header keywords of the website column, where a source has one (see website_index)
+WEBSITE_KEYS = ["website", "web site", "web address", "url"]
+
+def find_column(columns, keys):
+    """First column whose lower-cased name contains any of keys (same heuristic as before)."""
+    for c in columns:
+        low = c.lower()
+        for k in keys:
+            if k in low:
+                return c
+    return None
+
+def detect_format(head):
+    """'xlsx', 'xls' or 'csv' from the first bytes of a file."""
+    if head.startswith(b"PK\x03\x04"):
+        return "xlsx"
+    if head.startswith(b"\xd0\xcf\x11\xe0"):
+        return "xls"
+    return "csv"
+
+def iter_frames(src, chunksize=CHUNK_ROWS):
+    """
+    Yield DataFrame chunks (all columns as str) from src, which is either the raw
+    bytes of a download or a local file path. Excel files come back as one frame.
+    """
+    if isinstance(src, (bytes, bytearray, memoryview)):
+        head = bytes(src[:8])
+        src = io.BytesIO(src)  # shares the buffer; no copy unless written to
+    else:
+        with open(src, "rb") as f:
+            head = f.read(8)
+    if detect_format(head) == "csv":
+        yield from pd.read_csv(src, dtype=str, encoding="utf-8", encoding_errors="replace",
+                               chunksize=chunksize)
+    else:
+        yield pd.read_excel(src, dtype=str)
+
+def save_download(data, path):
+    """Write the raw downloaded bytes as a side artifact when keep_downloads is set."""
+    if KEEP_DOWNLOADS:
+        with open(path, "wb") as f:
+            f.write(data)
+
+def filter_state_rows(frames, column_keys, source, state="karnataka"):
+    """
+    Stream frames, keep rows whose state column mentions `state`, and map them onto
+    OUTPUT_COLUMNS. column_keys maps an output column (plus "state") to the header
+    keywords used to find it; output columns without a match are filled with "-".
+    Returns (rows, name_col_found).
+    """
+    # frames are read lazily, so this times download parsing and filtering together
+    with METRICS.timer("parse_seconds", stage="csv"):
+        return _filter_state_rows(frames, column_keys, source, state)
+
+def _filter_state_rows(frames, column_keys, source, state):
+    parts = []
+    cols = None
+    for chunk in frames:
+        if cols is None:
+            cols = {field: find_column(chunk.columns, keys) for field, keys in column_keys.items()}
+            if cols.get("college_name") is None:
+                return [], False
+            if cols.get("state") is None:
+                return [], True
+        hit = chunk[cols["state"]].str.contains(state, case=False, na=False, regex=False)
+        if not hit.any():
+            continue
+        sub = chunk.loc[hit]
+        out = pd.DataFrame(index=sub.index)
+        for field in OUTPUT_COLUMNS:
+            src = cols.get(field)
+            out[field] = normalize_series(sub[src]) if src else "-"
+        out["source_url"] = source
+        parts.append(out)
+    if cols is None:
+        return [], False
+    if not parts:
+        return [], True
+    return pd.concat(parts, ignore_index=True)[OUTPUT_COLUMNS].to_dict(orient="records"), True
@@ -0,0 +1,164 @@
+# entity_resolution.py -- fuzzy de-duplication of colleges across AICTE, UGC and VTU
+#
+# 1. every name is normalized into a canonical form (abbreviations expanded,
+#    punctuation and filler words dropped) and every district into a blocking key
+#    (old/new spellings folded together);
+# 2. each record is indexed under its few rarest name tokens, so a record is only
+#    compared with records that share a rare token and a compatible district,
+#    never with all n-1 others;
+# 3. candidate pairs whose character-trigram similarity reaches the threshold, and
+#    whose numbers agree ("... College 1" is not "... College 2"), are merged
+#    (union-find), and each cluster becomes one record that keeps the first row's
+#    values, fills its gaps from the others and lists every source URL.
+#
+# Settings live in the "entity_resolution" block of config.json.
+
+import re
+from collections import Counter, defaultdict
+import pandas as pd
+from sources import CONFIG
+
+ER = CONFIG.get("entity_resolution", {})
+THRESHOLD = ER.get("threshold", 0.85)
+BLOCKING_TOKENS = ER.get("blocking_tokens", 3)
+
+ABBREVIATIONS = {
+    "inst": "institute", "instt": "institute", "institue": "institute",
+    "engg": "engineering", "eng": "engineering", "engineerng": "engineering",
+    "tech": "technology", "techn": "technology", "technol": "technology",
+    "coll": "college", "clg": "college", "univ": "university",
+    "mgmt": "management", "mgt": "management", "sci": "science", "sciences": "science",
+    "govt": "government", "gov": "government", "pvt": "private",
+    "poly": "polytechnic", "dept": "department", "edu": "education",
+    "intl": "international", "natl": "national", "res": "research",
+    "st": "saint", "sri": "shri", "shree": "shri", "sree": "shri",
+}
+STOPWORDS = {"of", "the", "and", "for", "in", "at", "a", "an"}
+
+DISTRICT_ALIASES = {
+    "bangalore": "bengaluru", "bengaluru urban": "bengaluru", "bangalore urban": "bengaluru",
+    "bangalore rural": "bengaluru rural", "mysore": "mysuru", "mangalore": "dakshina kannada",
+    "mangaluru": "dakshina kannada", "belgaum": "belagavi", "gulbarga": "kalaburagi",
+    "bellary": "ballari", "shimoga": "shivamogga", "tumkur": "tumakuru", "bijapur": "vijayapura",
+    "hubli": "dharwad", "hubballi": "dharwad", "chikmagalur": "chikkamagaluru",
+    "chickmagalur": "chikkamagaluru", "davangere": "davanagere", "hassan district": "hassan",
+    "udupi district": "udupi", "bagalkot": "bagalkote", "chamarajanagar": "chamarajanagara",
+    "chikballapur": "chikkaballapura", "gadag-betageri": "gadag", "karwar": "uttara kannada",
+}
+
+_NON_WORD = re.compile(r"[^a-z0-9 ]+")
+
+def canonical_name(name):
+    """'R.V. Coll. of Engg., Bangalore' -> 'rv college engineering bangalore'."""
+    low = str(name).lower().replace("&", " and ").replace("'", "")
+    words = []
+    for w in _NON_WORD.sub(" ", low).split():
+        # glue dotted initials back together: "s j b" -> "sjb"
+        if len(w) == 1 and words and words[-1][1]:
+            words[-1] = (words[-1][0] + w, True)
+        else:
+            words.append((w, len(w) == 1))
+    return " ".join(ABBREVIATIONS.get(w, w) for w, _ in words if w not in STOPWORDS)
+
+def district_key(district):
+    """Blocking key for a district; '' means unknown (compatible with any district)."""
+    d = _NON_WORD.sub(" ", str(district or "").lower()).split()
+    d = " ".join(w for w in d if w != "district")
+    if d in ("", "na", "nan", "none"):
+        return ""
+    return DISTRICT_ALIASES.get(d, d)
+
+def number_tokens(canon):
+    """Tokens of a canonical name that contain digits; names that differ in them never match."""
+    return frozenset(t for t in canon.split() if any(c.isdigit() for c in t))
+
+def trigrams(s):
+    s = f"  {s} "
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+def similarity(a, b):
+    """Jaccard similarity of two trigram sets."""
+    if not a or not b:
+        return 0.0
+    inter = len(a & b)
+    return inter / (len(a) + len(b) - inter)
+
+class _UnionFind:
+    """Clusters carry a district key; two clusters with different known districts never merge."""
+
+    def __init__(self, dkeys):
+        self.parent = list(range(len(dkeys)))
+        self.district = list(dkeys)
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i, j):
+        ri, rj = self.find(i), self.find(j)
+        di, dj = self.district[ri], self.district[rj]
+        if ri == rj or (di and dj and di != dj):
+            return
+        # keep the earlier record as root so merged rows keep source priority
+        root, child = min(ri, rj), max(ri, rj)
+        self.parent[child] = root
+        self.district[root] = di or dj
+
+def match_clusters(names, districts, threshold=THRESHOLD, blocking_tokens=BLOCKING_TOKENS):
+    """
+    Cluster records by fuzzy name match within compatible districts.
+    Returns a list of clusters, each a list of record indexes in input order.
+    """
+    canon = [canonical_name(n) for n in names]
+    dkeys = [district_key(d) for d in districts]
+    tokens = [set(c.split()) for c in canon]
+    numbers = [number_tokens(c) for c in canon]
+    df = Counter(t for ts in tokens for t in ts)
+    grams = [trigrams(c) for c in canon]
+    uf = _UnionFind(dkeys)
+
+    by_block = defaultdict(list)  # (token, district key) -> record ids
+    by_token = defaultdict(list)  # token -> record ids, probed by unknown-district records
+    for i, ts in enumerate(tokens):
+        keys = sorted(ts, key=lambda t: (df[t], t))[:blocking_tokens]
+        cands = set()
+        for t in keys:
+            if dkeys[i]:
+                cands.update(by_block[(t, dkeys[i])])
+                cands.update(by_block[(t, "")])
+            else:
+                cands.update(by_token[t])
+        for j in cands:
+            if uf.find(i) == uf.find(j) or numbers[i] != numbers[j]:
+                continue
+            if canon[i] == canon[j] or similarity(grams[i], grams[j]) >= threshold:
+                uf.union(i, j)
+        for t in keys:
+            by_block[(t, dkeys[i])].append(i)
+            by_token[t].append(i)
+
+    clusters = defaultdict(list)
+    for i in range(len(canon)):
+        clusters[uf.find(i)].append(i)
+    return [clusters[r] for r in sorted(clusters)]
+
+def merge_cluster(records):
+    """First record wins; '-'/empty fields are filled from later ones; all sources kept."""
+    merged = dict(records[0])
+    for rec in records[1:]:
+        for k, v in rec.items():
+            if merged.get(k) in (None, "", "-") and v not in (None, "", "-"):
+                merged[k] = v
+    urls = [r.get("source_url") for r in records if r.get("source_url") not in (None, "", "-")]
+    merged["source_urls"] = "; ".join(dict.fromkeys(urls)) or "-"
+    return merged
+
+def resolve_entities(df, threshold=THRESHOLD):
+    """DataFrame in (college_name, district, source_url, ...) -> one row per college."""
+    if df.empty:
+        return df
+    records = df.to_dict(orient="records")
+    clusters = match_clusters(df["college_name"].tolist(), df["district"].tolist(), threshold)
+    return pd.DataFrame([merge_cluster([records[i] for i in c]) for c in clusters])
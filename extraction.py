@@ -0,0 +1,141 @@
+# extraction.py -- shared single-pass extraction of emails, phones, names and keywords
+#
+# Every enricher used to run its own EMAIL_RE, PHONE_RE and name regex over the raw
+# HTML (markup, scripts and all) and then one str.find per keyword. Here a page is
+# stripped of markup once (mailto: addresses are kept), and one compiled scanner
+# walks the remaining text for emails, phones and name candidates, a second one for
+# keywords, each reporting its hits with their character offset in that text.
+# Keywords get their own pass so a name ("About Placement Cell") can't swallow them.
+# They are compiled into a trie-shaped alternation, so the regex engine matches all
+# of them in one left-to-right pass (the same prefix sharing as an Aho-Corasick
+# automaton, but running in C).
+#
+# With the offsets, "is this phone near a placement keyword" is a bisect over the
+# sorted keyword positions instead of another scan.
+
+import re, time
+from bisect import bisect_left
+from collections import namedtuple
+from html import unescape
+from metrics import METRICS
+
+EMAIL_PATTERN = r"(?<![A-Za-z0-9._%+-])[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}"
+PHONE_PATTERN = r"(?<!\d)(?:\+91[\-\s]?)?(?:\d{10}|\d{3}[\-\s]?\d{3}[\-\s]?\d{4})(?!\d)"
+NAME_PATTERN = r"\b(?:(?:Mr|Mrs|Ms|Dr|Prof|Sri|Smt)\.\s?)?[A-Z][a-z]+(?:\s[A-Z][a-z]+){0,3}"
+
+EMAIL_RE = re.compile(EMAIL_PATTERN)
+PHONE_RE = re.compile(PHONE_PATTERN)
+NAME_RE = re.compile(NAME_PATTERN)
+
+PLACEMENT_KEYWORDS = [
+    "placement", "training", "training & placement", "tpo", "placement cell",
+    "career", "recruit", "career development", "industry relations"
+]
+
+# how far (in characters of page text) a phone or name may be from a keyword
+NEAR_WINDOW = 250
+
+_DROP_RE = re.compile(r"<(script|style|noscript|template)\b.*?</\1\s*>|<!--.*?-->", re.S | re.I)
+# block-level tags become line breaks so words from adjacent cells don't run together
+_BLOCK_RE = re.compile(r"</?(?:p|div|br|li|tr|td|th|h[1-6]|table|ul|ol|section|header|footer|nav)\b[^>]*>", re.I)
+_MAILTO_RE = re.compile(r"<a\b[^>]*?href\s*=\s*[\"']?mailto:([^\"'>?\s]+)[^>]*>", re.I)
+_TAG_RE = re.compile(r"<[^>]*>")
+_SPACE_RE = re.compile(r"[ \t\r\f\v\xa0]+")
+
+def strip_markup(html):
+    """
+    Visible text of an HTML page: scripts/styles/comments dropped, entities decoded.
+    A mailto: link's address is kept in place of its <a> tag.
+    """
+    if not html:
+        return ""
+    text = _DROP_RE.sub(" ", html)
+    text = _MAILTO_RE.sub(r" \1 ", text)
+    text = _BLOCK_RE.sub("\n", text)
+    text = _TAG_RE.sub(" ", text)
+    text = unescape(text)
+    return _SPACE_RE.sub(" ", text)
+
+def trie_pattern(words):
+    """Regex alternation for words with shared prefixes factored out (longest match first)."""
+    trie = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node):
+        end = "" in node
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        if end:
+            return "(?:" + body + ")?"
+        return body
+    return build(trie)
+
+Hit = namedtuple("Hit", "value start")
+
+class Extraction:
+    """
+    Everything found on one page. emails/phones/names/keywords are lists of Hit
+    (value, offset into .text), in page order and with repeats.
+    """
+
+    __slots__ = ("text", "emails", "phones", "names", "keywords", "_kw_offsets")
+
+    def __init__(self, text):
+        self.text = text
+        self.emails, self.phones, self.names, self.keywords = [], [], [], []
+        self._kw_offsets = None
+
+    def near_keyword(self, offset, window=NEAR_WINDOW):
+        """True if a keyword hit starts within window characters of offset."""
+        if self._kw_offsets is None:
+            self._kw_offsets = [k.start for k in self.keywords]
+        offs = self._kw_offsets
+        i = bisect_left(offs, offset - window)
+        return i < len(offs) and offs[i] <= offset + window
+
+    @staticmethod
+    def unique(hits):
+        """Distinct values of hits, first-seen order."""
+        return list(dict.fromkeys(h.value for h in hits))
+
+class Extractor:
+    """
+    Compiled scanners for a keyword list. Keywords match case-insensitively and
+    only at word starts, in a pass of their own; emails win over names and phones
+    where they overlap.
+    """
+
+    def __init__(self, keywords=PLACEMENT_KEYWORDS, name="placement"):
+        self.name = name  # extractor label of the extract_seconds metric
+        self.keywords = [k.lower() for k in keywords]
+        self._scan = re.compile(
+            f"(?P<email>{EMAIL_PATTERN})"
+            f"|(?P<phone>{PHONE_PATTERN})"
+            f"|(?P<name>{NAME_PATTERN})")
+        self._keywords = re.compile(f"(?i:\\b{trie_pattern(self.keywords)})")
+
+    def scan_text(self, text):
+        t0 = time.perf_counter()
+        ex = Extraction(text)
+        add = {"email": ex.emails.append, "phone": ex.phones.append, "name": ex.names.append}
+        for m in self._scan.finditer(text):
+            kind = m.lastgroup
+            value = m.group(kind)
+            if kind == "name":
+                value = " ".join(value.split())
+            add[kind](Hit(value, m.start()))
+        ex.keywords = [Hit(m.group().lower(), m.start()) for m in self._keywords.finditer(text)]
+        METRICS.observe("extract_seconds", time.perf_counter() - t0, extractor=self.name)
+        return ex
+
+    def scan(self, html):
+        """Strip html once and scan its text."""
+        return self.scan_text(strip_markup(html))
+
+PLACEMENT = Extractor(PLACEMENT_KEYWORDS)
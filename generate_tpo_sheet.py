@@ -1,8 +1,8 @@
 # generate_tpo_sheet.py
-import pandas as pd
 from tpo_enrichment import enrich_dataset
+from utils import output_paths, read_output
 
-df = pd.read_csv("output/colleges.csv")
+df = read_output(output_paths()[0])
 df = df.drop_duplicates(subset=["college_name"])
 
 enriched = enrich_dataset(df)
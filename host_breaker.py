@@ -0,0 +1,275 @@
+# host_breaker.py -- per-host circuit breaker with a persistent negative cache
+#
+# A college domain that no longer resolves, refuses connections or never answers
+# used to cost the full timeout on every page we tried there (each CANDIDATE_PATHS
+# entry, each candidate page of a crawl), times the retry policy's attempts. Now
+# failures_to_trip such failures in a row trip the host's breaker: every later
+# request to it fails at once with HostDownError (which the retry policy does not
+# retry) for the rest of the run. A DNS failure only counts while
+# resolver_probe_host still resolves, so a broken resolver trips nothing.
+#
+# Tripped hosts are also written to a small SQLite table under pipeline_cache_dir,
+# so the next runs skip them too until their entry expires (negative_ttl_seconds,
+# per failure kind). Not while failures are widespread (outage_failure_ratio of the
+# last outage_window requests, over several hosts): then the network is the likely
+# culprit, and a trip only lasts outage_retry_seconds and is never persisted. Settings are the "circuit_breaker" block of config.json. The
+# source hosts (AICTE, UGC, VTU and their mirrors) are never tripped: they have
+# their own deadlines and fallbacks, and skipping them would drop whole sources.
+#
+#   python host_breaker.py list
+#   python host_breaker.py forget www.example.edu.in    # or --all
+
+import os, time, socket, sqlite3, argparse, threading
+from collections import deque
+import requests
+from manifest import CACHE_DIR
+from metrics import METRICS, host_of
+from sources import CONFIG
+
+BREAKER_CFG = CONFIG.get("circuit_breaker", {})
+NEGATIVE_CACHE_PATH = os.path.join(CACHE_DIR, "dead_hosts.sqlite")
+DEFAULT_TTL = {"dns": 7 * 86400, "refused": 86400, "timeout": 6 * 3600}
+
+def source_hosts(cfg=CONFIG):
+    urls = cfg.get("aicte_urls", []) + cfg.get("ugc_urls", []) + cfg.get("vtu_region_pages", [])
+    return {host_of(u) for u in urls + [cfg.get("vtu_ajax", "")] if u}
+
+class HostDownError(Exception):
+    """Request refused locally: the host's breaker is open (see HostBreaker)."""
+    def __init__(self, host, reason):
+        super().__init__(f"{host} is down ({reason}); not retried this run")
+        self.host = host
+        self.reason = reason
+
+def classify(exc):
+    """'dns', 'refused' or 'timeout' if exc says the host itself is unreachable, else None."""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, socket.gaierror):
+            return "dns"
+        if isinstance(exc, ConnectionRefusedError):
+            return "refused"
+        if isinstance(exc, (requests.Timeout, TimeoutError)):  # TimeoutError covers asyncio's
+            return "timeout"
+        # requests wraps urllib3 errors in args[0], urllib3 keeps them in .reason and
+        # aiohttp's connector errors in .os_error
+        nested = getattr(exc, "reason", None) or getattr(exc, "os_error", None)
+        if not isinstance(nested, BaseException) and exc.args and isinstance(exc.args[0], BaseException):
+            nested = exc.args[0]
+        exc = nested if isinstance(nested, BaseException) else (exc.__cause__ or exc.__context__)
+    return None
+
+class HostBreaker:
+    """
+    check(url) before a request (raises HostDownError for a tripped host), then
+    success(url) or failure(url, exc) after it. Thread-safe; the async fetcher
+    uses allow(url) instead of check. path=None keeps the negative cache in memory.
+
+    A host trips after failures_to_trip failures in a row, and on DNS failures only
+    if resolver_probe_host still resolves (otherwise it is our resolver that is
+    down). While most recent requests fail, across several hosts, the network is
+    taken to be at fault: hosts still trip, but only for outage_retry_seconds and
+    without being written to the negative cache.
+    """
+
+    def __init__(self, failures_to_trip=2, ttl=None, path=NEGATIVE_CACHE_PATH, enabled=True, exempt=(),
+                 resolver_probe_host=None, outage_window=50, outage_failure_ratio=0.5, outage_retry_seconds=300):
+        self.failures_to_trip = failures_to_trip
+        self.exempt = set(exempt)
+        self.ttl = dict(DEFAULT_TTL, **(ttl or {}))
+        self.path = path
+        self.enabled = enabled
+        self.resolver_probe_host = resolver_probe_host
+        self.outage_failure_ratio = outage_failure_ratio
+        self.outage_retry_seconds = outage_retry_seconds
+        self._lock = threading.Lock()
+        self._db = None
+        self._open = None      # host -> (reason, monotonic expiry or None for the rest of the run)
+        self._failures = {}    # host -> consecutive failures
+        self._recent = deque(maxlen=outage_window)  # (host, failed) of the latest requests
+        self._probe = (0.0, True)                   # (checked at, resolver answered)
+
+    @classmethod
+    def from_config(cls, cfg=BREAKER_CFG):
+        return cls(failures_to_trip=cfg.get("failures_to_trip", 2), ttl=cfg.get("negative_ttl_seconds"),
+                   path=cfg.get("path", NEGATIVE_CACHE_PATH), enabled=cfg.get("enabled", True),
+                   exempt=source_hosts() | set(cfg.get("exempt_hosts", [])),
+                   resolver_probe_host=cfg.get("resolver_probe_host"),
+                   outage_window=cfg.get("outage_window", 50),
+                   outage_failure_ratio=cfg.get("outage_failure_ratio", 0.5),
+                   outage_retry_seconds=cfg.get("outage_retry_seconds", 300))
+
+    def _conn(self):
+        if self._db is None and self.path:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""CREATE TABLE IF NOT EXISTS dead_hosts (
+                host TEXT PRIMARY KEY, reason TEXT NOT NULL, tripped_at REAL NOT NULL, expires_at REAL NOT NULL)""")
+            conn.commit()
+            self._db = conn
+        return self._db
+
+    def _hosts(self):
+        # caller holds the lock
+        if self._open is None:
+            self._open = {}
+            conn = self._conn()
+            if conn is not None:
+                with conn:
+                    conn.execute("DELETE FROM dead_hosts WHERE expires_at <= ?", (time.time(),))
+                self._open = {host: (reason, None) for host, reason in conn.execute("SELECT host, reason FROM dead_hosts")}
+                if self._open:
+                    print(f"[BREAKER] {len(self._open)} hosts known to be down from earlier runs")
+        return self._open
+
+    def reason(self, url):
+        """Why url's host is tripped, or None while requests to it are allowed."""
+        if not self.enabled:
+            return None
+        host = host_of(url)
+        with self._lock:
+            hosts = self._hosts()
+            tripped = hosts.get(host)
+            if tripped is None:
+                return None
+            reason, until = tripped
+            if until is not None and time.monotonic() >= until:
+                del hosts[host]  # tripped during an outage; worth another try
+                return None
+            return reason
+
+    def _refused(self, url):
+        reason = self.reason(url)
+        if reason is not None:
+            METRICS.inc("fetch_skipped_total", host=host_of(url), reason="host_down")
+        return reason
+
+    def allow(self, url):
+        return self._refused(url) is None
+
+    def check(self, url):
+        reason = self._refused(url)
+        if reason is not None:
+            raise HostDownError(host_of(url), reason)
+
+    def success(self, url):
+        if self.enabled:
+            host = host_of(url)
+            with self._lock:
+                self._failures.pop(host, None)
+                self._recent.append((host, False))
+
+    def resolver_ok(self):
+        """Whether resolver_probe_host resolves (checked at most every 30s; True if unset)."""
+        if not self.resolver_probe_host:
+            return True
+        checked, ok = self._probe
+        if time.monotonic() - checked >= 30:
+            try:
+                socket.getaddrinfo(self.resolver_probe_host, 443)
+                ok = True
+            except OSError:
+                ok = False
+            self._probe = (time.monotonic(), ok)
+        return ok
+
+    def _outage(self):
+        # caller holds the lock
+        failed = [h for h, bad in self._recent if bad]
+        return (len(self._recent) >= min(10, self._recent.maxlen) and len(set(failed)) >= 5
+                and len(failed) >= self.outage_failure_ratio * len(self._recent))
+
+    def failure(self, url, exc):
+        """Count a failed request; returns the failure kind if it tripped the breaker."""
+        kind = classify(exc) if self.enabled else None
+        if kind is None:
+            return None
+        host = host_of(url)
+        if host in self.exempt:
+            return None
+        with self._lock:
+            self._recent.append((host, True))
+            if host in self._hosts():
+                return None
+            self._failures[host] = self._failures.get(host, 0) + 1
+            if self._failures[host] < self.failures_to_trip:
+                return None
+        if kind == "dns" and not self.resolver_ok():
+            METRICS.inc("breaker_held_total", reason="resolver_down")
+            return None
+        with self._lock:
+            hosts = self._hosts()
+            if host in hosts:
+                return None
+            self._failures.pop(host, None)
+            outage = self._outage()
+            if outage:
+                hosts[host] = (kind, time.monotonic() + self.outage_retry_seconds)
+            else:
+                hosts[host] = (kind, None)
+                conn = self._conn()
+                if conn is not None:
+                    now = time.time()
+                    with conn:
+                        conn.execute("INSERT OR REPLACE INTO dead_hosts VALUES (?,?,?,?)",
+                                     (host, kind, now, now + self.ttl.get(kind, DEFAULT_TTL["timeout"])))
+        METRICS.inc("breaker_trips_total", reason=kind, outage=str(outage).lower())
+        return kind
+
+    def list(self):
+        """[(host, reason, tripped_at, expires_at)] in the negative cache."""
+        with self._lock:
+            conn = self._conn()
+            return list(conn.execute("SELECT * FROM dead_hosts ORDER BY tripped_at")) if conn else []
+
+    def forget(self, hosts=None):
+        """Drop hosts (all when None) from the negative cache and this run's tripped set."""
+        with self._lock:
+            conn = self._conn()
+            if conn is not None:
+                with conn:
+                    if hosts is None:
+                        conn.execute("DELETE FROM dead_hosts")
+                    else:
+                        conn.executemany("DELETE FROM dead_hosts WHERE host = ?", [(h,) for h in hosts])
+            self._open = None
+            self._failures.clear()
+
+    def summary(self):
+        with self._lock:
+            hosts = dict(self._open or {})
+        if not hosts:
+            return "[BREAKER] no hosts tripped"
+        kinds = {}
+        for kind, _ in hosts.values():
+            kinds[kind] = kinds.get(kind, 0) + 1
+        return f"[BREAKER] {len(hosts)} hosts down (" + ", ".join(f"{k} {v}" for k, v in sorted(kinds.items())) + ")"
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+BREAKER = HostBreaker.from_config()
+
+def main():
+    parser = argparse.ArgumentParser(description="hosts the circuit breaker has marked as down")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list", help="show the negative cache")
+    forget = sub.add_parser("forget", help="let hosts be tried again")
+    forget.add_argument("hosts", nargs="*")
+    forget.add_argument("--all", action="store_true")
+    args = parser.parse_args()
+    if args.cmd == "list":
+        for host, reason, tripped, expires in BREAKER.list():
+            print(f"{host}\t{reason}\ttripped {time.ctime(tripped)}\texpires {time.ctime(expires)}")
+        return
+    if not args.hosts and not args.all:
+        parser.error("name the hosts to forget, or pass --all")
+    BREAKER.forget(None if args.all else args.hosts)
+
+if __name__ == "__main__":
+    main()
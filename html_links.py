@@ -0,0 +1,146 @@
+# html_links.py -- one-pass streaming anchor extractor for college homepages
+#
+# find_candidate_pages used to build a BeautifulSoup tree of the homepage and walk
+# every <a> twice (placement keywords, then contact keywords). Here the page goes
+# through lxml's event parser (html_tables.html_events) once: each anchor is
+# classified the moment it closes, everything already seen is cleared from the tree
+# (so memory does not grow with multi-megabyte slider markup), and parsing stops as
+# soon as enough candidates of the top class have been found (nothing later on the
+# page could outrank them). LinkWatcher runs the same classifier over a page while
+# it downloads, so the fetch itself can stop there.
+
+import re
+from collections import namedtuple
+from urllib.parse import urljoin, urlparse
+from lxml import etree
+
+from extraction import trie_pattern
+from html_tables import html_events, cell_text
+
+Link = namedtuple("Link", "url text priority")
+
+def keyword_re(words):
+    """Case-insensitive 'any of words occurs in the string' matcher."""
+    return re.compile(trie_pattern([w.lower() for w in words]), re.I) if words else None
+
+class LinkClasses:
+    """
+    Priority classes for anchors, highest first. Each class is (text_words, href_words):
+    an anchor belongs to the first class with a word in its text or href.
+    """
+
+    def __init__(self, *classes):
+        self._classes = [(keyword_re(t), keyword_re(h)) for t, h in classes]
+
+    def classify(self, text, href):
+        for priority, (text_re, href_re) in enumerate(self._classes):
+            if (text_re is not None and text_re.search(text)) or (href_re is not None and href_re.search(href)):
+                return priority
+        return None
+
+class _Anchors:
+    """Turns parser events into (href, text) pairs, clearing each element once it closes."""
+
+    def __init__(self):
+        self.open_anchors = 0
+
+    def read(self, events):
+        for event, el in events:
+            if event == "start":
+                if el.tag == "a":
+                    self.open_anchors += 1
+                continue
+            if el.tag == "a":
+                self.open_anchors -= 1
+                href = el.get("href")
+                if href is not None:
+                    yield href, cell_text(el)
+            if self.open_anchors:
+                continue  # still inside an anchor whose text we need
+            el.clear()
+            parent = el.getparent()
+            if parent is not None:
+                while el.getprevious() is not None:
+                    del parent[0]
+
+def iter_anchors(html, chunk_size=1 << 16):
+    """
+    Yield (href, text) for every <a href> in document order. Elements are cleared
+    as soon as they close, so memory stays flat however large the page is.
+    """
+    yield from _Anchors().read(html_events(html, chunk_size))
+
+def normalize_link(url):
+    return url.split('#')[0].rstrip('/')
+
+def is_web_link(url):
+    """False for mailto:, tel:, javascript: and other links there is no page behind."""
+    return urlparse(url).scheme in ("http", "https")
+
+def candidate_links(html, base_url, classes, limit=None, chunk_size=1 << 16):
+    """
+    Links of html that fall into one of classes (a LinkClasses), as Link tuples with
+    absolute, fragment-free URLs, highest priority first and then in document order.
+    Only http(s) links are kept; duplicates keep their best class. At most limit links are returned; parsing
+    stops once limit links of the top class were found, as no later anchor can
+    displace them.
+    """
+    found = {}
+    top = set()
+    if not html:
+        return []
+    try:
+        for href, text in iter_anchors(html, chunk_size):
+            priority = classes.classify(text, href)
+            if priority is None:
+                continue
+            url = normalize_link(urljoin(base_url, href))
+            if not is_web_link(url):
+                continue
+            prev = found.get(url)
+            if prev is None or priority < prev.priority:
+                found[url] = Link(url, text, priority)
+            if priority == 0:
+                top.add(url)
+                if limit is not None and len(top) >= limit:
+                    break
+    except Exception:
+        pass  # keep what was found before the parser gave up
+    # dict keeps document order; the sort is stable
+    return sorted(found.values(), key=lambda link: link.priority)[:limit]
+
+class LinkWatcher:
+    """
+    until-callback for http_client.fetch_html: fed the page text as it downloads,
+    returns True once limit links of the top class of classes have been seen (the
+    point where candidate_links would stop too), so the rest of the page need not
+    be read. Any parse trouble just means it never stops the fetch.
+    """
+
+    def __init__(self, base_url, classes, limit=1):
+        self.base_url = base_url
+        self.classes = classes
+        self.limit = limit
+        self.found = set()
+        self._parser = etree.HTMLPullParser(events=("start", "end"))
+        self._anchors = _Anchors()
+        self._pending = ""
+
+    def __call__(self, text):
+        # feed up to the last "<" only, so no tag is split across feeds (see html_tables)
+        text = self._pending + text
+        cut = text.rfind("<")
+        if cut <= 0:
+            self._pending = text
+            return False
+        self._pending = text[cut:]
+        try:
+            self._parser.feed(text[:cut])
+            for href, anchor_text in self._anchors.read(self._parser.read_events()):
+                if self.classes.classify(anchor_text, href) == 0:
+                    url = normalize_link(urljoin(self.base_url, href))
+                    if is_web_link(url):
+                        self.found.add(url)
+        except Exception:
+            return False
+        return len(self.found) >= self.limit
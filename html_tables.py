@@ -0,0 +1,80 @@
+# html_tables.py -- streaming table-row extractor on lxml's event parser
+#
+# Produces the same rows as the BeautifulSoup path it replaces
+#     for table in soup.find_all("table"):
+#         trs = table.find_all("tr")
+#         for tr in trs[1:]:
+#             cols = [normalize_text(td.get_text()) for td in tr.find_all("td")]
+# but without building a soup: the document is fed to an HTMLPullParser in chunks,
+# each table is processed as soon as it closes and is then cleared, so memory stays
+# proportional to one table rather than the whole page.
+
+from lxml import etree
+from utils import normalize_text
+
+# get_text() leaves out script/style/template contents; so do we
+_CELL_TEXT = etree.XPath(".//text()[not(ancestor::script or ancestor::style or ancestor::template)]")
+
+def cell_text(el):
+    return normalize_text("".join(_CELL_TEXT(el)))
+
+def _table_rows(table):
+    trs = list(table.iter("tr"))
+    if len(trs) < 2:
+        return []
+    return [[cell_text(td) for td in tr.iter("td")] for tr in trs[1:]]
+
+def _chunks(html, chunk_size):
+    # cut just before a "<" so no tag is split across feeds: libxml2's push parser
+    # can lose the rest of a document when a </script> arrives in two pieces
+    i = 0
+    while i < len(html):
+        if i + chunk_size >= len(html):
+            yield html[i:]
+            return
+        j = html.rfind("<", i + 1, i + chunk_size)
+        if j < 0:
+            j = i + chunk_size
+        yield html[i:j]
+        i = j
+
+def html_events(html, chunk_size=1 << 16):
+    """(event, element) start/end pairs for html, fed to the parser in chunks."""
+    parser = etree.HTMLPullParser(events=("start", "end"))
+    for chunk in _chunks(html, chunk_size):
+        parser.feed(chunk)
+        yield from parser.read_events()
+    parser.close()  # libxml2 holds back the tail of the document until close
+    yield from parser.read_events()
+
+def iter_table_rows(html, chunk_size=1 << 16):
+    """
+    Yield the cell texts of every data row (header row skipped) of every table in
+    html, in the same order as the BeautifulSoup loop above, nested tables included.
+    """
+    open_tables = []  # elements of the tables currently open, outermost first
+    nested = []       # (start order, rows) of finished inner tables, held for their outer table
+    started = 0
+    for event, el in html_events(html, chunk_size):
+        if el.tag != "table":
+            if event == "end" and not open_tables:
+                el.clear()
+            continue
+        if event == "start":
+            el.set("_order", str(started))  # placeholder attribute; table is cleared later
+            started += 1
+            open_tables.append(el)
+            continue
+        open_tables.pop()
+        rows = _table_rows(el)
+        if open_tables:
+            nested.append((int(el.get("_order")), rows))
+            continue
+        # outermost table closed: its own rows first, then inner tables in start order
+        yield from rows
+        for _, inner in sorted(nested, key=lambda t: t[0]):
+            yield from inner
+        nested = []
+        el.clear()
+        while el.getprevious() is not None:
+            del el.getparent()[0]
@@ -0,0 +1,316 @@
+# http_cache.py -- expiring, revalidating, size-bounded HTTP cache used by scraper_core
+#
+# Each entry keeps the response body plus its ETag / Last-Modified validators,
+# compressed with zlib. Fresh entries (younger than the TTL of their host) are served
+# straight from disk; stale ones are revalidated with a conditional GET so an
+# unchanged AICTE/UGC CSV costs a 304 instead of a full download. The total size is
+# kept under a byte budget by evicting the least recently used entries. Nothing is
+# indexed up front: the byte total is read from the store at the first write, the
+# eviction victims come from an ordered query when the budget is exceeded, and hits
+# update last-access times in batches rather than with a write per lookup.
+#
+# Settings live in the "cache" block of config.json. "backend" picks the storage:
+# "directory" (one file per URL) or "sqlite" (a single WAL-mode database, which avoids
+# hundreds of thousands of small files). Import an existing directory with
+#   python http_cache.py migrate --src .http_cache --dest .http_cache.sqlite
+
+import os, json, time, zlib, heapq, atexit, hashlib, sqlite3, argparse, threading
+from urllib.parse import urlparse
+from sources import CONFIG
+
+CACHE_CFG = CONFIG.get("cache", {})
+
+def url_key(url):
+    return hashlib.sha256(url.encode()).hexdigest()
+
+def pack(meta, body, level=6):
+    """One blob per entry: a JSON metadata line followed by the raw body, zlib-compressed."""
+    return zlib.compress(json.dumps(meta).encode() + b"\n" + body, level)
+
+def unpack(blob):
+    raw = zlib.decompress(blob)
+    head, _, body = raw.partition(b"\n")
+    return json.loads(head), body
+
+class DirectoryStore:
+    """One compressed file per URL hash under a cache directory."""
+
+    SUFFIX = ".zz"
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key):
+        return os.path.join(self.path, key + self.SUFFIX)
+
+    def get(self, key):
+        try:
+            with open(self._file(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key, blob):
+        final = self._file(key)
+        tmp = f"{final}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(blob)
+        os.replace(tmp, final)
+
+    def delete(self, key):
+        try:
+            os.remove(self._file(key))
+        except FileNotFoundError:
+            pass
+
+    def size(self, key):
+        """Stored size of key in bytes, 0 if absent."""
+        try:
+            return os.path.getsize(self._file(key))
+        except FileNotFoundError:
+            return 0
+
+    def touch_many(self, accessed):
+        """Record last-access times: accessed is [(key, timestamp)]."""
+        for key, when in accessed:
+            try:
+                os.utime(self._file(key), (when, when))
+            except FileNotFoundError:
+                pass
+
+    def entries(self):
+        """Yield (key, size_bytes, last_access) for every stored entry."""
+        for e in os.scandir(self.path):
+            if e.name.endswith(self.SUFFIX):
+                st = e.stat()
+                yield e.name[:-len(self.SUFFIX)], st.st_size, st.st_mtime
+
+    def total_bytes(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def oldest(self, n):
+        """[(key, size_bytes)] of the n least recently used entries, oldest first."""
+        return [(k, size) for k, size, _ in heapq.nsmallest(n, self.entries(), key=lambda e: e[2])]
+
+class SQLiteStore:
+    """
+    All entries in one SQLite file, keyed by URL hash (primary-key lookup).
+    WAL mode lets the worker threads read concurrently while one of them writes;
+    each thread gets its own connection.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("""CREATE TABLE IF NOT EXISTS entries (
+            key TEXT PRIMARY KEY, blob BLOB NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)""")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)")
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute("SELECT blob FROM entries WHERE key=?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key, blob, last_access=None):
+        conn = self._conn()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO entries (key, blob, size, last_access) VALUES (?,?,?,?)",
+                         (key, blob, len(blob), last_access or time.time()))
+
+    def delete(self, key):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM entries WHERE key=?", (key,))
+
+    def size(self, key):
+        row = self._conn().execute("SELECT size FROM entries WHERE key=?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def touch_many(self, accessed):
+        """Record last-access times in one transaction: accessed is [(key, timestamp)]."""
+        conn = self._conn()
+        with conn:
+            conn.executemany("UPDATE entries SET last_access=? WHERE key=?", [(t, k) for k, t in accessed])
+
+    def entries(self):
+        yield from self._conn().execute("SELECT key, size, last_access FROM entries")
+
+    def total_bytes(self):
+        return self._conn().execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def oldest(self, n):
+        return self._conn().execute("SELECT key, size FROM entries ORDER BY last_access LIMIT ?", (n,)).fetchall()
+
+def open_store(cfg=CACHE_CFG):
+    if cfg.get("backend", "directory") == "sqlite":
+        return SQLiteStore(cfg.get("sqlite_path", ".http_cache.sqlite"))
+    return DirectoryStore(cfg.get("dir", ".http_cache"))
+
+class HttpCache:
+    """
+    Cache policy on top of a store: TTL per host, validators for conditional GETs,
+    and LRU eviction once the stored bytes exceed max_bytes. Hits are buffered and
+    written to the store touch_batch at a time (and before any eviction).
+    """
+
+    def __init__(self, store, max_bytes=2 * 1024**3, default_ttl=86400, ttl_by_host=None, level=6,
+                 touch_batch=256):
+        self.store = store
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttl_by_host = ttl_by_host or {}
+        self.level = level
+        self.touch_batch = touch_batch
+        self._lock = threading.Lock()
+        self._bytes = None     # stored bytes; read from the store at the first write
+        self._accessed = {}    # key -> last hit, not yet written to the store
+        atexit.register(self.flush)
+
+    @classmethod
+    def from_config(cls, cfg=CACHE_CFG):
+        return cls(open_store(cfg),
+                   max_bytes=cfg.get("max_bytes", 2 * 1024**3),
+                   default_ttl=cfg.get("default_ttl_seconds", 86400),
+                   ttl_by_host=cfg.get("ttl_by_host", {}),
+                   level=cfg.get("compress_level", 6),
+                   touch_batch=cfg.get("touch_batch", 256))
+
+    def ttl_for(self, url):
+        return self.ttl_by_host.get(urlparse(url).netloc.lower(), self.default_ttl)
+
+    def flush(self):
+        """Write buffered last-access times to the store."""
+        with self._lock:
+            accessed, self._accessed = self._accessed, {}
+        if accessed:
+            self.store.touch_many(list(accessed.items()))
+
+    def lookup(self, url):
+        """Return (meta, body) for url or None. Does not judge freshness."""
+        key = url_key(url)
+        blob = self.store.get(key)
+        if blob is None:
+            return None
+        try:
+            meta, body = unpack(blob)
+        except Exception:
+            self.store.delete(key)
+            return None
+        with self._lock:
+            self._accessed[key] = time.time()
+            full = len(self._accessed) >= self.touch_batch
+        if full:
+            self.flush()
+        return meta, body
+
+    def is_fresh(self, url, meta, ttl=None):
+        ttl = self.ttl_for(url) if ttl is None else ttl
+        return time.time() - meta.get("fetched_at", 0) < ttl
+
+    @staticmethod
+    def conditional_headers(meta):
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def store_response(self, url, resp):
+        """Save a 200 response with its validators; returns the stored meta."""
+        meta = {
+            "url": url,
+            "fetched_at": time.time(),
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "content_type": resp.headers.get("Content-Type"),
+            "encoding": resp.encoding,
+        }
+        self._put(url, meta, resp.content)
+        return meta
+
+    def revalidated(self, url, meta, body, resp):
+        """A 304 came back: restart the entry's TTL and pick up any new validators."""
+        meta = dict(meta, fetched_at=time.time())
+        meta["etag"] = resp.headers.get("ETag") or meta.get("etag")
+        meta["last_modified"] = resp.headers.get("Last-Modified") or meta.get("last_modified")
+        self._put(url, meta, body)
+        return meta
+
+    def _put(self, url, meta, body):
+        key = url_key(url)
+        blob = pack(meta, body, self.level)
+        old = self.store.size(key)
+        self.store.put(key, blob)
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = self.store.total_bytes()
+            else:
+                self._bytes += len(blob) - old
+            over = self._bytes > self.max_bytes
+        if over:
+            self._evict(keep=key)
+
+    def _evict(self, keep):
+        # least recently used first, by the access times just flushed to the store
+        self.flush()
+        with self._lock:
+            while self._bytes > self.max_bytes:
+                victims = [(k, size) for k, size in self.store.oldest(64) if k != keep]
+                if not victims:
+                    break
+                for k, size in victims:
+                    self.store.delete(k)
+                    self._accessed.pop(k, None)
+                    self._bytes -= size
+                    if self._bytes <= self.max_bytes:
+                        break
+
+def decode_body(meta, body):
+    return body.decode(meta.get("encoding") or "utf-8", errors="replace")
+
+def migrate(src, dest, level=6):
+    """
+    Copy a directory cache into a SQLite store. Handles both the current .zz entries
+    and the legacy bare .html bodies (imported as immediately-stale entries without
+    validators, so the next run revalidates them). Returns the number imported.
+    """
+    target = SQLiteStore(dest)
+    count = 0
+    for e in os.scandir(src):
+        key, ext = os.path.splitext(e.name)
+        st = e.stat()
+        with open(e.path, "rb") as f:
+            data = f.read()
+        if ext == DirectoryStore.SUFFIX:
+            blob = data
+        elif ext == ".html":
+            blob = pack({"fetched_at": 0, "encoding": "utf-8"}, data, level)
+        else:
+            continue
+        target.put(key, blob, last_access=st.st_mtime)
+        count += 1
+    return count
+
+CACHE = HttpCache.from_config()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP cache maintenance")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    m = sub.add_parser("migrate", help="import a directory cache into a SQLite cache file")
+    m.add_argument("--src", default=CACHE_CFG.get("dir", ".http_cache"))
+    m.add_argument("--dest", default=CACHE_CFG.get("sqlite_path", ".http_cache.sqlite"))
+    args = parser.parse_args()
+    n = migrate(args.src, args.dest, CACHE_CFG.get("compress_level", 6))
+    print(f"[CACHE] Imported {n} entries from {args.src} into {args.dest}")
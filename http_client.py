@@ -0,0 +1,270 @@
+# http_client.py -- one pooled HTTP client shared by every parser and enricher
+#
+# All settings come from the "http" block of config.json. A single requests.Session
+# keeps a keep-alive connection pool per host, so crawling several pages of the same
+# college site reuses one TCP/TLS connection instead of handshaking for every page.
+#
+# Pages (fetch_html / safe_get) are streamed: a response whose Content-Type isn't
+# HTML is dropped before its body is read, and reading stops at max_page_bytes, or
+# earlier once an `until` watcher (e.g. html_links.LinkWatcher) has seen enough.
+# The payloads of inline data: URIs (slider images are often megabytes of base64
+# ahead of the nav) are skipped as they stream past and don't count towards
+# max_page_bytes; max_download_bytes bounds the download itself.
+
+import re, codecs, threading, time
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from tenacity import retry, wait_exponential, stop_after_attempt, retry_if_exception
+from sources import CONFIG
+from politeness import SCHEDULER
+from memo import SingleFlight, Memo
+from metrics import METRICS, host_of, install_dns_timer
+from host_breaker import BREAKER
+
+HTTP = CONFIG.get("http", {})
+
+HEADERS = {"User-Agent": CONFIG.get("user_agent")}
+TIMEOUT = CONFIG.get("timeout_seconds", 15)
+VERIFY_SSL = HTTP.get("verify_ssl", False)
+POOL_CONNECTIONS = HTTP.get("pool_connections", 100)
+POOL_MAXSIZE = HTTP.get("pool_maxsize", 10)
+RETRY_ATTEMPTS = HTTP.get("retry_attempts", 4)
+RETRY_WAIT_MIN = HTTP.get("retry_wait_min", 1)
+RETRY_WAIT_MAX = HTTP.get("retry_wait_max", 10)
+RETRY_STATUSES = set(HTTP.get("retry_statuses", [429, 500, 502, 503, 504]))
+MAX_PAGE_BYTES = HTTP.get("max_page_bytes", 2 * 1024 * 1024)
+MAX_DOWNLOAD_BYTES = HTTP.get("max_download_bytes", 16 * 1024 * 1024)
+HTML_CONTENT_TYPES = set(HTTP.get("html_content_types", ["text/html", "application/xhtml+xml"]))
+STOP_AT_ANCHORS = HTTP.get("stop_at_anchors", False)
+CHUNK_BYTES = 1 << 16
+
+if not VERIFY_SSL:
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+install_dns_timer()
+
+class HTTPStatusError(Exception):
+    """Non-200 response; .status carries the code so the retry policy can inspect it."""
+    def __init__(self, status, url):
+        super().__init__(f"HTTP {status} for {url}")
+        self.status = status
+        self.url = url
+
+class NotHTMLError(Exception):
+    """A page fetch answered with a non-HTML body (PDF, image, video...), left unread."""
+    def __init__(self, content_type, url):
+        super().__init__(f"{content_type} is not HTML: {url}")
+        self.content_type = content_type
+        self.url = url
+
+def is_transient(exc):
+    """Errors worth retrying: connection problems, timeouts and 429/5xx responses."""
+    if isinstance(exc, HTTPStatusError):
+        return exc.status in RETRY_STATUSES
+    return isinstance(exc, (requests.ConnectionError, requests.Timeout))
+
+def count_retry(state):
+    """tenacity before_sleep hook: one retries_total per retry, by host and function."""
+    url = state.args[0] if state.args else state.kwargs.get("url", "-")
+    METRICS.inc("retries_total", host=host_of(url), fn=state.fn.__name__)
+
+# The one retry policy. Permanent failures (404, bad URL, ...) are raised at once.
+retry_policy = retry(
+    wait=wait_exponential(min=RETRY_WAIT_MIN, max=RETRY_WAIT_MAX),
+    stop=stop_after_attempt(RETRY_ATTEMPTS),
+    retry=retry_if_exception(is_transient),
+    before_sleep=count_retry,
+    reraise=True,
+)
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """Process-wide Session; urllib3 pools are thread-safe so workers share it."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE,
+                                      max_retries=0)
+                s.mount("http://", adapter)
+                s.mount("https://", adapter)
+                s.headers.update(HEADERS)
+                s.verify = VERIFY_SSL
+                _session = s
+    return _session
+
+def request(url, headers=None, timeout=None, polite=True, stream=False):
+    """
+    Single GET on the shared session: no retries, no status check.
+    Raises HostDownError without a request if url's host tripped the breaker.
+    polite=False skips the per-host token bucket, for callers that already took a
+    token from politeness.SCHEDULER (e.g. via its ready queue).
+    stream=True returns once the headers are in; the caller reads (and closes) the
+    body and records its fetch_seconds / fetch_bytes_total.
+    """
+    host = host_of(url)
+    BREAKER.check(url)
+    if polite:
+        t0 = time.perf_counter()
+        SCHEDULER.acquire(url)
+        METRICS.observe("politeness_wait_seconds", time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    try:
+        resp = get_session().get(url, headers=headers, timeout=timeout or TIMEOUT, stream=stream)
+    except Exception as e:
+        METRICS.inc("fetch_requests_total", host=host, status="error")
+        METRICS.observe("fetch_seconds", time.perf_counter() - t0, host=host)
+        BREAKER.failure(url, e)
+        raise
+    BREAKER.success(url)
+    METRICS.inc("fetch_requests_total", host=host, status=str(resp.status_code))
+    if not stream:
+        METRICS.observe("fetch_seconds", time.perf_counter() - t0, host=host)
+        METRICS.inc("fetch_bytes_total", len(resp.content), host=host)
+    return resp
+
+def is_html(content_type):
+    """True for HTML content types, and for a missing header (let the parser decide)."""
+    if not content_type:
+        return True
+    return content_type.split(";")[0].strip().lower() in HTML_CONTENT_TYPES
+
+_DATA_URI = re.compile(rb"data:", re.I)
+_URI_CHARS = re.compile(rb"[A-Za-z0-9+/=;,:%._-]*")
+
+class BodyReader:
+    """
+    Decodes a body as its chunks arrive, dropping the payloads of data: URIs.
+    feed() returns True once reading should stop: max_bytes of the page kept or
+    max_download bytes downloaded (the excess is dropped), or until(new_text) said
+    so. Afterwards .text() is the decoded body, .read the bytes downloaded and
+    .stop the reason reading ended early ("max_bytes", "enough") or None.
+    """
+
+    def __init__(self, encoding, max_bytes=MAX_PAGE_BYTES, until=None, max_download=MAX_DOWNLOAD_BYTES):
+        try:
+            self._decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+        except LookupError:
+            self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.max_bytes = max_bytes
+        self.max_download = max_download
+        self.until = until
+        self.read = 0
+        self.kept = 0
+        self.stop = None
+        self._parts = []
+        self._held = b""        # tail of the last chunk that may be the start of "data:"
+        self._in_data = False   # inside a data: URI payload
+
+    def _drop_data_uris(self, chunk):
+        chunk, self._held = self._held + chunk, b""
+        out, pos = [], 0
+        while pos < len(chunk):
+            if self._in_data:
+                pos = _URI_CHARS.match(chunk, pos).end()
+                if pos == len(chunk):
+                    break
+                self._in_data = False
+            m = _DATA_URI.search(chunk, pos)
+            if m is None:
+                tail = max(pos, len(chunk) - 4)
+                out.append(chunk[pos:tail])
+                self._held = chunk[tail:]
+                break
+            out.append(chunk[pos:m.end()])
+            pos, self._in_data = m.end(), True
+        return b"".join(out)
+
+    def feed(self, chunk):
+        if self.max_download is not None and self.read + len(chunk) > self.max_download:
+            chunk, self.stop = chunk[:self.max_download - self.read], "max_bytes"
+        self.read += len(chunk)
+        chunk = self._drop_data_uris(chunk)
+        if self.max_bytes is not None and self.kept + len(chunk) > self.max_bytes:
+            chunk, self.stop = chunk[:self.max_bytes - self.kept], "max_bytes"
+        self.kept += len(chunk)
+        text = self._decoder.decode(chunk)
+        self._parts.append(text)
+        if self.stop is None and self.until is not None and self.until(text):
+            self.stop = "enough"
+        return self.stop is not None
+
+    def text(self):
+        held = b"" if self.stop else self._held
+        text = "".join(self._parts) + self._decoder.decode(held, final=True)
+        if self.stop:
+            # a cut body ends inside some tag; drop it rather than leave the
+            # parsers an unterminated tag to read as text
+            cut = text.rfind("<")
+            text = text[:cut] if cut > 0 else text
+        return text
+
+    def record(self, host):
+        METRICS.inc("fetch_bytes_total", self.read, host=host)
+        if self.stop:
+            METRICS.inc("fetch_truncated_total", host=host, reason=self.stop)
+
+def fetch_html_once(url, timeout=None, polite=True, max_bytes=MAX_PAGE_BYTES, until=None):
+    """
+    Return the body of url as text after a single attempt; raise on any failure
+    (NotHTMLError for a non-HTML Content-Type, whose body is never downloaded).
+    At most max_bytes are read; until, if given, is called with each newly decoded
+    piece of text and ends the download early by returning True.
+    """
+    host = host_of(url)
+    t0 = time.perf_counter()
+    with request(url, timeout=timeout, polite=polite, stream=True) as resp:
+        if resp.status_code != 200:
+            raise HTTPStatusError(resp.status_code, url)
+        content_type = resp.headers.get("Content-Type")
+        if not is_html(content_type):
+            METRICS.inc("fetch_skipped_total", host=host, reason="content_type")
+            raise NotHTMLError(content_type, url)
+        body = BodyReader(resp.encoding, max_bytes, until)
+        try:
+            for chunk in resp.iter_content(CHUNK_BYTES):
+                if body.feed(chunk):
+                    break  # closing with the rest unread drops this connection, not the pool
+        except Exception as e:
+            BREAKER.failure(url, e)  # a body that stalls mid-read counts as a timeout
+            raise
+    METRICS.observe("fetch_seconds", time.perf_counter() - t0, host=host)
+    body.record(host)
+    return body.text()
+
+@retry_policy
+def fetch_html(url, timeout=None, polite=True, max_bytes=MAX_PAGE_BYTES, until=None):
+    """fetch_html_once, retrying transient failures."""
+    return fetch_html_once(url, timeout=timeout, polite=polite, max_bytes=max_bytes, until=until)
+
+# concurrent safe_get calls for one URL share a single download, and the most recent
+# bodies are kept so rows queued behind the first fetch of a page don't repeat it
+IN_FLIGHT = SingleFlight()
+RECENT_PAGES = Memo(CONFIG.get("memo_recent_pages", 256))
+
+def _safe_fetch(url, timeout, polite, until=None):
+    try:
+        return fetch_html_once(url, timeout=timeout, polite=polite, until=until)
+    except Exception:
+        return None
+
+def safe_get(url, timeout=None, polite=True, until=None):
+    """
+    Like fetch_html_once but returns None instead of raising (used by the
+    enrichers). There are no retries: their backoff sleeps would hold a worker
+    outside the politeness scheduler, and the async engine doesn't retry either;
+    a page that failed leaves the search unfinished for a later run.
+    If another thread is already fetching url, waits for and returns its result.
+    Failures are not kept (the next caller tries again). With until the page may
+    come back cut short, so it is neither shared nor kept.
+    """
+    if not url or url == "-":
+        return None
+    if until is not None:
+        return _safe_fetch(url, timeout, polite, until)
+    return RECENT_PAGES.get_or_compute(url, lambda: _safe_fetch(url, timeout, polite), flight=IN_FLIGHT,
+                                       keep=lambda body: body is not None)
@@ -2,15 +2,62 @@
 from aicte_parser import load_aicte_karnataka
 from ugc_parser import load_ugc_karnataka
 from vtu_parser import load_vtu_rows
-from utils import save_outputs, normalize_text
+from utils import save_outputs, output_paths, normalize_text
+from politeness import SCHEDULER
+from entity_resolution import resolve_entities, THRESHOLD
+from manifest import MANIFEST, rows_hash
+from sources import CONFIG
+import metrics
+from metrics import METRICS
 import pandas as pd
-import argparse
+import argparse, os, threading, time
 
-def gather(limit_per_source=0):
+SOURCES = [("aicte", load_aicte_karnataka), ("ugc", load_ugc_karnataka), ("vtu", load_vtu_rows)]
+DEADLINES = CONFIG.get("source_deadline_seconds", {})
+SQLITE_MODE = CONFIG.get("sqlite_output_mode", "upsert")
+
+def load_sources(sources=SOURCES, deadlines=DEADLINES, timings=None):
+    """
+    Run every source loader concurrently. Each gets its own deadline (seconds, from
+    source_deadline_seconds in config.json); a loader still running at its deadline is
+    abandoned with no rows so one slow mirror can't hold up the run. Returns
+    {name: rows}; timings, if given, is filled with {name: (seconds, status)}.
+    """
+    results, started = {}, time.monotonic()
+    done = {name: threading.Event() for name, _ in sources}
+
+    def run(name, fn):
+        t0 = time.monotonic()
+        try:
+            with metrics.source(name):
+                results[name] = (fn(), "ok", time.monotonic() - t0)
+        except Exception as e:
+            print(f"[MAIN] {name} loader failed:", e)
+            results[name] = ([], "error", time.monotonic() - t0)
+        done[name].set()
+
+    # daemon threads: an abandoned loader must not keep the process alive at exit
+    for name, fn in sources:
+        threading.Thread(target=run, args=(name, fn), name=f"load-{name}", daemon=True).start()
+
+    out = {}
+    for name, _ in sources:
+        limit = deadlines.get(name)
+        left = None if limit is None else max(0, started + limit - time.monotonic())
+        if done[name].wait(left):
+            rows, status, secs = results[name]
+        else:
+            print(f"[MAIN] {name} missed its {limit}s deadline; continuing without it")
+            rows, status, secs = [], "timeout", time.monotonic() - started
+        out[name] = rows
+        if timings is not None:
+            timings[name] = (secs, status)
+    return out
+
+def gather(limit_per_source=0, timings=None):
     rows = []
-    rows_a = load_aicte_karnataka()
-    rows_u = load_ugc_karnataka()
-    rows_v = load_vtu_rows()
+    loaded = load_sources(timings=timings)
+    rows_a, rows_u, rows_v = loaded["aicte"], loaded["ugc"], loaded["vtu"]
     if limit_per_source>0:
         rows_a = rows_a[:limit_per_source]
         rows_u = rows_u[:limit_per_source]
@@ -18,26 +65,63 @@ def gather(limit_per_source=0):
     rows.extend(rows_a)
     rows.extend(rows_u)
     rows.extend(rows_v)
+    if not rows:
+        return pd.DataFrame(rows)
+    # dedup only re-runs when some source's rows changed since the last run. It then
+    # re-runs over every source's rows, not just the changed one's: a changed row can
+    # join or split clusters made of other sources' rows, so earlier clusters can't
+    # be patched. At Karnataka scale the full pass takes seconds.
+    merged = MANIFEST.cached_stage("dedup", rows_hash([rows, THRESHOLD]), lambda: dedupe(rows))
+    return pd.DataFrame(merged)
+
+def dedupe(rows):
     df = pd.DataFrame(rows)
-    if df.empty:
-        return df
     df['college_name'] = df['college_name'].apply(normalize_text)
     df['district'] = df['district'].apply(lambda x: normalize_text(x) if x else "-")
-    df = df.drop_duplicates(subset=['college_name','district'], keep='first')
-    return df
+    # fuzzy match across sources (spellings, abbreviations, district aliases);
+    # merged rows list every contributing source in source_urls
+    before = len(df)
+    with METRICS.timer("parse_seconds", stage="dedup"):
+        df = resolve_entities(df)
+    print(f"[MAIN] Entity resolution merged {before} rows into {len(df)} colleges")
+    return df.to_dict(orient="records")
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--limit-per-source", type=int, default=0)
+    parser.add_argument("--force", action="store_true", help="ignore the manifest and redo every stage")
     args = parser.parse_args()
+    MANIFEST.force = args.force
     print("[MAIN] Starting gather")
-    df = gather(limit_per_source=args.limit_per_source)
+    timings = {}
+    df = gather(limit_per_source=args.limit_per_source, timings=timings)
     if df.empty:
         print("[MAIN] No rows extracted; exiting.")
+        print_timings(timings)
+        report_metrics()
         return
     print(f"[MAIN] {len(df)} unique colleges collected.")
-    csv_path, json_path, sqlite_path = save_outputs(df)
-    print("[MAIN] Saved outputs:", csv_path, json_path, sqlite_path)
+    out_key = MANIFEST.stages.get("dedup", {}).get("key")
+    paths = output_paths()
+    if MANIFEST.unchanged("outputs", out_key) and all(os.path.exists(p) for p in paths):
+        print("[MAIN] Nothing changed upstream; outputs left as they are:", *paths)
+    else:
+        paths = save_outputs(df, sqlite_mode=SQLITE_MODE)
+        MANIFEST.mark("outputs", out_key)
+        print("[MAIN] Saved outputs:", *paths)
+    print(SCHEDULER.summary())
+    print_timings(timings)
+    report_metrics()
+
+def print_timings(timings):
+    for name, (secs, status) in timings.items():
+        print(f"[MAIN] source {name}: {secs:.1f}s ({status})")
+
+def report_metrics():
+    print(metrics.summary())
+    paths = metrics.write_reports("gather")
+    if paths:
+        print("[MAIN] Metrics written to", *paths)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,77 @@
+# manifest.py -- content-hash manifest that lets unchanged pipeline stages be skipped
+#
+# Every stage (one per source parse, then dedup, then output writing) is recorded
+# with a key: the hash of its input. On the next run a stage whose key is unchanged
+# reuses its stored result instead of recomputing it, so a re-run where nothing
+# upstream changed only re-hashes the (cached) downloads.
+#
+# Files live under pipeline_cache_dir from config.json; --force in main.py ignores them.
+
+import os, json, hashlib, threading
+from sources import CONFIG
+
+CACHE_DIR = CONFIG.get("pipeline_cache_dir", ".pipeline_cache")
+
+def content_hash(*parts):
+    """sha256 over bytes/str parts (str is utf-8 encoded)."""
+    h = hashlib.sha256()
+    for p in parts:
+        h.update(p.encode("utf-8") if isinstance(p, str) else p)
+        h.update(b"\0")
+    return h.hexdigest()
+
+def rows_hash(rows):
+    return content_hash(json.dumps(rows, sort_keys=True, ensure_ascii=False, default=str))
+
+class Manifest:
+    def __init__(self, folder=CACHE_DIR):
+        self.folder = folder
+        self.path = os.path.join(folder, "manifest.json")
+        self.force = False
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.stages = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.stages = {}
+
+    def _save(self):
+        os.makedirs(self.folder, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.stages, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def _result_file(self, name):
+        return os.path.join(self.folder, name.replace(":", "_").replace("/", "_") + ".json")
+
+    def unchanged(self, name, key):
+        """True if stage name last ran with the same input key (and --force is off)."""
+        with self._lock:
+            return not self.force and self.stages.get(name, {}).get("key") == key
+
+    def mark(self, name, key, **info):
+        with self._lock:
+            self.stages[name] = dict(info, key=key)
+            self._save()
+
+    def cached_stage(self, name, key, compute):
+        """
+        Return compute()'s JSON-serializable result, or the stored one if stage name
+        already ran with this key.
+        """
+        path = self._result_file(name)
+        if self.unchanged(name, key) and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+            print(f"[MANIFEST] {name} unchanged; reusing stored result")
+            return result
+        result = compute()
+        os.makedirs(self.folder, exist_ok=True)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+        self.mark(name, key)
+        return result
+
+MANIFEST = Manifest()
@@ -0,0 +1,117 @@
+# memo.py -- run-wide memoization and single-flight coalescing for the enrichers
+#
+# Many rows point at the same website: affiliated colleges on one trust's domain, and
+# the same college listed by AICTE, UGC and VTU. SingleFlight makes concurrent requests
+# for one key share a single call (the first caller does the work, the rest wait for
+# its result); Memo keeps finished results for the rest of the run, so later rows for
+# the same site skip the fetches and the parsing altogether.
+#
+# Entries live in memory only; the bound is "memo_max_entries" in config.json.
+
+import threading
+from collections import OrderedDict
+from sources import CONFIG
+
+MAX_ENTRIES = CONFIG.get("memo_max_entries", 100000)
+
+MISSING = object()
+
+class _Call:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+class SingleFlight:
+    """do(key, fn): run fn once per key at a time; concurrent callers share its outcome."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.shared = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+        try:
+            call.value = fn()
+            return call.value
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+class Memo:
+    """Thread-safe LRU of finished results, bounded by entry count."""
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=MISSING):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key, fn, flight=None, keep=None):
+        """
+        Memoized fn(); with flight, concurrent misses for key run fn only once.
+        keep(value), if given, decides whether a result is kept (e.g. not failures).
+        """
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+
+        def compute():
+            # another caller may have finished it while we waited to lead
+            value = self.get(key)
+            if value is MISSING:
+                value = fn()
+                if keep is None or keep(value):
+                    self.put(key, value)
+            return value
+        if flight is None:
+            return compute()
+        return flight.do(key, compute)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+def summary(**memos):
+    """One-line hit counts, e.g. summary(sites=SITE_RESULTS, pages=PAGE_FINDINGS)."""
+    parts = [f"{name} {m.hits} hits / {len(m)} kept" for name, m in memos.items()]
+    return "[MEMO] " + ", ".join(parts)
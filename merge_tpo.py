@@ -1,8 +1,9 @@
 # merge_tpo.py
 import pandas as pd
+from utils import output_paths, read_output
 
-main_df = pd.read_csv("output/colleges.csv")
-tpo_df  = pd.read_csv("output/tpo_verification_sheet.csv")
+main_df = read_output(output_paths()[0])
+tpo_df  = read_output("output/tpo_verification_sheet.csv")
 
 merged = pd.merge(
     main_df,
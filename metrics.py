@@ -0,0 +1,415 @@
+# metrics.py -- per-stage counters, latency histograms and per-college traces
+#
+# One process-wide registry (METRICS) that the fetch, cache, retry, parse and
+# extraction paths report into, labelled by source (aicte, ugc, vtu, tpo_auto, ...)
+# and by host. DNS lookups are timed by wrapping socket.getaddrinfo, so a slow run
+# can be pinned on name resolution, on a few slow hosts, or on parsing.
+# TRACER keeps the slowest per-college spans (see choose_tpo_for_college).
+#
+# At the end of a run write_reports(run) writes a JSON summary and a Prometheus
+# text-format file (settings in the "metrics" block of config.json).
+
+import bisect, contextlib, contextvars, heapq, json, os, socket, threading, time
+from collections import defaultdict
+from urllib.parse import urlparse
+from sources import CONFIG
+
+METRICS_CFG = CONFIG.get("metrics", {})
+OUTPUT_FOLDER = CONFIG.get("output_folder", "output")
+
+# seconds; Prometheus-style upper bounds (an implicit +Inf bucket follows)
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+HELP = {
+    "fetch_seconds": "Wall time of one HTTP GET, body included",
+    "fetch_bytes_total": "Response body bytes downloaded",
+    "fetch_requests_total": "HTTP GETs by status (error: no response)",
+    "fetch_skipped_total": "Requests or page bodies skipped (reason: content_type, host_down)",
+    "breaker_trips_total": "Hosts whose circuit breaker tripped (reason: dns, refused, timeout; outage: not persisted)",
+    "breaker_held_total": "Trips withheld because the resolver probe failed too",
+    "fetch_truncated_total": "Page downloads stopped early (reason: max_bytes, enough)",
+    "politeness_wait_seconds": "Time spent waiting for a host's politeness token",
+    "dns_seconds": "Time spent in getaddrinfo",
+    "dns_failures_total": "getaddrinfo calls that raised",
+    "cache_requests_total": "HTTP cache lookups by result (hit, miss, revalidated, refetched, bypass)",
+    "retries_total": "Retries scheduled by the tenacity retry policy",
+    "parse_seconds": "Time spent parsing documents (CSV, tables, links, soup, dedup)",
+    "extract_seconds": "Time spent scanning page text for contacts",
+    "span_seconds": "Duration of traced spans (one per college)",
+    "website_lookups_total": "Website index lookups by result (exact, fuzzy, miss)",
+}
+
+# which stage of the pipeline the current thread/task works for; set with source()
+SOURCE = contextvars.ContextVar("metrics_source", default="-")
+
+@contextlib.contextmanager
+def source(name):
+    """Label everything recorded inside the block (in this thread or task) with source=name."""
+    token = SOURCE.set(name)
+    try:
+        yield
+    finally:
+        SOURCE.reset(token)
+
+def carry(fn):
+    """fn run in a copy of the caller's context (and so its source), for executor threads."""
+    ctx = contextvars.copy_context()
+    return lambda *args, **kwargs: ctx.copy().run(fn, *args, **kwargs)
+
+def host_of(url):
+    return (urlparse(url).hostname or "-").lower()
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        for i, c in enumerate(other.counts):
+            self.counts[i] += c
+        self.sum += other.sum
+        self.count += other.count
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (the max for the last bucket)."""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                return min(BUCKETS[i], self.max) if i < len(BUCKETS) else self.max
+        return self.max
+
+    def as_dict(self):
+        return {"count": self.count, "sum": round(self.sum, 4), "max": round(self.max, 4),
+                **{f"p{q}": round(self.quantile(q / 100), 4) for q in (50, 90, 99)}}
+
+class Metrics:
+    """
+    Thread-safe counters and histograms keyed by (name, labels). Code running in
+    a worker process can record into a capture() list and have the parent merge()
+    it, since the child's registry is lost with the process.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._counters = defaultdict(float)
+        self._histograms = defaultdict(Histogram)
+        self._local = threading.local()
+
+    @staticmethod
+    def _key(name, labels):
+        labels.setdefault("source", SOURCE.get())
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        captured = getattr(self._local, "capture", None)
+        if captured is not None:
+            return captured.append(("c", key, value))
+        with self._lock:
+            self._counters[key] += value
+
+    def observe(self, name, seconds, **labels):
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        captured = getattr(self._local, "capture", None)
+        if captured is not None:
+            return captured.append(("h", key, seconds))
+        with self._lock:
+            self._histograms[key].observe(seconds)
+
+    @contextlib.contextmanager
+    def timer(self, name, **labels):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - t0, **labels)
+
+    @contextlib.contextmanager
+    def capture(self):
+        """Collect this thread's records into a list instead of the registry."""
+        records = []
+        prev = getattr(self._local, "capture", None)
+        self._local.capture = records
+        try:
+            yield records
+        finally:
+            self._local.capture = prev
+
+    def merge(self, records):
+        """Apply records from capture() (e.g. returned by a worker process)."""
+        with self._lock:
+            for kind, key, value in records:
+                if kind == "c":
+                    self._counters[key] += value
+                else:
+                    self._histograms[key].observe(value)
+
+    def snapshot(self):
+        """(counters, histograms) copies: {(name, labels): value / Histogram}."""
+        with self._lock:
+            hists = {}
+            for key, h in self._histograms.items():
+                hists[key] = Histogram()
+                hists[key].merge(h)
+            return dict(self._counters), hists
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.started = time.time()
+
+METRICS = Metrics(enabled=METRICS_CFG.get("enabled", True))
+
+# --- DNS ---------------------------------------------------------------------
+
+_getaddrinfo = socket.getaddrinfo
+
+def _timed_getaddrinfo(host, *args, **kwargs):
+    t0 = time.perf_counter()
+    try:
+        return _getaddrinfo(host, *args, **kwargs)
+    except Exception:
+        METRICS.inc("dns_failures_total", host=str(host).lower())
+        raise
+    finally:
+        METRICS.observe("dns_seconds", time.perf_counter() - t0, host=str(host).lower())
+
+def install_dns_timer():
+    """Time every getaddrinfo (requests/urllib3 and aiohttp's resolver both use it)."""
+    if METRICS.enabled and METRICS_CFG.get("time_dns", True):
+        socket.getaddrinfo = _timed_getaddrinfo
+
+# --- tracing -----------------------------------------------------------------
+
+class Span:
+    """One traced unit of work (a college): attributes, timed events, duration."""
+
+    __slots__ = ("name", "attrs", "start", "events", "seconds", "_t0")
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+        self.start = time.time()
+        self.events = []
+        self.seconds = None
+        self._t0 = time.perf_counter()
+
+    def event(self, name, **fields):
+        self.events.append(dict(event=name, at=round(time.perf_counter() - self._t0, 4), **fields))
+
+    def as_dict(self):
+        return {"span": self.name, "start": self.start, "seconds": round(self.seconds or 0, 4),
+                **self.attrs, "events": self.events}
+
+class Tracer:
+    """Keeps the `keep` slowest finished spans; every span's duration goes to span_seconds."""
+
+    def __init__(self, keep=50):
+        self.keep = keep
+        self.finished = 0
+        self._slowest = []  # min-heap of (seconds, seq, span)
+        self._lock = threading.Lock()
+
+    def start(self, name, **attrs):
+        return Span(name, attrs)
+
+    def finish(self, span, **attrs):
+        span.seconds = time.perf_counter() - span._t0
+        span.attrs.update(attrs)
+        METRICS.observe("span_seconds", span.seconds, span=span.name)
+        with self._lock:
+            self.finished += 1
+            item = (span.seconds, self.finished, span)
+            if len(self._slowest) < self.keep:
+                heapq.heappush(self._slowest, item)
+            elif item > self._slowest[0]:
+                heapq.heapreplace(self._slowest, item)
+
+    def slowest(self):
+        with self._lock:
+            return [s.as_dict() for _, _, s in sorted(self._slowest, reverse=True)]
+
+TRACER = Tracer(keep=METRICS_CFG.get("keep_slowest_spans", 50))
+
+# --- reports -----------------------------------------------------------------
+
+def _by(items, *fields):
+    """Group {(name, labels): x} by the given label fields -> {field values: [x, ...]}."""
+    out = defaultdict(list)
+    for (_, labels), x in items:
+        d = dict(labels)
+        out[tuple(d.get(f, "-") for f in fields)].append(x)
+    return out
+
+def _merged(hists):
+    h = Histogram()
+    for x in hists:
+        h.merge(x)
+    return h
+
+def summary_dict(top_hosts=None):
+    """Everything recorded so far, aggregated for reading: per stage, per source, slowest hosts."""
+    top_hosts = top_hosts or METRICS_CFG.get("report_top_hosts", 20)
+    counters, hists = METRICS.snapshot()
+    out = {"started": METRICS.started, "seconds": round(time.time() - METRICS.started, 3)}
+
+    hist_names = sorted({name for name, _ in hists})
+    out["histograms"] = {}
+    for name in hist_names:
+        items = [(k, h) for k, h in hists.items() if k[0] == name]
+        entry = {"all": _merged(h for _, h in items).as_dict()}
+        for field in ("source", "stage", "extractor", "span"):
+            groups = _by(items, field)
+            if len(groups) > 1 or ("-",) not in groups:
+                entry[f"by_{field}"] = {g[0]: _merged(hs).as_dict() for g, hs in sorted(groups.items())}
+        out["histograms"][name] = entry
+
+    out["counters"] = {}
+    for (name, labels), value in sorted(counters.items()):
+        d = {k: v for k, v in labels if k != "host"}
+        label = ",".join(f"{k}={v}" for k, v in d.items()) or "-"
+        bucket = out["counters"].setdefault(name, {})
+        bucket[label] = bucket.get(label, 0) + value
+
+    # the hosts that cost the most fetch time, with their bytes, errors and DNS time
+    fetch = _by([(k, h) for k, h in hists.items() if k[0] == "fetch_seconds"], "host")
+    dns = _by([(k, h) for k, h in hists.items() if k[0] == "dns_seconds"], "host")
+    per_host = defaultdict(lambda: {"bytes": 0, "errors": 0, "retries": 0})
+    for (name, labels), value in counters.items():
+        d = dict(labels)
+        if name == "fetch_bytes_total":
+            per_host[d.get("host")]["bytes"] += value
+        elif name == "fetch_requests_total" and d.get("status") != "200":
+            per_host[d.get("host")]["errors"] += value
+        elif name == "retries_total":
+            per_host[d.get("host")]["retries"] += value
+    ranked = sorted(((_merged(hs), host) for (host,), hs in fetch.items()),
+                    key=lambda x: x[0].sum, reverse=True)[:top_hosts]
+    out["slowest_hosts"] = [
+        dict(host=host, fetch=h.as_dict(), dns=_merged(dns.get((host,), [])).as_dict(), **per_host[host])
+        for h, host in ranked]
+    out["slowest_spans"] = TRACER.slowest()
+    out["spans_finished"] = TRACER.finished
+    return out
+
+def _labels(labels, **extra):
+    d = dict(labels, **extra)
+    if not d:
+        return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in d.items()) + "}"
+
+def prometheus_text(top_hosts=None):
+    """
+    Prometheus text exposition of the registry. Only the top_hosts hosts by fetch
+    time keep their own host label; the rest are summed into host="other" so a
+    crawl of thousands of sites doesn't produce thousands of series.
+    """
+    top_hosts = top_hosts or METRICS_CFG.get("prometheus_top_hosts", 25)
+    counters, hists = METRICS.snapshot()
+    totals = defaultdict(float)
+    for (name, labels), h in hists.items():
+        if name == "fetch_seconds":
+            totals[dict(labels).get("host")] += h.sum
+    keep = set(sorted(totals, key=totals.get, reverse=True)[:top_hosts])
+
+    def fold(labels):
+        return tuple((k, v if k != "host" or v in keep else "other") for k, v in labels)
+
+    folded_c, folded_h = defaultdict(float), defaultdict(Histogram)
+    for (name, labels), v in counters.items():
+        folded_c[name, fold(labels)] += v
+    for (name, labels), h in hists.items():
+        folded_h[name, fold(labels)].merge(h)
+
+    lines = []
+    for name in sorted({n for n, _ in folded_c}):
+        lines += [f"# HELP {name} {HELP.get(name, name)}", f"# TYPE {name} counter"]
+        lines += [f"{name}{_labels(l)} {int(v) if v == int(v) else v}"
+                  for (n, l), v in sorted(folded_c.items()) if n == name]
+    for name in sorted({n for n, _ in folded_h}):
+        lines += [f"# HELP {name} {HELP.get(name, name)}", f"# TYPE {name} histogram"]
+        for (n, l), h in sorted(folded_h.items()):
+            if n != name:
+                continue
+            cum = 0
+            for bound, c in zip(BUCKETS + ("+Inf",), h.counts):
+                cum += c
+                lines.append(f"{name}_bucket{_labels(l, le=bound)} {cum}")
+            lines += [f"{name}_sum{_labels(l)} {h.sum:.6f}", f"{name}_count{_labels(l)} {h.count}"]
+    return "\n".join(lines) + "\n"
+
+def report_paths(run):
+    folder = METRICS_CFG.get("folder", OUTPUT_FOLDER)
+    return os.path.join(folder, f"metrics_{run}.json"), os.path.join(folder, f"metrics_{run}.prom")
+
+def write_reports(run):
+    """Write metrics_<run>.json and metrics_<run>.prom; returns their paths."""
+    if not METRICS.enabled:
+        return ()
+    json_path, prom_path = report_paths(run)
+    for path, text in ((json_path, json.dumps(summary_dict(), indent=2, default=str)),
+                       (prom_path, prometheus_text())):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    return json_path, prom_path
+
+def summary(top=5):
+    """A few human-readable lines: fetch latency, DNS, cache, retries, parse and slowest hosts."""
+    if not METRICS.enabled:
+        return "[METRICS] disabled"
+    s = summary_dict(top_hosts=top)
+    h, c = s["histograms"], s["counters"]
+    if "fetch_seconds" not in h and "parse_seconds" not in h:
+        return "[METRICS] nothing recorded"
+    lines = []
+    f = h.get("fetch_seconds", {}).get("all")
+    if f:
+        lines.append(f"[METRICS] {f['count']} fetches, {f['sum']:.1f}s total, p50 {f['p50']}s / "
+                     f"p99 {f['p99']}s / max {f['max']:.2f}s, "
+                     f"{sum(c.get('fetch_bytes_total', {}).values()) / 1e6:.1f} MB")
+    d = h.get("dns_seconds", {}).get("all")
+    if d:
+        lines.append(f"[METRICS] dns: {d['count']} lookups, {d['sum']:.1f}s total, p99 {d['p99']}s, "
+                     f"{sum(c.get('dns_failures_total', {}).values()):g} failed")
+    cache = defaultdict(float)
+    for label, v in c.get("cache_requests_total", {}).items():
+        cache[dict(p.split("=", 1) for p in label.split(",")).get("result")] += v
+    if cache:
+        lines.append("[METRICS] cache: " + ", ".join(f"{k} {v:g}" for k, v in sorted(cache.items())))
+    retries = sum(c.get("retries_total", {}).values())
+    if retries:
+        lines.append(f"[METRICS] {retries:g} retries")
+    for name in ("parse_seconds", "extract_seconds"):
+        for key in ("by_stage", "by_extractor"):
+            for stage, st in h.get(name, {}).get(key, {}).items():
+                lines.append(f"[METRICS] {name[:-8]} {stage}: {st['count']} x, {st['sum']:.2f}s, p99 {st['p99']}s")
+    for host in s["slowest_hosts"]:
+        lines.append(f"[METRICS]   {host['host']}: {host['fetch']['count']} req, {host['fetch']['sum']:.1f}s, "
+                     f"max {host['fetch']['max']:.2f}s, dns {host['dns']['sum']:.2f}s, {host['errors']:g} errors")
+    return "\n".join(lines)
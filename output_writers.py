@@ -0,0 +1,141 @@
+# output_writers.py -- streaming JSONL and Parquet writers for pipeline outputs
+#
+# Rows are appended as each stage produces them instead of being collected into one
+# big DataFrame/JSON string first. JSONL lines are flushed as they are written, so
+# other processes can tail partial results; Parquet is written one compressed row
+# group at a time (pyarrow is needed only when a Parquet writer is opened).
+
+import json, math, os
+from sources import CONFIG
+
+ROW_GROUP_ROWS = CONFIG.get("parquet_row_group_rows", 10000)
+COMPRESSION = CONFIG.get("parquet_compression", "zstd")
+
+def _clean(v):
+    # NaN (pandas' missing value) is not valid JSON
+    return None if isinstance(v, float) and math.isnan(v) else v
+
+def _dumps(row):
+    return json.dumps({k: _clean(v) for k, v in row.items()}, ensure_ascii=False, default=str)
+
+class JsonlWriter:
+    """One JSON object per line, flushed after every row so readers can tail the file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self._f = open(path, "w", encoding="utf-8")
+
+    def write(self, row):
+        self._f.write(_dumps(row))
+        self._f.write("\n")
+        self._f.flush()
+        self.rows += 1
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class JsonArrayWriter:
+    """The records-oriented JSON array of df.to_json(orient="records"), written row by row."""
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self._f = open(path, "w", encoding="utf-8")
+        self._f.write("[")
+
+    def write(self, row):
+        if self.rows:
+            self._f.write(",")
+        self._f.write(_dumps(row))
+        self.rows += 1
+
+    def close(self):
+        self._f.write("]")
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class ParquetWriter:
+    """
+    Buffers up to row_group_rows rows and writes each batch as one row group.
+    The schema comes from the first batch (all-null columns become strings).
+    """
+
+    def __init__(self, path, row_group_rows=ROW_GROUP_ROWS, compression=COMPRESSION):
+        import pyarrow  # noqa: F401  (fail early if the optional dependency is missing)
+        self.path = path
+        self.row_group_rows = row_group_rows
+        self.compression = compression
+        self.rows = 0
+        self._buf = []
+        self._writer = None
+        self._schema = None
+
+    def write(self, row):
+        self._buf.append({k: _clean(v) for k, v in row.items()})
+        self.rows += 1
+        if len(self._buf) >= self.row_group_rows:
+            self._flush()
+
+    def _flush(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        if not self._buf:
+            return
+        if self._writer is None:
+            table = pa.Table.from_pylist(self._buf)
+            fields = [pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f for f in table.schema]
+            self._schema = pa.schema(fields)
+            self._writer = pq.ParquetWriter(self.path + ".partial", self._schema, compression=self.compression)
+        table = pa.Table.from_pylist(self._buf, schema=self._schema)
+        self._writer.write_table(table, row_group_size=self.row_group_rows)
+        self._buf = []
+
+    def close(self):
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+            os.replace(self.path + ".partial", self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class MultiWriter:
+    """Fan every row out to several writers."""
+
+    def __init__(self, *writers):
+        self.writers = writers
+
+    def write(self, row):
+        for w in self.writers:
+            w.write(row)
+
+    def close(self):
+        for w in self.writers:
+            w.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def stream_rows(df):
+    """Yield a DataFrame's rows as dicts without materializing the whole list."""
+    cols = list(df.columns)
+    for values in df.itertuples(index=False, name=None):
+        yield dict(zip(cols, values))
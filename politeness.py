@@ -0,0 +1,197 @@
+# politeness.py -- per-host token-bucket scheduler that replaces the global sleeps
+#
+# Every host gets its own bucket (rate + burst from the "politeness" block of
+# config.json). A request only ever waits for its own host's bucket, so work spread
+# over many college domains runs at full speed while each single site still sees
+# at most `rate_per_second` requests per second.
+
+import asyncio, threading, time
+from collections import defaultdict, deque
+from urllib.parse import urlparse
+from sources import CONFIG
+
+POLITENESS = CONFIG.get("politeness", {})
+
+def host_of(url):
+    return urlparse(url).netloc.lower()
+
+class TokenBucket:
+    """Classic token bucket. reserve() never blocks: it returns how long to wait."""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self, now):
+        """Seconds until one token is free (0 if one is free now)."""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def reserve(self, now):
+        """Take a token, going into debt if needed; returns the wait the caller owes."""
+        wait = self.available(now)
+        self.tokens -= 1
+        return wait
+
+class HostScheduler:
+    """
+    Per-host politeness. Two ways to use it:
+
+    * acquire(url) / acquire_async(url) before a request; only the caller sleeps,
+      and only as long as its own host requires.
+    * put(url, item) / get(): a ready queue that hands out the next item whose host
+      has a free token, so worker threads never sit idle behind one busy host.
+
+    stats() reports, per host, the current queue depth, how many requests were
+    granted and the total/maximum time they spent waiting.
+    """
+
+    def __init__(self, rate_per_second=1.0, burst=1, host_overrides=None):
+        self.rate = rate_per_second
+        self.burst = burst
+        self.host_overrides = host_overrides or {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._pending = defaultdict(deque)  # host -> deque of (enqueued_at, item)
+        self._waiting = defaultdict(int)    # host -> callers blocked in acquire()
+        self._stats = defaultdict(lambda: {"granted": 0, "wait_seconds": 0.0, "max_wait": 0.0, "max_queue": 0})
+
+    @classmethod
+    def from_config(cls, cfg=POLITENESS):
+        rate = cfg.get("rate_per_second")
+        if rate is None:
+            rate = 1.0 / max(CONFIG.get("rate_limit_seconds", 1.0), 1e-6)
+        return cls(rate_per_second=rate, burst=cfg.get("burst", 1),
+                   host_overrides=cfg.get("host_overrides", {}))
+
+    def _bucket(self, host):
+        b = self._buckets.get(host)
+        if b is None:
+            o = self.host_overrides.get(host, {})
+            b = TokenBucket(o.get("rate_per_second", self.rate), o.get("burst", self.burst))
+            self._buckets[host] = b
+        return b
+
+    def _depth(self, host):
+        return self._waiting[host] + len(self._pending[host])
+
+    def _record(self, host, waited):
+        st = self._stats[host]
+        st["granted"] += 1
+        st["wait_seconds"] += waited
+        st["max_wait"] = max(st["max_wait"], waited)
+
+    # --- direct acquisition -------------------------------------------------
+
+    def _reserve(self, url):
+        host = host_of(url)
+        with self._lock:
+            wait = self._bucket(host).reserve(time.monotonic())
+            if wait > 0:
+                self._waiting[host] += 1
+                st = self._stats[host]
+                st["max_queue"] = max(st["max_queue"], self._depth(host))
+            self._record(host, wait)
+        return host, wait
+
+    def _release_wait(self, host):
+        with self._lock:
+            self._waiting[host] -= 1
+
+    def acquire(self, url):
+        """Block until url's host may be hit again; returns seconds waited."""
+        host, wait = self._reserve(url)
+        if wait > 0:
+            try:
+                time.sleep(wait)
+            finally:
+                self._release_wait(host)
+        return wait
+
+    async def acquire_async(self, url):
+        host, wait = self._reserve(url)
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                self._release_wait(host)
+        return wait
+
+    # --- ready queue --------------------------------------------------------
+
+    def put(self, url, item):
+        host = host_of(url)
+        with self._ready:
+            self._pending[host].append((time.monotonic(), item))
+            st = self._stats[host]
+            st["max_queue"] = max(st["max_queue"], self._depth(host))
+            self._ready.notify()
+
+    def pending(self):
+        with self._lock:
+            return sum(len(q) for q in self._pending.values())
+
+    def get(self, timeout=None):
+        """
+        Return the oldest queued item whose host has a token (consuming the token),
+        waiting as long as needed. Returns None if the queue stays empty for timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._ready:
+            while True:
+                now = time.monotonic()
+                best, best_at, soonest = None, None, None
+                for host, q in self._pending.items():
+                    if not q:
+                        continue
+                    wait = self._bucket(host).available(now)
+                    if wait == 0:
+                        if best is None or q[0][0] < best_at:
+                            best, best_at = host, q[0][0]
+                    elif soonest is None or wait < soonest:
+                        soonest = wait
+                if best is not None:
+                    q = self._pending[best]
+                    enqueued_at, item = q.popleft()
+                    if not q:
+                        del self._pending[best]
+                    self._bucket(best).reserve(now)
+                    self._record(best, now - enqueued_at)
+                    return item
+                if deadline is not None:
+                    left = deadline - now
+                    if left <= 0:
+                        return None
+                    soonest = left if soonest is None else min(soonest, left)
+                self._ready.wait(soonest)
+
+    # --- reporting ----------------------------------------------------------
+
+    def stats(self):
+        with self._lock:
+            out = {}
+            for host, st in self._stats.items():
+                out[host] = dict(st, queued=self._depth(host))
+            return out
+
+    def summary(self, top=10):
+        """Human-readable table of the hosts that cost the most waiting."""
+        st = self.stats()
+        if not st:
+            return "[POLITE] no requests scheduled"
+        lines = [f"[POLITE] {len(st)} hosts, {sum(s['granted'] for s in st.values())} requests, "
+                 f"{sum(s['wait_seconds'] for s in st.values()):.1f}s total wait"]
+        worst = sorted(st.items(), key=lambda kv: kv[1]["wait_seconds"], reverse=True)[:top]
+        for host, s in worst:
+            lines.append(f"[POLITE]   {host}: {s['granted']} req, wait {s['wait_seconds']:.1f}s "
+                         f"(max {s['max_wait']:.1f}s), queue now {s['queued']} / max {s['max_queue']}")
+        return "\n".join(lines)
+
+SCHEDULER = HostScheduler.from_config()
@@ -1,31 +1,77 @@
 # filename: run_tpo_auto.py
 # One-line: runs high-accuracy auto TPO enrichment and saves final CSV.
 
-import pandas as pd
-from tpo_auto_enrichment import auto_enrich_dataframe
+import argparse, csv, time
+from tpo_auto_enrichment import iter_enrich, memo_summary
+import metrics
+from politeness import SCHEDULER
+from host_breaker import BREAKER
+from sources import CONFIG
+from utils import output_paths, read_output, open_row_writers
+import sqlite_output
 
 IN_FILE = "output/colleges.csv"
 OUT_FILE = "output/final_karnataka_colleges_tpo_high_accuracy.csv"
 
+parser = argparse.ArgumentParser()
+parser.add_argument("--force", action="store_true",
+                    help="re-search every college instead of resuming from the checkpoint")
+parser.add_argument("--parse-workers", default=CONFIG.get("parse_workers", 0),
+                    help='processes for page parsing and scoring (0: in the fetch threads, "auto": one per CPU)')
+parser.add_argument("--progress-seconds", type=float, default=10,
+                    help="how often to print progress and throughput")
+args = parser.parse_args()
+
 print("[RUN] Loading", IN_FILE)
-df = pd.read_csv(IN_FILE, dtype=str)
+df = read_output(IN_FILE)
 df.fillna("-", inplace=True)
 
-print("[RUN] Running high-accuracy TPO enrichment. This may take time (network-bound).")
-df_out = auto_enrich_dataframe(df, max_workers=6, strict=True)
-
 # keep desired columns and order
 desired_cols = [
     "college_name", "city_town", "district", "affiliating_university",
     "TPO_NAME", "TPO_EMAIL", "TPO_PHONE", "tpo_confidence_score",
     "tpo_website_used", "tpo_placement_page", "source_url"
 ]
-for c in desired_cols:
-    if c not in df_out.columns:
-        df_out[c] = "-"
 
-df_out = df_out[desired_cols]
-df_out.to_csv(OUT_FILE, index=False, encoding="utf-8")
+# rows are streamed to .csv/.jsonl/.parquet in input order as soon as they are ready
+STREAM_BASE = OUT_FILE[:-len(".csv")]
+print("[RUN] Running high-accuracy TPO enrichment. This may take time (network-bound).")
+print("[RUN] Streaming results to", STREAM_BASE + ".jsonl")
+total = len(df)
+started = last_report = time.monotonic()
+found = 0
+pages = 0
+with open(OUT_FILE, "w", encoding="utf-8", newline="") as f, open_row_writers(STREAM_BASE) as writer:
+    csv_out = csv.DictWriter(f, fieldnames=desired_cols)
+    csv_out.writeheader()
+    for done, (pos, row) in enumerate(iter_enrich(df, ordered=True, max_workers=6, strict=True,
+                                                  force=args.force, parse_workers=args.parse_workers), start=1):
+        out = {c: row.get(c, "-") for c in desired_cols}
+        csv_out.writerow(out)
+        writer.write(out)
+        if out["TPO_EMAIL"] != "-" or out["TPO_PHONE"] != "-" or out["TPO_NAME"] != "-":
+            found += 1
+        pages += int(row.get("tpo_pages_fetched", 0) or 0)
+        now = time.monotonic()
+        if now - last_report >= args.progress_seconds or done == total:
+            f.flush()
+            rate = done / max(now - started, 1e-9)
+            eta = (total - done) / rate if rate else 0
+            print(f"[RUN] {done}/{total} colleges ({100 * done / max(total, 1):.1f}%), "
+                  f"{found} with TPO, {rate:.2f} colleges/s, {pages / done:.1f} pages/college, "
+                  f"ETA {eta / 60:.1f} min", flush=True)
+            last_report = now
+
+df_out = read_output(OUT_FILE).fillna("-")
 print("[RUN] Saved:", OUT_FILE)
+if CONFIG.get("sqlite_output_mode", "upsert") == "upsert":
+    sqlite_path = output_paths()[2]
+    changed = sqlite_output.upsert(df_out, sqlite_path, update_columns=sqlite_output.TPO_COLUMNS)
+    print(f"[RUN] Upserted TPO columns into {sqlite_path}: {changed} rows changed")
 print("[RUN] Summary: total rows:", len(df_out))
 print(df_out[["college_name","TPO_NAME","TPO_EMAIL","TPO_PHONE","tpo_confidence_score"]].head(10))
+print(SCHEDULER.summary())
+print(BREAKER.summary())
+print(memo_summary())
+print(metrics.summary())
+print("[RUN] Metrics written to", *metrics.write_reports("tpo_auto"))
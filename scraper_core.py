@@ -1,35 +1,43 @@
 # scraper_core.py
-import os, time, json, hashlib, requests
-from tenacity import retry, wait_exponential, stop_after_attempt
 from bs4 import BeautifulSoup
-from urllib.parse import urlparse
+from http_client import request, retry_policy, HTTPStatusError
+from http_cache import CACHE, decode_body
+from metrics import METRICS
 
-with open("config.json","r",encoding="utf-8") as f:
-    CONFIG = json.load(f)
-
-CACHE_DIR = ".http_cache"
-os.makedirs(CACHE_DIR, exist_ok=True)
-
-def _cache_path(url):
-    return os.path.join(CACHE_DIR, hashlib.sha256(url.encode()).hexdigest() + ".html")
-
-@retry(wait=wait_exponential(min=1, max=10), stop=stop_after_attempt(4))
-def fetch_text(url, use_cache=True, timeout=None):
-    timeout = timeout or CONFIG.get("timeout_seconds", 15)
-    if use_cache:
-        cache = _cache_path(url)
-        if os.path.exists(cache):
-            return open(cache,"r",encoding="utf-8").read()
-    headers = {"User-Agent": CONFIG.get("user_agent")}
-    s = requests.Session()
-    resp = s.get(url, headers=headers, timeout=timeout, verify=False)
+@retry_policy
+def fetch_bytes(url, use_cache=True, timeout=None, ttl=None):
+    """
+    GET url through the HTTP cache and return (meta, body) with body as raw bytes.
+    Fresh entries are returned without touching the network; stale ones are
+    revalidated with If-None-Match / If-Modified-Since. use_cache=False neither
+    reads nor writes the cache. ttl overrides the per-host TTL.
+    """
+    if not use_cache:
+        METRICS.inc("cache_requests_total", result="bypass")
+        resp = request(url, timeout=timeout)
+        if resp.status_code == 200:
+            return {"url": url, "content_type": resp.headers.get("Content-Type"),
+                    "encoding": resp.encoding}, resp.content
+        raise HTTPStatusError(resp.status_code, url)
+    hit = CACHE.lookup(url)
+    if hit and CACHE.is_fresh(url, hit[0], ttl):
+        METRICS.inc("cache_requests_total", result="hit")
+        return hit
+    headers = CACHE.conditional_headers(hit[0]) if hit else None
+    resp = request(url, headers=headers, timeout=timeout)
+    if resp.status_code == 304 and hit:
+        METRICS.inc("cache_requests_total", result="revalidated")
+        return CACHE.revalidated(url, hit[0], hit[1], resp), hit[1]
     if resp.status_code == 200:
-        text = resp.text
-        if use_cache:
-            open(cache,"w",encoding="utf-8").write(text)
-        time.sleep(CONFIG.get("rate_limit_seconds",1.5))
-        return text
-    raise Exception(f"HTTP {resp.status_code} for {url}")
+        # a stale entry that had changed upstream, or nothing cached yet
+        METRICS.inc("cache_requests_total", result="refetched" if hit else "miss")
+        return CACHE.store_response(url, resp), resp.content
+    raise HTTPStatusError(resp.status_code, url)
+
+def fetch_text(url, use_cache=True, timeout=None, ttl=None):
+    """fetch_bytes decoded with the response's charset (utf-8 if it had none)."""
+    return decode_body(*fetch_bytes(url, use_cache=use_cache, timeout=timeout, ttl=ttl))
 
 def soupify(text):
-    return BeautifulSoup(text, "lxml")
+    with METRICS.timer("parse_seconds", stage="soup"):
+        return BeautifulSoup(text, "lxml")
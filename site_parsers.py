@@ -1,7 +1,7 @@
 # site_parsers.py -- VTU parser that uses mirror URL or local snapshot
 
-from scraper_core import fetch_html, soupify
-from utils import normalize_text
+from scraper_core import fetch_text
+from vtu_parser import iter_vtu_rows
 import os, json
 
 def parse_vtu_affiliated(_unused):
@@ -25,7 +25,7 @@ def parse_vtu_affiliated(_unused):
     if mirror:
         print(f"[VTU] Trying mirror: {mirror}")
         try:
-            html = fetch_html(mirror)
+            html = fetch_text(mirror)
         except Exception as e:
             print("[VTU] Mirror fetch failed:", e)
 
@@ -46,27 +46,10 @@ def parse_vtu_affiliated(_unused):
             return []
 
     # 3) Parse HTML
-    rows = []
-    soup = soupify(html)
-    tables = soup.find_all("table")
-    if not tables:
-        print("[VTU] No tables found in VTU HTML.")
+    rows = list(iter_vtu_rows(html, mirror or local))
+    if not rows:
+        print("[VTU] No table rows found in VTU HTML.")
         return []
 
-    for table in tables:
-        trs = table.find_all("tr")
-        for tr in trs[1:]:  # skip header
-            cols = [normalize_text(td.get_text()) for td in tr.find_all("td")]
-            if len(cols) >= 3:
-                rows.append({
-                    "college_name": cols[0],
-                    "city_town": cols[1],
-                    "district": cols[2],
-                    "affiliating_university": "VTU",
-                    "tpo_name": "-",
-                    "tpo_phone": "-",
-                    "source_url": mirror or local
-                })
-
     print(f"[VTU] Extracted {len(rows)} colleges.")
     return rows
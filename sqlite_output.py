@@ -0,0 +1,93 @@
+# sqlite_output.py -- upsert-based colleges table (stable schema, indexes, WAL)
+#
+# Instead of dropping and rebuilding the table on every run, rows are upserted on a
+# primary key built from the normalized college name and district. Unchanged rows
+# are not rewritten, lookups by district / affiliating_university use indexes, and
+# WAL mode lets readers keep querying while a run writes. A full run also deletes
+# the colleges it no longer produced (delete_missing).
+
+import sqlite3, time
+from entity_resolution import canonical_name, district_key
+
+TABLE = "colleges"
+BATCH_ROWS = 1000
+
+# DataFrame column -> table column. SQLite names are case-insensitive, so the
+# enrichment's TPO_NAME/TPO_PHONE can't share a table with the sources' tpo_name/tpo_phone.
+COLUMNS = {
+    "college_name": "college_name", "city_town": "city_town", "district": "district",
+    "affiliating_university": "affiliating_university", "tpo_name": "tpo_name",
+    "tpo_phone": "tpo_phone", "website": "website", "source_url": "source_url", "source_urls": "source_urls",
+    "TPO_NAME": "tpo_found_name", "TPO_EMAIL": "tpo_found_email", "TPO_PHONE": "tpo_found_phone",
+    "tpo_confidence_score": "tpo_confidence_score", "tpo_website_used": "tpo_website_used",
+    "tpo_placement_page": "tpo_placement_page",
+}
+TPO_COLUMNS = ["TPO_NAME", "TPO_EMAIL", "TPO_PHONE", "tpo_confidence_score",
+               "tpo_website_used", "tpo_placement_page"]
+
+def college_key(name, district):
+    return f"{canonical_name(name)}|{district_key(district)}"
+
+def connect(path):
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    existing = {r[1] for r in conn.execute(f"PRAGMA table_info({TABLE})")}
+    if existing and "college_key" not in existing:
+        # a table left by sqlite_mode="replace": no key to upsert on, rebuild it
+        print(f"[OUTPUT] Replacing unkeyed {TABLE} table with the upsert schema")
+        conn.execute(f"DROP TABLE {TABLE}")
+        existing = set()
+    cols = ", ".join(f'"{c}" TEXT' for c in COLUMNS.values())
+    conn.execute(f'CREATE TABLE IF NOT EXISTS {TABLE} (college_key TEXT PRIMARY KEY, {cols}, updated_at REAL)')
+    for c in COLUMNS.values():
+        if existing and c not in existing:
+            conn.execute(f'ALTER TABLE {TABLE} ADD COLUMN "{c}" TEXT')
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLE}_district ON {TABLE}(district)")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLE}_university ON {TABLE}(affiliating_university)")
+    conn.commit()
+    return conn
+
+def upsert(df, path, update_columns=None, delete_missing=False):
+    """
+    Upsert df's rows (those of its columns that are keys of COLUMNS) into path.
+    update_columns limits which columns an existing row may have overwritten
+    (default: all of them). Rows whose values are unchanged are left untouched.
+    delete_missing=True makes df the whole table: rows whose key is not in df are
+    deleted (unless df is empty, e.g. every source failed).
+    Returns the number of rows inserted, changed or deleted.
+    """
+    cols = [c for c in COLUMNS if c in df.columns]
+    update = [COLUMNS[c] for c in (update_columns or cols) if c in cols]
+    col_sql = ", ".join(f'"{COLUMNS[c]}"' for c in cols)
+    marks = ", ".join("?" for _ in range(len(cols) + 2))
+    set_sql = ", ".join(f'"{c}"=excluded."{c}"' for c in update)
+    changed_sql = " OR ".join(f'{TABLE}."{c}" IS NOT excluded."{c}"' for c in update)
+    sql = (f'INSERT INTO {TABLE} (college_key, {col_sql}, updated_at) VALUES ({marks}) '
+           f'ON CONFLICT(college_key) DO UPDATE SET {set_sql}, updated_at=excluded.updated_at '
+           f'WHERE {changed_sql}')
+    now = time.time()
+    records = df[cols].astype(object).where(df[cols].notna(), None).values.tolist()
+    conn = connect(path)
+    try:
+        before = conn.total_changes
+        keys = []
+        for i in range(0, len(records), BATCH_ROWS):
+            batch = []
+            for rec in records[i:i + BATCH_ROWS]:
+                row = dict(zip(cols, rec))
+                key = college_key(row.get("college_name", ""), row.get("district", ""))
+                keys.append((key,))
+                batch.append([key] + [None if v is None else str(v) for v in rec] + [now])
+            with conn:
+                conn.executemany(sql, batch)
+        changed = conn.total_changes - before
+        if delete_missing and keys:
+            with conn:
+                conn.execute("CREATE TEMP TABLE run_keys (college_key TEXT PRIMARY KEY)")
+                conn.executemany("INSERT OR IGNORE INTO run_keys VALUES (?)", keys)
+                changed += conn.execute(f"DELETE FROM {TABLE} WHERE college_key NOT IN "
+                                        "(SELECT college_key FROM run_keys)").rowcount
+        return changed
+    finally:
+        conn.close()
@@ -4,27 +4,29 @@
 # Usage: import and call auto_enrich_dataframe(df, workers=4, strict=True)
 # Output: DataFrame with columns TPO_NAME, TPO_EMAIL, TPO_PHONE, tpo_confidence_score
 
-import re, time, math
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+import os, queue, threading, time
+from collections import namedtuple
+from urllib.parse import urlparse
 import pandas as pd
-from concurrent.futures import ThreadPoolExecutor, as_completed
-
-# Polite headers
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 Chrome/120.0 Safari/537.36"
-}
-
-# Regexes
-EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}", re.I)
-PHONE_RE = re.compile(r"(?:\+91[\-\s]?)?(?:\d{10}|\d{3}[\-\s]\d{3}[\-\s]\d{4})")
-NAME_CANDIDATE_RE = re.compile(r"(?:Mr\.|Mrs\.|Ms\.|Dr\.|Prof\.|Sri\.|Smt\.)?\s?[A-Z][a-z]+(?:\s[A-Z][a-z]+){0,3}")
-
-PLACEMENT_KEYWORDS = [
-    "placement", "training", "training & placement", "tpo", "placement cell",
-    "career", "recruit", "career development", "industry relations"
-]
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import http_client
+import html_links
+from html_links import LinkClasses
+from politeness import SCHEDULER
+from checkpoint import CHECKPOINT, row_key
+from crawl_frontier import CRAWL, CrawlBudget, Frontier
+import memo
+import metrics
+from memo import Memo, MISSING
+from metrics import METRICS, TRACER, carry
+from sources import CONFIG
+from extraction import PLACEMENT, PLACEMENT_KEYWORDS, EMAIL_RE, PHONE_RE, NAME_RE as NAME_CANDIDATE_RE
+from website_index import resolve_website
+from host_breaker import BREAKER
+
+# Emails, phones, names and PLACEMENT_KEYWORDS are all found by one scan per page
+# (see extraction.py); the patterns are re-exported here for existing importers.
+
 CONTACT_KEYWORDS = ["contact", "contact-us", "contactus", "faculty", "staff", "office", "people"]
 
 # Scoring rules (strict)
@@ -33,17 +35,10 @@ CONTACT_KEYWORDS = ["contact", "contact-us", "contactus", "faculty", "staff", "o
 # name score: if name adjacent to keyword text -> +3 ; else +1
 # final threshold (strict) = 4
 
-TIMEOUT = 10
-REQUEST_SLEEP = 0.6  # polite
+TIMEOUT = CONFIG.get("enrich_timeout_seconds", 10)
 
 def safe_get(url):
-    try:
-        r = requests.get(url, headers=HEADERS, timeout=TIMEOUT, verify=False)
-        if r.status_code == 200:
-            return r.text
-    except Exception:
-        return None
-    return None
+    return http_client.safe_get(url, timeout=TIMEOUT)
 
 def normalize_text(s):
     if s is None:
@@ -59,88 +54,66 @@ def is_placement_anchor(text, href):
         return True
     return False
 
-def find_candidate_pages(home_html, base_url):
+# placement links first, then contact/staff pages (one streaming pass, see html_links)
+CANDIDATE_CLASSES = LinkClasses((PLACEMENT_KEYWORDS, PLACEMENT_KEYWORDS), (CONTACT_KEYWORDS, CONTACT_KEYWORDS))
+MAX_CANDIDATE_PAGES = CONFIG.get("max_candidate_pages", 25)
+
+def candidate_links(home_html, base_url, limit=MAX_CANDIDATE_PAGES):
+    """Candidate Link tuples (url, anchor text, priority class) of a homepage."""
+    return html_links.candidate_links(home_html, base_url, CANDIDATE_CLASSES, limit=limit)
+
+def find_candidate_pages(home_html, base_url, limit=MAX_CANDIDATE_PAGES):
     """
     From homepage HTML, return candidate URLs (placement/contact pages) in priority order.
+    At most limit URLs; parsing stops once limit placement links were found (None: no cap).
     """
-    pages = []
-    try:
-        soup = BeautifulSoup(home_html, "lxml")
-    except Exception:
-        return pages
-
-    # First pass: anchors with placement keywords in text or href
-    for a in soup.find_all("a", href=True):
-        text = normalize_text(a.get_text())
-        href = a["href"]
-        if is_placement_anchor(text, href):
-            full = urljoin(base_url, href)
-            pages.append(full)
-
-    # second pass: contact/staff pages
-    for a in soup.find_all("a", href=True):
-        text = normalize_text(a.get_text())
-        href = a["href"]
-        if any(k in text.lower() for k in CONTACT_KEYWORDS) or any(k in href.lower() for k in CONTACT_KEYWORDS):
-            full = urljoin(base_url, href)
-            pages.append(full)
-
-    # dedupe preserving order
-    seen = set()
-    pages_clean = []
-    for p in pages:
-        p_n = p.split('#')[0].rstrip('/')
-        if p_n not in seen:
-            seen.add(p_n)
-            pages_clean.append(p_n)
-    return pages_clean
+    return [link.url for link in candidate_links(home_html, base_url, limit)]
 
-def extract_from_html(html):
-    """Return emails, phones and candidate text blocks"""
+def page_candidates(html):
+    """
+    One scan of a page: (emails, phones, names), where phones and names are
+    (value, near_keyword) pairs. Names are only taken within NEAR_WINDOW characters
+    of a placement keyword, or from the first few blocks of text if there is none.
+    """
     if not html:
         return [], [], []
+    ex = PLACEMENT.scan(html)
+    emails = ex.unique(ex.emails)
+    phones = {}
+    for h in ex.phones:
+        phones[h.value] = phones.get(h.value, False) or ex.near_keyword(h.start)
+
+    if ex.keywords:
+        near = [h for h in ex.names if ex.near_keyword(h.start)]
+    else:
+        # no keyword: fall back to the first few blocks of text
+        limit = 0
+        for _ in range(5):
+            nl = ex.text.find("\n", limit)
+            if nl == -1:
+                limit = len(ex.text)
+                break
+            limit = nl + 1
+        near = [h for h in ex.names if h.start < limit]
+    names = [n for n in ex.unique(near) if 3 <= len(n) <= 50]
+    return emails, list(phones.items()), [(n, bool(ex.keywords)) for n in names]
 
-    text = html
-    emails = list(set(EMAIL_RE.findall(text)))
-    phones = list(set(PHONE_RE.findall(text)))
-
-    # collect text blocks around keywords to find names near keywords
-    blocks = []
-    low = text.lower()
-    for kw in PLACEMENT_KEYWORDS:
-        idx = low.find(kw)
-        if idx != -1:
-            start = max(0, idx-250)
-            end = min(len(text), idx+250)
-            block = text[start:end]
-            blocks.append(block)
-
-    # if no keyword block, fallback to entire text chunks (split by <p>, <div> tags)
-    if not blocks:
-        # naive paragraphs splitting
-        parts = re.split(r"</p>|<br|</div>", text, flags=re.I)
-        for p in parts[:5]:
-            if len(p) > 50:
-                blocks.append(p)
-
-    # find names in blocks
-    names = []
-    for block in blocks:
-        for m in NAME_CANDIDATE_RE.finditer(block):
-            n = " ".join(m.group().split())
-            if len(n) >= 3 and len(n) <= 50:
-                names.append(n)
-
-    names = list(dict.fromkeys(names))  # keep order unique
-    return emails, phones, names
-
-def score_candidate(email=None, phone=None, name=None, context_text=""):
+def extract_from_html(html):
+    """Return emails, phones and candidate names"""
+    emails, phones, names = page_candidates(html)
+    return emails, [p for p, _ in phones], [n for n, _ in names]
+
+def score_candidate(email=None, phone=None, name=None, context_text="", near_keyword=None):
     """
     Score a candidate using strict rules. Higher is better.
     Strict threshold ~4
+    near_keyword says whether the phone/name sits next to a placement keyword; if it
+    is None, any keyword anywhere in context_text counts.
     """
     score = 0
     ctx = (context_text or "").lower()
+    if near_keyword is None:
+        near_keyword = any(k in ctx for k in PLACEMENT_KEYWORDS)
 
     if email:
         local = email.split("@")[0].lower()
@@ -155,14 +128,14 @@ def score_candidate(email=None, phone=None, name=None, context_text=""):
 
     if phone:
         # if phone appears close to keyword in context text
-        if any(k in ctx for k in PLACEMENT_KEYWORDS):
+        if near_keyword:
             score += 3
         else:
             score += 1
 
     if name:
         # if name string appears in context with keyword, good signal
-        if any(k in ctx for k in PLACEMENT_KEYWORDS):
+        if near_keyword:
             score += 3
         else:
             # small credit
@@ -171,16 +144,14 @@ def score_candidate(email=None, phone=None, name=None, context_text=""):
     # small normalization
     return score
 
-def choose_tpo_for_college(college_row, strict=True):
-    """
-    Given a row with columns: college_name, source_url (optional), maybe website in extra column,
-    attempt to find a high-confidence TPO. Returns dict with tpo_name/tpo_email/tpo_phone/score/placement_page/website
-    """
-    name = normalize_text(college_row.get("college_name", ""))
-    # prefer website column if exists
+def website_candidates_for(college_row):
+    """Return the de-duplicated list of base websites worth crawling for a row."""
     website_candidates = []
-    if "website" in college_row and college_row.get("website"):
-        website_candidates.append(college_row.get("website"))
+    # prefer website column if exists (the AICTE/UGC ones often lack the scheme)
+    website = college_row.get("website")
+    if isinstance(website, str) and website.strip() not in ("", "-"):
+        website = website.strip()
+        website_candidates.append(website if "://" in website else "http://" + website)
     # fallback: try using source_url if it looks like a domain
     src = college_row.get("source_url", "")
     if isinstance(src, str) and src.startswith("http") and "github" not in src and "aicte" not in src and "ugc" not in src:
@@ -188,57 +159,176 @@ def choose_tpo_for_college(college_row, strict=True):
         base = f"{parsed.scheme}://{parsed.netloc}"
         website_candidates.append(base)
 
-    # If nothing, try quick guessed domain (less reliable) - optional
-    # Not performing Google search to avoid fragility & TOS issues.
+    # If nothing, look the name up in the offline website index (no search engine)
+    if not website_candidates and college_row.get("college_name"):
+        website_candidates.append(resolve_website(college_row.get("college_name"), college_row.get("district")))
 
     # normalize candidates
-    website_candidates = [w.rstrip("/") for w in website_candidates if w and isinstance(w, str)]
-    website_candidates = list(dict.fromkeys(website_candidates))  # dedupe
+    website_candidates = [w.rstrip("/") for w in website_candidates if w and isinstance(w, str) and w != "-"]
+    return list(dict.fromkeys(website_candidates))  # dedupe
+
+# The crawl frontier also queues department pages, as springboards for one more hop
+DEPARTMENT_KEYWORDS = ["department", "dept", "academics", "administration"]
+CRAWL_CLASSES = LinkClasses((PLACEMENT_KEYWORDS, PLACEMENT_KEYWORDS), (CONTACT_KEYWORDS, CONTACT_KEYWORDS),
+                            (DEPARTMENT_KEYWORDS, DEPARTMENT_KEYWORDS))
+HOP_FROM = (1, 2)   # classes of pages whose own links are followed (contact, department)
+MAX_HOPS = CRAWL.get("extra_hops", 1)
+# thread engine: colleges searched at once per fetch worker (the rest wait unstarted)
+COLLEGES_PER_WORKER = CRAWL.get("colleges_per_worker", 8)
+
+# Run-wide memos (see memo.py): rows sharing a website reuse the first row's work
+CANDIDATE_LINKS = Memo()   # website -> crawl Links from its homepage
+# (page URL, want_links) -> (best (score, email, phone, name) or None, Links to hop to);
+# a page analysed without its links must not answer a request that hops from it
+PAGE_FINDINGS = Memo()
+SITE_RESULTS = Memo()      # website -> high-confidence result dict, or None
+
+def best_on_page(html):
+    """Best (score, email, phone, name) candidate on one page, or None if it has none."""
+    emails, phones, names = page_candidates(html)
+    best = None
+    # evaluate email-first candidates, then phone-first, then name-first
+    for e in emails:
+        sc = score_candidate(email=e)
+        if best is None or sc > best[0]:
+            best = (sc, e, None, None)
+    for ph, near in phones:
+        sc = score_candidate(phone=ph, near_keyword=near)
+        if best is None or sc > best[0]:
+            best = (sc, None, ph, None)
+    for nm, near in names:
+        sc = score_candidate(name=nm, near_keyword=near)
+        if best is None or sc > best[0]:
+            best = (sc, None, None, nm)
+    return best
+
+# What tpo_search asks its driver for, and what the driver sends back. Analysis is a
+# pure function of the page, so drivers may run it in another process (see
+# ParsePool); PageAnalysis holds only small picklable results, never the page.
+PageRequest = namedtuple("PageRequest", "url want_links")
+PageAnalysis = namedtuple("PageAnalysis", "ok found links")
+
+def analyse_page(html, url, want_links=False):
+    """
+    All CPU work for one fetched page: best candidate (best_on_page) and, if
+    want_links, its crawl links. ok is False when the fetch failed.
+    """
+    if not html:
+        return PageAnalysis(False, None, [])
+    links = []
+    if want_links:
+        with METRICS.timer("parse_seconds", stage="links"):
+            links = html_links.candidate_links(html, url, CRAWL_CLASSES, limit=MAX_CANDIDATE_PAGES)
+    return PageAnalysis(True, best_on_page(html), links)
+
+def _analyse_captured(html, url, want_links, source):
+    """analyse_page in a ParsePool process; returns it with the metrics it recorded."""
+    with metrics.source(source), METRICS.capture() as records:
+        page = analyse_page(html, url, want_links)
+    return page, records
+
+# search_website's result when it stopped before searching the whole site (budget
+# spent, host down, a page that failed to load): not memoized, another row may finish it
+UNFINISHED = object()
+
+def search_website(website, budget):
+    """
+    Sub-generator of tpo_search for one base website: yields PageRequests like
+    tpo_search and returns the high-confidence result dict for the site, None if
+    the whole site was searched without one, or UNFINISHED.
+
+    Candidate pages are fetched best-first from a Frontier (see crawl_frontier); a
+    contact or department page may add its own links one hop further. Fetches stop
+    when budget (a CrawlBudget, shared by the college's websites) runs out. Pages
+    already analysed during this run (PAGE_FINDINGS) are not fetched again, nor
+    are pages on hosts whose circuit breaker has tripped (host_breaker). Pages
+    that failed to load are not kept in PAGE_FINDINGS.
+    """
+    links = CANDIDATE_LINKS.get(website)
+    if links is MISSING:
+        if budget.exhausted() or BREAKER.reason(website):
+            return UNFINISHED
+        budget.spend()
+        home = yield PageRequest(website, True)
+        if not home.ok:
+            return UNFINISHED
+        links = home.links
+        CANDIDATE_LINKS.put(website, links)
+        # the homepage is analysed along with its links; don't fetch it twice
+        PAGE_FINDINGS.put((website, False), (home.found, []))
+
+    frontier = Frontier()
+    for link in links:
+        frontier.push(link.url, link.text, link.priority, depth=1)
+    # homepage as last resort
+    frontier.push(website, depth=0, score=float("-inf"))
+
+    best = None  # tuple (score, email, phone, name, placement_page)
+    finished = True
+    while frontier:
+        p, depth, priority = frontier.pop()
+        want_links = priority in HOP_FROM
+        cached = PAGE_FINDINGS.get((p, want_links))
+        if cached is MISSING:
+            if budget.exhausted() or BREAKER.reason(p):
+                finished = False
+                continue  # pages analysed earlier in the run are still free
+            budget.spend()
+            page = yield PageRequest(p, want_links)
+            cached = (page.found, page.links)
+            if page.ok:
+                PAGE_FINDINGS.put((p, want_links), cached)
+            else:
+                finished = False
+        found, hops = cached
+        if found is not None and (best is None or found[0] > best[0]):
+            best = found + (p,)
+
+        # if we have a candidate that already meets strict threshold, stop early
+        if best and best[0] >= 4:
+            sc, e, ph, nm, page = best
+            return {
+                "tpo_name": nm if nm and nm != "" else "-",
+                "tpo_email": e if e else "-",
+                "tpo_phone": ph if ph else "-",
+                "tpo_conf_score": sc,
+                "placement_page": page,
+                "website": website
+            }
+        if depth <= MAX_HOPS:
+            for link in hops:
+                frontier.push(link.url, link.text, link.priority, depth=depth + 1)
+    return None if finished else UNFINISHED
+
+def tpo_search(college_row, strict=True, budget=None):
+    """
+    I/O-free search for a college's TPO, written as a generator so the same logic
+    can be driven by blocking threads or by the asyncio engine in async_fetch.
+
+    Each ``yield`` hands out a PageRequest; the driver fetches its url and sends
+    back analyse_page(html, url, want_links) (see fetch_and_analyse).
+    The generator's return value is the result dict of choose_tpo_for_college,
+    whose "pages_fetched" says how many pages this college requested and whose
+    "complete" is False when a blank result left some website unfinished.
+    A website already fully searched during this run is answered from SITE_RESULTS.
+    budget defaults to CrawlBudget.from_config(); its clock starts at the first fetch.
+    """
+    website_candidates = website_candidates_for(college_row)
+    if budget is None:
+        budget = CrawlBudget.from_config()
 
-    # Fetch homepage for each website candidate until we find a good placement page
+    # Search each website candidate until one gives a high-confidence result
+    complete = True
     for website in website_candidates:
-        html = safe_fetch(website)
-        if not html:
-            continue
-        pages = find_candidate_pages(html, website)
-        # include homepage as last resort
-        pages = pages + [website]
-        # examine candidate pages in priority order
-        best = None  # tuple (score, email, phone, name, placement_page, context)
-        for p in pages:
-            p_html = safe_fetch(p)
-            emails, phones, names = extract_from_html(p_html)
-            # build candidate list and contexts (use page text as context)
-            context = (p_html or "")[:5000]
-            # evaluate email-first candidates
-            for e in emails:
-                sc = score_candidate(email=e, phone=None, name=None, context_text=context)
-                if best is None or sc > best[0]:
-                    best = (sc, e, None, None, p, context)
-            # then phone-first
-            for ph in phones:
-                sc = score_candidate(email=None, phone=ph, name=None, context_text=context)
-                if best is None or sc > best[0]:
-                    best = (sc, None, ph, None, p, context)
-            # then name-first
-            for nm in names:
-                sc = score_candidate(email=None, phone=None, name=nm, context_text=context)
-                if best is None or sc > best[0]:
-                    best = (sc, None, None, nm, p, context)
-
-            # if we have a candidate that already meets strict threshold, stop early
-            if best and best[0] >= 4:
-                # pick best and return
-                sc, e, ph, nm, page, ctx = best
-                return {
-                    "tpo_name": nm if nm and nm != "" else "-",
-                    "tpo_email": e if e else "-",
-                    "tpo_phone": ph if ph else "-",
-                    "tpo_conf_score": sc,
-                    "placement_page": page,
-                    "website": website
-                }
-
+        res = SITE_RESULTS.get(website)
+        if res is MISSING:
+            res = yield from search_website(website, budget)
+            if res is UNFINISHED:
+                complete = False
+                continue
+            SITE_RESULTS.put(website, res)
+        if res is not None:
+            return dict(res, pages_fetched=budget.pages, complete=True)
         # no high confidence in this website; continue to next website candidate
 
     # No website candidates produced high-confidence result. Strict mode: return blanks.
@@ -248,60 +338,439 @@ def choose_tpo_for_college(college_row, strict=True):
         "tpo_phone": "-",
         "tpo_conf_score": 0,
         "placement_page": "-",
-        "website": website_candidates[0] if website_candidates else "-"
+        "website": website_candidates[0] if website_candidates else "-",
+        "pages_fetched": budget.pages,
+        "complete": complete
     }
 
-def safe_fetch(url):
-    if not url or url == "-":
-        return None
+def definitive(res):
+    """
+    Whether res (a tpo_search result, None after an error) may be checkpointed: a
+    TPO was found, or every website was searched in full. Blanks caused by the
+    crawl deadline, an open breaker or pages that failed to load are retried
+    by the next run instead.
+    """
+    return res is not None and res.get("complete", True)
+
+def memo_summary():
+    return memo.summary(sites=SITE_RESULTS, pages=PAGE_FINDINGS, homepages=CANDIDATE_LINKS)
+
+def choose_tpo_for_college(college_row, strict=True):
+    """
+    Given a row with columns: college_name, source_url (optional), maybe website in extra column,
+    attempt to find a high-confidence TPO. Returns dict with tpo_name/tpo_email/tpo_phone/score/placement_page/website
+
+    The search is traced as one "college" span (metrics.TRACER) with an event per page.
+    """
+    span = college_span(college_row)
+    search = tpo_search(college_row, strict=strict)
     try:
-        html = requests.get(url, headers=HEADERS, timeout=10, verify=False).text
-        time.sleep(REQUEST_SLEEP)
-        return html
-    except Exception:
-        return None
+        req = next(search)
+        while True:
+            req = search.send(fetch_and_analyse(req, span))
+    except StopIteration as done:
+        finish_span(span, done.value)
+        return done.value
+
+def safe_fetch(url, until=None):
+    return http_client.safe_get(url, timeout=TIMEOUT, until=until)
 
-def auto_enrich_dataframe(df, max_workers=6, strict=True):
+def page_watcher(req):
     """
-    Input: DataFrame with at least 'college_name' column and optionally 'website' or 'source_url'.
-    Output: new DataFrame with appended TPO columns.
-    Strict mode returns '-' when score<4.
+    With http.stop_at_anchors, pages fetched for their links stop downloading once
+    MAX_CANDIDATE_PAGES placement links were seen (contacts further down are then missed).
     """
-    rows = df.to_dict(orient="records")
-    results = []
+    if http_client.STOP_AT_ANCHORS and req.want_links:
+        return html_links.LinkWatcher(req.url, CRAWL_CLASSES, limit=MAX_CANDIDATE_PAGES)
+    return None
+
+def fetch_and_analyse(req, span=None):
+    t0 = time.perf_counter()
+    html = safe_fetch(req.url, until=page_watcher(req))
+    fetched = time.perf_counter()
+    page = analyse_page(html, req.url, req.want_links)
+    if span is not None:
+        page_event(span, req, page, fetched - t0, time.perf_counter() - fetched)
+    return page
+
+def college_span(college_row):
+    return TRACER.start("college", college=str(college_row.get("college_name", "-")))
+
+def page_event(span, req, page, fetch_seconds, parse_seconds):
+    """Record one fetched page on a college span (parse time includes any pool queueing)."""
+    span.event("page", url=req.url, ok=page.ok, score=page.found[0] if page.found else None,
+               fetch=round(fetch_seconds, 4), parse=round(parse_seconds, 4))
+
+def finish_span(span, res):
+    res = res or {}
+    TRACER.finish(span, pages=res.get("pages_fetched", 0), website=res.get("website", "-"),
+                  score=res.get("tpo_conf_score", 0))
+
+def tpo_columns(row, res=None):
+    """Copy of the input row with the TPO output columns appended."""
+    out = dict(row)  # copy original columns
+    if res is None:
+        out.update({
+            "TPO_NAME": "-",
+            "TPO_EMAIL": "-",
+            "TPO_PHONE": "-",
+            "tpo_confidence_score": 0,
+            "tpo_placement_page": "-",
+            "tpo_website_used": "-",
+            "tpo_pages_fetched": 0
+        })
+        return out
+    out.update({
+        "TPO_NAME": res["tpo_name"],
+        "TPO_EMAIL": res["tpo_email"],
+        "TPO_PHONE": res["tpo_phone"],
+        "tpo_confidence_score": res["tpo_conf_score"],
+        "tpo_placement_page": res["placement_page"],
+        "tpo_website_used": res["website"],
+        "tpo_pages_fetched": res.get("pages_fetched", 0)
+    })
+    return out
+
+class ReorderWindow:
+    """
+    Bounds how far the enrichment may run ahead of its consumer.
+
+    A college at input position pos is only started once pos < consumed + size, so at
+    most `size` results are ever waiting to be consumed. In ordered mode that is also
+    the most the reorder buffer can hold: everything before position `consumed` has
+    already been handed out.
+    """
+
+    def __init__(self, size):
+        self.size = max(1, int(size))
+        self.consumed = 0
+        self.closed = False
+        self._cond = threading.Condition()
+
+    def admit(self, pos):
+        """Block until pos may start; False if the consumer has gone away."""
+        with self._cond:
+            while not self.closed and pos >= self.consumed + self.size:
+                self._cond.wait()
+            return not self.closed
+
+    def advance(self):
+        with self._cond:
+            self.consumed += 1
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
 
-    def worker(row):
+REORDER_WINDOW = CONFIG.get("enrich_reorder_window", 500)
+
+PARSE_WORKERS = CONFIG.get("parse_workers", 0)
+PARSE_QUEUE = CONFIG.get("parse_queue_pages", 64)
+
+class ParsePool:
+    """
+    Runs analyse_page for fetched pages in worker processes, so parsing, regex scans
+    and scoring use every core instead of contending for the GIL with the fetch
+    threads. At most queue_size pages are waiting or being parsed at once; submit()
+    blocks beyond that, so fetchers cannot outrun the parsers.
+
+    workers=0 analyses inline in the calling thread; workers="auto" uses one
+    process per CPU.
+    """
+
+    def __init__(self, workers=PARSE_WORKERS, queue_size=PARSE_QUEUE):
+        if workers == "auto":
+            workers = os.cpu_count() or 1
+        self.workers = int(workers or 0)
+        self._slots = threading.BoundedSemaphore(max(1, queue_size))
+        self._pool = None
+        if self.workers:
+            import multiprocessing
+            # fork: the run scripts have no __main__ guard for spawn/forkserver to re-import
+            ctx = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=ctx)
+            # start every process now, while this is still the only busy thread
+            for fut in [self._pool.submit(_analyse_captured, None, "", False, "-") for _ in range(self.workers)]:
+                fut.result()
+
+    def submit(self, req, html, callback):
+        """Analyse html fetched for req, then call callback(PageAnalysis) (from a pool thread)."""
+        if self._pool is None or not html:
+            try:
+                res = analyse_page(html, req.url, req.want_links)
+            except Exception:
+                res = PageAnalysis(False, None, [])
+            return callback(res)
+        self._slots.acquire()
         try:
-            res = choose_tpo_for_college(row, strict=strict)
-            out = dict(row)  # copy original columns
-            out.update({
-                "TPO_NAME": res["tpo_name"],
-                "TPO_EMAIL": res["tpo_email"],
-                "TPO_PHONE": res["tpo_phone"],
-                "tpo_confidence_score": res["tpo_conf_score"],
-                "tpo_placement_page": res["placement_page"],
-                "tpo_website_used": res["website"]
-            })
-            return out
+            fut = self._pool.submit(_analyse_captured, html, req.url, req.want_links, metrics.SOURCE.get())
         except Exception:
-            out = dict(row)
-            out.update({
-                "TPO_NAME": "-",
-                "TPO_EMAIL": "-",
-                "TPO_PHONE": "-",
-                "tpo_confidence_score": 0,
-                "tpo_placement_page": "-",
-                "tpo_website_used": "-"
-            })
-            return out
-
-    # concurrency
-    with ThreadPoolExecutor(max_workers=max_workers) as exe:
-        futures = [exe.submit(worker, r) for r in rows]
-        for fut in as_completed(futures):
-            results.append(fut.result())
-
-    # preserve original order using college_name index mapping
-    df_out = pd.DataFrame(results)
-    # attempt to re-order to original by college_name if unique else return as-is
-    return df_out
+            self._slots.release()
+            raise
+
+        def done(f):
+            self._slots.release()
+            try:
+                res, records = f.result()
+                METRICS.merge(records)
+            except Exception:
+                res = PageAnalysis(False, None, [])
+            callback(res)
+        fut.add_done_callback(done)
+
+    async def analyse_async(self, req, html):
+        """Awaitable analyse_page for the asyncio engine."""
+        if self._pool is None or not html:
+            return analyse_page(html, req.url, req.want_links)
+        import asyncio
+        page, records = await asyncio.get_running_loop().run_in_executor(
+            self._pool, _analyse_captured, html, req.url, req.want_links, metrics.SOURCE.get())
+        METRICS.merge(records)
+        return page
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _run_enrichment(rows, emit, admit, max_workers=6, strict=True, mode="threads",
+                    max_in_flight=200, per_host_limit=2, checkpoint=CHECKPOINT, force=False,
+                    parse_pool=None):
+    """
+    Search every row, calling emit(pos, out) once per row (one call at a time) in
+    completion order. Rows are started in input order, each after admit(pos) returns
+    True; once it returns False no further rows are started. Fetched pages are
+    analysed by parse_pool (a ParsePool; None analyses inline).
+
+    At most max_workers * crawl.colleges_per_worker colleges (max_in_flight in async
+    mode) are searched at once, so each one's fetches are not queued behind every
+    other admitted college's and its crawl deadline measures its own crawl.
+    """
+    if parse_pool is None:
+        parse_pool = ParsePool(0)
+    if mode not in ("threads", "async"):
+        raise ValueError(f"unknown enrichment mode: {mode!r}")
+
+    lock = threading.Lock()
+    keys = [row_key(r, strict) for r in rows] if checkpoint is not None else [None] * len(rows)
+    done = checkpoint.load(keys) if checkpoint is not None and not force else {}
+    if done:
+        print(f"[CHECKPOINT] Resuming: {len(done)} of {len(rows)} colleges already done")
+
+    active = threading.Semaphore(max_in_flight if mode == "async" else max_workers * COLLEGES_PER_WORKER)
+
+    def record(pos, out, save=True, resumed=False):
+        # save: a definitive result; resumed: taken from the checkpoint, so neither
+        # saved again nor holding a slot
+        if save and not resumed and checkpoint is not None:
+            try:
+                checkpoint.put(keys[pos], out)
+            except Exception as e:
+                print(f"[CHECKPOINT] Could not save row {pos}:", e)
+        with lock:
+            emit(pos, out)
+        if not resumed:
+            active.release()
+
+    def admitted():
+        # rows to search, in input order; checkpointed rows are emitted on the way
+        for pos, r in enumerate(rows):
+            if not admit(pos):
+                return
+            if keys[pos] in done:
+                record(pos, done.pop(keys[pos]), resumed=True)
+            else:
+                active.acquire()
+                yield pos
+
+    if mode == "async":
+        from async_fetch import enrich_rows_async
+        enrich_rows_async(rows, strict=strict, max_in_flight=max_in_flight,
+                          per_host_limit=per_host_limit, positions=admitted(),
+                          on_result=record, parse_pool=parse_pool)
+        return
+
+    state = {"started": 0, "finished": 0, "feeding": True}
+    all_done = threading.Event()
+    spans = {}  # pos -> the college's trace span, while it is being searched
+
+    def check_done():
+        # called with lock held
+        if not state["feeding"] and state["finished"] == state["started"]:
+            all_done.set()
+
+    def finish(pos, res=None):
+        # every started college ends here exactly once, or the run never completes
+        try:
+            try:
+                finish_span(spans.pop(pos), res)
+                out = tpo_columns(rows[pos], res)
+            except Exception:
+                res, out = None, tpo_columns(rows[pos])
+            record(pos, out, definitive(res))
+        finally:
+            with lock:
+                state["finished"] += 1
+                check_done()
+
+    def advance(pos, search, step):
+        # run the search up to its next fetch and queue that fetch by host
+        try:
+            req = step()
+        except StopIteration as stop:
+            return finish(pos, stop.value)
+        except Exception:
+            return finish(pos)
+        SCHEDULER.put(req.url, (pos, search, req))
+
+    def feed():
+        try:
+            for pos in admitted():
+                search = tpo_search(rows[pos], strict=strict)
+                spans[pos] = college_span(rows[pos])
+                with lock:
+                    state["started"] += 1
+                advance(pos, search, lambda: next(search))
+        finally:
+            with lock:
+                state["feeding"] = False
+                check_done()
+
+    def worker():
+        while not all_done.is_set():
+            item = SCHEDULER.get(timeout=0.2)
+            if item is None:
+                continue
+            pos, search, req = item
+            # the scheduler already spent this host's token
+            t0 = time.perf_counter()
+            html = http_client.safe_get(req.url, timeout=TIMEOUT, polite=False, until=page_watcher(req))
+            fetched = time.perf_counter()
+
+            # parsing may finish on another thread; the search resumes from there
+            def resume(page, pos=pos, search=search, req=req, fetched=fetched, fetch_seconds=fetched - t0):
+                try:
+                    page_event(spans[pos], req, page, fetch_seconds, time.perf_counter() - fetched)
+                except Exception:
+                    pass  # tracing must not stop the search
+                advance(pos, search, lambda: search.send(page))
+            try:
+                parse_pool.submit(req, html, resume)
+            except Exception:
+                finish(pos)  # the pool refused the page; resume was never called
+
+    # concurrency: one feeder starts colleges as the window allows, workers fetch
+    # and hand pages to the parse pool
+    with ThreadPoolExecutor(max_workers=max_workers + 1) as exe:
+        futs = [exe.submit(carry(feed))] + [exe.submit(carry(worker)) for _ in range(max_workers)]
+        for fut in futs:
+            fut.result()
+
+_DONE = object()
+
+def iter_enrich(df, ordered=False, window=REORDER_WINDOW, parse_workers=PARSE_WORKERS, **kwargs):
+    """
+    Generator over the enriched rows: yields (position, row) pairs as colleges finish,
+    where position is the row's index in df (0-based) and row is what
+    auto_enrich_dataframe would put in its DataFrame.
+
+    ordered=True yields them in input order instead, holding finished rows in a
+    reorder buffer until every earlier row has been yielded. Either way at most
+    `window` finished rows are held at once: new colleges are only started as the
+    consumer catches up, so a slow consumer (or one slow college, in ordered mode)
+    throttles the crawl rather than filling memory.
+
+    Other keyword arguments are those of auto_enrich_dataframe (except on_row).
+    Closing the generator early stops starting new colleges; searches already in
+    progress finish in the background and are still checkpointed.
+    """
+    rows = df.to_dict(orient="records")
+    gate = ReorderWindow(window)
+    results = queue.Queue()
+    failed = []
+    # started before any enrichment thread exists (the pool forks its workers)
+    parse_pool = ParsePool(parse_workers)
+
+    def produce():
+        try:
+            with metrics.source("tpo_auto"):
+                _run_enrichment(rows, lambda pos, out: results.put((pos, out)), gate.admit,
+                                parse_pool=parse_pool, **kwargs)
+        except BaseException as e:
+            failed.append(e)
+        finally:
+            # here rather than in the consumer: after an early close the searches
+            # still in progress keep using the pool until _run_enrichment returns
+            parse_pool.close()
+            results.put(_DONE)
+
+    producer = threading.Thread(target=produce, name="enrich-producer", daemon=True)
+    producer.start()
+    held = {}   # reorder buffer: position -> row, ordered mode only
+    nxt = 0
+    try:
+        while True:
+            item = results.get()
+            if item is _DONE:
+                break
+            pos, out = item
+            if not ordered:
+                yield pos, out
+                gate.advance()
+                continue
+            held[pos] = out
+            while nxt in held:
+                yield nxt, held.pop(nxt)
+                nxt += 1
+                gate.advance()
+        producer.join()
+        if failed:
+            raise failed[0]
+    finally:
+        gate.close()
+
+def auto_enrich_dataframe(df, max_workers=6, strict=True, mode="threads",
+                          max_in_flight=200, per_host_limit=2, on_row=None,
+                          checkpoint=CHECKPOINT, force=False, parse_workers=PARSE_WORKERS):
+    """
+    Input: DataFrame with at least 'college_name' column and optionally 'website' or 'source_url'.
+    Output: new DataFrame with appended TPO columns, rows in input order.
+    Strict mode returns '-' when score<4.
+
+    mode="threads" runs tpo_search on max_workers threads that pull their next request from
+    the politeness scheduler's ready queue, so a thread never sleeps on one busy host
+    while requests for other hosts are waiting.
+    mode="async" runs every college on the asyncio engine in async_fetch, keeping up to
+    max_in_flight requests open overall but at most per_host_limit against any one host.
+
+    on_row, if given, is called with each result row as soon as its college finishes
+    (one call at a time), e.g. to stream rows to output_writers. To consume rows
+    without building the DataFrame, or in input order as they become ready, use
+    iter_enrich.
+
+    Each definitive result (see definitive) is saved to checkpoint (None disables it)
+    as soon as it is known, and colleges that already have a saved result are not
+    searched again unless force=True.
+
+    parse_workers > 0 (or "auto") moves page parsing, extraction and scoring into that
+    many processes (see ParsePool); the threads/event loop then only fetch. Worth it
+    once pages come from cache and parsing, not the network, is the bottleneck.
+    """
+    results = [None] * len(df)   # by input position
+    for pos, out in iter_enrich(df, window=max(len(df), 1), max_workers=max_workers, strict=strict,
+                                mode=mode, max_in_flight=max_in_flight, per_host_limit=per_host_limit,
+                                checkpoint=checkpoint, force=force, parse_workers=parse_workers):
+        results[pos] = out
+        if on_row is not None:
+            on_row(out)
+
+    # results are kept by input position, so the original order is preserved
+    return pd.DataFrame(results)
@@ -1,21 +1,18 @@
 # tpo_enrichment.py (FINAL FIXED VERSION)
-import requests
-from bs4 import BeautifulSoup
-import re, time
-from urllib.parse import urljoin
+import re
 import pandas as pd
 from tqdm import tqdm
-
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 Chrome/120.0 Safari/537.36"
-}
-
-EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}")
-PHONE_RE = re.compile(r"(?:\+91[- ]?)?\d{10}")
-
-NAME_RE = re.compile(
-    r"(Mr\.|Mrs\.|Ms\.|Dr\.|Prof\.|Sri\.|Smt\.)?\s?[A-Z][a-z]+(\s[A-Z][a-z]+){0,3}"
-)
+import http_client
+import metrics
+from memo import Memo
+from extraction import PLACEMENT
+from html_links import LinkClasses, LinkWatcher, candidate_links
+from sources import CONFIG
+from website_index import INDEX_CFG, resolve_website
+
+TIMEOUT = CONFIG.get("enrich_timeout_seconds", 10)
+# fall back to a web search for colleges the offline index can't resolve
+SEARCH_FALLBACK = INDEX_CFG.get("search_fallback", False)
 
 KEYWORDS = [
     "placement",
@@ -36,21 +33,23 @@ def safe_str(x):
     except:
         return ""
 
-def fetch(url):
-    try:
-        res = requests.get(url, headers=HEADERS, timeout=10)
-        if res.status_code == 200:
-            return res.text
-    except:
-        return None
-    return None
+def fetch(url, until=None):
+    return http_client.safe_get(url, timeout=TIMEOUT, until=until)
 
-def discover_website(college_name):
+def discover_website(college_name, district=None):
     college_name = safe_str(college_name)
 
     if college_name == "":
         return "-"
 
+    # offline first: the website index answers without a network round trip
+    website = resolve_website(college_name, district)
+    if website != "-" or not SEARCH_FALLBACK:
+        return website
+    return search_website(college_name)
+
+def search_website(college_name):
+    """One web search for the college's site (the old resolver; see search_fallback)."""
     # ABSOLUTE SAFEGUARD — ensures replace() always works
     college_name = str(college_name)
 
@@ -67,39 +66,42 @@ def discover_website(college_name):
                 return link.split("&")[0]
     return "-"
 
+PLACEMENT_LINKS = LinkClasses((KEYWORDS, ()))
+
 def find_placement_page(base_url, homepage_html):
     if homepage_html is None:
         return "-"
 
-    try:
-        soup = BeautifulSoup(homepage_html, "lxml")
-        for a in soup.find_all("a", href=True):
-            text = safe_str(a.get_text()).lower()
-            href = a["href"]
-            if any(k in text for k in KEYWORDS):
-                return urljoin(base_url, href)
-    except:
-        return "-"
-
-    return "-"
+    # first anchor whose text mentions a keyword; parsing stops there
+    links = candidate_links(homepage_html, base_url, PLACEMENT_LINKS, limit=1)
+    return links[0].url if links else "-"
 
 def extract_contacts(html):
     if html is None:
         return [], [], []
 
-    emails = list(set(EMAIL_RE.findall(html)))
-    phones = list(set(PHONE_RE.findall(html)))
+    # one markup-free scan for emails, phones and names (see extraction.py)
+    ex = PLACEMENT.scan(html)
+    emails = ex.unique(ex.emails)
+    phones = ex.unique(ex.phones)
+    names = [n for n in ex.unique(ex.names) if 1 <= len(n.split()) <= 4]
 
-    names = []
-    for m in NAME_RE.finditer(html):
-        n = " ".join(m.group().split())
-        if 1 <= len(n.split()) <= 4:
-            names.append(n)
+    return emails, phones, names
 
-    names = list(set(names))
+# website -> (placement_url, emails, phones, names); rows sharing a site reuse it
+SITE_CONTACTS = Memo()
 
-    return emails, phones, names
+def site_contacts(website):
+    # the download stops at the first placement link; without one the whole page is read
+    homepage_html = fetch(website, until=LinkWatcher(website, PLACEMENT_LINKS, limit=1))
 
+    placement_url = find_placement_page(website, homepage_html)
+    placement_html = fetch(placement_url) if placement_url != "-" else homepage_html
+
+    emails, phones, names_found = extract_contacts(placement_html)
+    return placement_url, emails, phones, names_found
+
+@metrics.source("tpo_enrichment")
 def enrich_dataset(df):
     df = df.copy()
     df["college_name"] = df["college_name"].apply(safe_str)
@@ -113,18 +115,14 @@ def enrich_dataset(df):
             data.append([name, "-", "-", "-", "-", "-", "-"])
             continue
 
-        website = discover_website(name)
+        website = discover_website(name, safe_str(row.get("district", "")))
 
         if website == "-":
             data.append([name, "-", "-", "-", "-", "-", "-"])
             continue
 
-        homepage_html = fetch(website)
-
-        placement_url = find_placement_page(website, homepage_html)
-        placement_html = fetch(placement_url) if placement_url != "-" else homepage_html
-
-        emails, phones, names_found = extract_contacts(placement_html)
+        placement_url, emails, phones, names_found = SITE_CONTACTS.get_or_compute(
+            website, lambda: site_contacts(website))
 
         data.append([
             name,
@@ -136,7 +134,6 @@ def enrich_dataset(df):
             safe_str(row.get("district", "-"))
         ])
 
-        time.sleep(1)
 
     return pd.DataFrame(data, columns=[
         "college_name",
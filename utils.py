@@ -1,25 +1,77 @@
 # utils.py
-import re, os, sqlite3, pandas as pd
+import os, sqlite3, pandas as pd
 
-PHONE_RE = re.compile(r"(?:\+91[\-\s]?)?(?:\d{10}|\d{3}[\-\s]?\d{3}[\-\s]?\d{4})")
+# the one phone pattern, shared with the enrichers
+from extraction import PHONE_RE
 
 def normalize_text(s):
     if s is None: return ""
     return " ".join(str(s).replace("\xa0"," ").split()).strip()
 
+def normalize_series(s, default="-"):
+    """Vectorized normalize_text for a pandas Series of strings; blanks become default."""
+    s = s.fillna("").astype(str).str.replace(r"\s+", " ", regex=True).str.strip()
+    return s.mask(s == "", default)
+
 def extract_phone(text):
     if not text: return "-"
     m = PHONE_RE.search(str(text))
     return m.group(0) if m else "-"
 
-def save_outputs(df, folder="output"):
+def output_paths(folder="output"):
+    return (os.path.join(folder, "colleges.csv"),
+            os.path.join(folder, "colleges.json"),
+            os.path.join(folder, "colleges.sqlite"),
+            os.path.join(folder, "colleges.jsonl"),
+            os.path.join(folder, "colleges.parquet"))
+
+def open_row_writers(base_path):
+    """Streaming JSONL (+ Parquet when pyarrow is installed) writers for base_path.*"""
+    from output_writers import JsonlWriter, ParquetWriter, MultiWriter
+    writers = [JsonlWriter(base_path + ".jsonl")]
+    try:
+        writers.append(ParquetWriter(base_path + ".parquet"))
+    except ImportError:
+        print("[OUTPUT] pyarrow not installed; skipping", base_path + ".parquet")
+    return MultiWriter(*writers)
+
+def read_output(csv_path):
+    """
+    Load a pipeline output as all-string columns, from its .parquet sibling when that
+    is at least as new as the CSV (much faster than re-parsing the CSV).
+    """
+    pq_path = os.path.splitext(csv_path)[0] + ".parquet"
+    if os.path.exists(pq_path) and (not os.path.exists(csv_path) or os.path.getmtime(pq_path) >= os.path.getmtime(csv_path)):
+        try:
+            df = pd.read_parquet(pq_path)
+            return df.astype(str).where(df.notna())
+        except ImportError:
+            pass
+    return pd.read_csv(csv_path, dtype=str)
+
+def save_outputs(df, folder="output", sqlite_mode="replace"):
+    """
+    Write the CSV, JSON, JSONL, Parquet and SQLite outputs. JSON, JSONL and Parquet
+    are streamed row by row. sqlite_mode="replace" rebuilds the colleges table from
+    df; "upsert" keeps a keyed, indexed WAL table, only writes rows that changed and
+    deletes colleges df no longer has (see sqlite_output).
+    """
+    from output_writers import JsonArrayWriter, stream_rows
     os.makedirs(folder, exist_ok=True)
-    csv_path = os.path.join(folder, "colleges.csv")
-    json_path = os.path.join(folder, "colleges.json")
-    sqlite_path = os.path.join(folder, "colleges.sqlite")
+    paths = output_paths(folder)
+    csv_path, json_path, sqlite_path = paths[:3]
     df.to_csv(csv_path, index=False, encoding="utf-8")
-    df.to_json(json_path, orient="records", force_ascii=False)
-    conn = sqlite3.connect(sqlite_path)
-    df.to_sql("colleges", conn, if_exists="replace", index=False)
-    conn.close()
-    return csv_path, json_path, sqlite_path
+    rows = open_row_writers(os.path.splitext(csv_path)[0])
+    rows.writers += (JsonArrayWriter(json_path),)
+    with rows:
+        for row in stream_rows(df):
+            rows.write(row)
+    if sqlite_mode == "upsert":
+        import sqlite_output
+        changed = sqlite_output.upsert(df, sqlite_path, delete_missing=True)
+        print(f"[OUTPUT] SQLite upsert: {changed} rows inserted, changed or deleted")
+    else:
+        conn = sqlite3.connect(sqlite_path)
+        df.to_sql("colleges", conn, if_exists="replace", index=False)
+        conn.close()
+    return paths
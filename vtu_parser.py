@@ -1,8 +1,11 @@
 # vtu_parser.py
 import os, re
-from scraper_core import fetch_text, soupify
-from utils import normalize_text
+from concurrent.futures import ThreadPoolExecutor
+from scraper_core import fetch_text
+from html_tables import iter_table_rows
 from sources import VTU_AJAX, VTU_PAGES
+from manifest import MANIFEST, content_hash
+from metrics import METRICS, carry
 
 def parse_vtu_ajax():
     if not VTU_AJAX:
@@ -10,20 +13,28 @@ def parse_vtu_ajax():
     try:
         print("[VTU] Trying AJAX endpoint")
         html = fetch_text(VTU_AJAX)
-        return parse_html_tables(html, source=VTU_AJAX)
+        return parse_cached(html, VTU_AJAX)
     except Exception as e:
         print("[VTU] AJAX failed:", e)
         return []
 
+def parse_region_page(url):
+    try:
+        print("[VTU] Trying region page:", url)
+        html = fetch_text(url)
+        return parse_cached(html, url)
+    except Exception as e:
+        print("[VTU] region page failed:", e)
+        return []
+
 def parse_vtu_region_pages():
+    # fetched in parallel; results are concatenated in config order
+    if not VTU_PAGES:
+        return []
     rows = []
-    for url in VTU_PAGES:
-        try:
-            print("[VTU] Trying region page:", url)
-            html = fetch_text(url)
-            rows.extend(parse_html_tables(html, source=url))
-        except Exception as e:
-            print("[VTU] region page failed:", e)
+    with ThreadPoolExecutor(max_workers=len(VTU_PAGES)) as exe:
+        for page_rows in exe.map(carry(parse_region_page), VTU_PAGES):
+            rows.extend(page_rows)
     return rows
 
 def parse_local_snapshot():
@@ -31,38 +42,43 @@ def parse_local_snapshot():
     if os.path.exists(local):
         print("[VTU] Using local snapshot")
         html = open(local,"r",encoding="utf-8").read()
-        return parse_html_tables(html, source=local)
+        return parse_cached(html, local)
     return []
 
+def vtu_row(cols, source):
+    return {
+        "college_name": cols[0],
+        "city_town": cols[1],
+        "district": cols[2],
+        "affiliating_university": "VTU",
+        "tpo_name": "-",
+        "tpo_phone": "-",
+        "website": "-",
+        "source_url": source
+    }
+
+def iter_vtu_rows(html, source):
+    """Yield VTU row dicts as the lxml event parser closes each table."""
+    for cols in iter_table_rows(html):
+        if len(cols) >= 3:
+            yield vtu_row(cols, source)
+
 def parse_html_tables(html, source):
-    soup = soupify(html)
-    rows = []
-    tables = soup.find_all("table")
-    for table in tables:
-        trs = table.find_all("tr")
-        if len(trs) < 2:
-            continue
-        for tr in trs[1:]:
-            tds = tr.find_all("td")
-            cols = [normalize_text(td.get_text()) for td in tds]
-            if len(cols) >= 3:
-                rows.append({
-                    "college_name": cols[0],
-                    "city_town": cols[1],
-                    "district": cols[2],
-                    "affiliating_university": "VTU",
-                    "tpo_name": "-",
-                    "tpo_phone": "-",
-                    "source_url": source
-                })
+    with METRICS.timer("parse_seconds", stage="tables"):
+        rows = list(iter_vtu_rows(html, source))
     print(f"[VTU] parse_html_tables found {len(rows)} rows from {source}")
     return rows
 
+def parse_cached(html, source):
+    """parse_html_tables, skipped when this page's content is unchanged since last run."""
+    return MANIFEST.cached_stage(f"vtu:{source}", content_hash(source, html),
+                                 lambda: parse_html_tables(html, source=source))
+
 def load_vtu_rows():
     # 1: AJAX
     rows = parse_vtu_ajax()
     if rows: return rows
-    # 2: region pages
+    # 2: region pages, only fetched when AJAX came back empty
     rows = parse_vtu_region_pages()
     if rows: return rows
     # 3: local snapshot
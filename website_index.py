@@ -0,0 +1,231 @@
+# website_index.py -- offline college name -> website resolution
+#
+# discover_website used to run one Google search per college and scrape the result
+# page, which was slow, often blocked and the single slowest step of
+# generate_tpo_sheet.py. Instead, every (college, website) pair we already know of
+# is collected into a local index:
+#
+#   1. the user's seed file (website_index.seed_file, CSV with college_name,website);
+#   2. previous enrichment results (high-confidence tpo_website_used, and the
+#      website column of the verification sheet);
+#   3. the website column the AICTE/UGC loaders carry into output/colleges.csv.
+#
+# Earlier sources win when two disagree. Names are matched the way entity_resolution
+# matches them: canonical names (minus town names, which one list appends and another
+# doesn't), looked up exactly first, otherwise through a token index (only entries
+# sharing one of the query's rarest tokens are compared) and scored by trigram
+# similarity. A town dropped from a name still counts as that entry's district: when
+# either side had one, the two must share a district ("GFGC, Tumakuru" never resolves
+# to "GFGC, Mysuru"), and names with different numbers never match. A lookup is a few
+# dict probes, with no network.
+#
+#   python website_index.py lookup "RV College of Engg, Bangalore"
+#   python website_index.py stats
+
+import os, argparse, threading
+from collections import Counter, defaultdict
+from urllib.parse import urlparse
+import pandas as pd
+from entity_resolution import canonical_name, district_key, number_tokens, trigrams, similarity, DISTRICT_ALIASES
+from metrics import METRICS
+from sources import CONFIG
+
+INDEX_CFG = CONFIG.get("website_index", {})
+OUTPUT_FOLDER = CONFIG.get("output_folder", "output")
+THRESHOLD = INDEX_CFG.get("threshold", 0.8)
+BLOCKING_TOKENS = INDEX_CFG.get("blocking_tokens", 3)
+# a token shared by more entries than this ("college", "engineering") only widens the
+# candidate set when no rarer token of the query is indexed at all
+MAX_POSTINGS = INDEX_CFG.get("max_postings", 500)
+SEED_FILE = INDEX_CFG.get("seed_file", "website_seeds.csv")
+
+# (path, website column, optional (score column, minimum score)) in priority order
+RESULT_FILES = [
+    (os.path.join(OUTPUT_FOLDER, "final_karnataka_colleges_tpo_high_accuracy.csv"), "tpo_website_used",
+     ("tpo_confidence_score", 4)),
+    (os.path.join(OUTPUT_FOLDER, "tpo_verification_sheet.csv"), "website", None),
+]
+SOURCE_FILES = [(os.path.join(OUTPUT_FOLDER, "colleges.csv"), "website", None)]
+
+# hosts that are listings or mirrors, never a college's own site
+NOT_COLLEGE_SITES = ("aicte", "ugc.ac.in", "github", "google", "facebook", "youtube", "wikipedia")
+
+# town/district words dropped from names before matching ("... Technology, Tumakuru")
+PLACE_WORDS = ({w for k, v in DISTRICT_ALIASES.items() for w in (k + " " + v).split()}
+               - {"urban", "rural", "district", "dakshina", "uttara", "kannada"})
+
+def name_parts(name):
+    """
+    (key, places): canonical_name without place words, unless that would leave fewer
+    than two words, and the district keys of the place words it dropped.
+    """
+    words = canonical_name(name).split() if name else []
+    kept = [w for w in words if w not in PLACE_WORDS]
+    if len(kept) < 2:
+        return " ".join(words), frozenset()
+    return " ".join(kept), frozenset(district_key(w) for w in words if w in PLACE_WORDS)
+
+def normalize_website(url):
+    """'www.rvce.edu.in/about' -> 'http://www.rvce.edu.in'; '-' for anything unusable."""
+    url = str(url or "").strip()
+    if url.lower() in ("", "-", "nan", "none", "null", "na"):
+        return "-"
+    if "://" not in url:
+        url = "http://" + url
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+    if parsed.scheme not in ("http", "https") or "." not in host or any(s in host for s in NOT_COLLEGE_SITES):
+        return "-"
+    return f"{parsed.scheme}://{parsed.netloc.lower()}"
+
+class WebsiteIndex:
+    """In-memory name -> website index; add() entries, then lookup()/resolve() names."""
+
+    def __init__(self, threshold=THRESHOLD, blocking_tokens=BLOCKING_TOKENS):
+        self.threshold = threshold
+        self.blocking_tokens = blocking_tokens
+        self._entries = []                # (canonical name, district key, website, source, places)
+        self._grams = []
+        self._exact = {}                  # canonical name -> entry ids
+        self._postings = defaultdict(list)  # token -> entry ids
+        self._df = Counter()
+
+    def add(self, name, website, district=None, source="-"):
+        """Index name -> website; ignored if unusable or if this name/district is already known."""
+        website = normalize_website(website)
+        canon, places = name_parts(name)
+        if website == "-" or not canon:
+            return False
+        dkey = district_key(district)
+        for i in self._exact.get(canon, ()):
+            if self._entries[i][1] == dkey and self._entries[i][4] == places:
+                return False  # an earlier (higher-priority) source already has it
+        i = len(self._entries)
+        self._entries.append((canon, dkey, website, source, places))
+        self._grams.append(trigrams(canon))
+        self._exact.setdefault(canon, []).append(i)
+        for t in set(canon.split()):
+            self._postings[t].append(i)
+            self._df[t] += 1
+        return True
+
+    def add_frame(self, df, website_col, source, name_col="college_name", min_score=None):
+        """Add every row of df with a usable website_col; returns how many were new."""
+        if df is None or website_col not in df.columns or name_col not in df.columns:
+            return 0
+        if min_score is not None:
+            col, floor = min_score
+            if col in df.columns:
+                df = df[pd.to_numeric(df[col], errors="coerce").fillna(0) >= floor]
+        districts = df["district"] if "district" in df.columns else [None] * len(df)
+        return sum(self.add(n, w, d, source) for n, w, d in zip(df[name_col], df[website_col], districts))
+
+    def _compatible(self, i, dkey, places):
+        _, known, _, _, known_places = self._entries[i]
+        if dkey and known and known != dkey:
+            return False
+        if not places and not known_places:
+            return True
+        # a town was dropped from one of the names: both must be placed, in one district
+        return bool((places | {dkey}) & (known_places | {known}) - {""})
+
+    def lookup(self, name, district=None):
+        """(website, score, source) of the best match for name, or None below the threshold."""
+        canon, places = name_parts(name)
+        if not canon:
+            return None
+        dkey = district_key(district)
+        for i in self._exact.get(canon, ()):
+            if self._compatible(i, dkey, places):
+                METRICS.inc("website_lookups_total", result="exact")
+                _, _, website, source, _ = self._entries[i]
+                return website, 1.0, source
+        tokens = sorted({t for t in canon.split() if t in self._df}, key=lambda t: (self._df[t], t))
+        cands = set()
+        for t in tokens[:self.blocking_tokens]:
+            if cands and self._df[t] > MAX_POSTINGS:
+                break
+            cands.update(self._postings[t])
+        grams = trigrams(canon)
+        numbers = number_tokens(canon)
+        best, best_score = None, self.threshold
+        for i in sorted(cands):  # entry order = source priority, so ties keep the earlier source
+            if not self._compatible(i, dkey, places) or number_tokens(self._entries[i][0]) != numbers:
+                continue
+            score = similarity(grams, self._grams[i])
+            if score > best_score or (best is None and score >= best_score):
+                best, best_score = i, score
+        if best is None:
+            METRICS.inc("website_lookups_total", result="miss")
+            return None
+        METRICS.inc("website_lookups_total", result="fuzzy")
+        _, _, website, source, _ = self._entries[best]
+        return website, best_score, source
+
+    def resolve(self, name, district=None):
+        """Website for name, or '-' when nothing in the index matches well enough."""
+        hit = self.lookup(name, district)
+        return hit[0] if hit else "-"
+
+    def stats(self):
+        return dict(Counter(e[3] for e in self._entries), entries=len(self._entries),
+                    tokens=len(self._postings))
+
+    def __len__(self):
+        return len(self._entries)
+
+def _read(path):
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        from utils import read_output
+        return read_output(path) if path.endswith(".csv") else pd.read_excel(path, dtype=str)
+    except Exception as e:
+        print(f"[SITES] Couldn't read {path}:", e)
+        return None
+
+def build_index(seed_file=SEED_FILE, result_files=RESULT_FILES, source_files=SOURCE_FILES):
+    """WebsiteIndex over the seed file, previous results and the sources, in that priority."""
+    index = WebsiteIndex()
+    index.add_frame(_read(seed_file), "website", "seed")
+    for path, col, min_score in result_files:
+        index.add_frame(_read(path), col, "results", min_score=min_score)
+    for path, col, min_score in source_files:
+        index.add_frame(_read(path), col, "sources", min_score=min_score)
+    return index
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_index():
+    """The run-wide index, built from the files on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = build_index()
+                print(f"[SITES] Website index: {len(_index)} colleges "
+                      f"({', '.join(f'{k} {v}' for k, v in _index.stats().items() if k not in ('entries', 'tokens'))})")
+    return _index
+
+def resolve_website(name, district=None):
+    return get_index().resolve(name, district)
+
+def main():
+    parser = argparse.ArgumentParser(description="offline college website index")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    look = sub.add_parser("lookup", help="resolve college names")
+    look.add_argument("names", nargs="+")
+    look.add_argument("--district")
+    sub.add_parser("stats", help="entries per source")
+    args = parser.parse_args()
+    index = get_index()
+    if args.cmd == "stats":
+        print(index.stats())
+        return
+    for name in args.names:
+        hit = index.lookup(name, args.district)
+        print(f"{name} -> " + (f"{hit[0]} (score {hit[1]:.2f}, {hit[2]})" if hit else "-"))
+
+if __name__ == "__main__":
+    main()